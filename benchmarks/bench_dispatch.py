@@ -0,0 +1,155 @@
+"""
+Dispatch micro-benchmark
+
+Runs the order/cancellation/market update event mix from tests/integration/test_basic_engine.py through the table driven Engine and through a copy of the previous match based process_event.
+The "full" rows use the real Market/Broker. The "dispatch only" rows replay the same recorded event mix against no-op components, isolating the per event dispatch overhead.
+
+Usage: python benchmarks/bench_dispatch.py [rounds]
+"""
+import sys
+import time
+from pathlib import Path
+from typing import Type,TypeVar
+
+sys.path.insert(0,str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd
+
+from sim import *
+
+T = TypeVar("T",bound=Event)
+def safe_event_cast(event : Event, cls: Type[T]) -> T:
+    if not isinstance(event,cls):
+        raise TypeError("Invalid event cast")
+
+    return event
+
+class MatchDispatchEngine(Engine):
+    def process_event(self, event : "Event") -> None:
+        ts = event.ts_ns
+        if ts < self.ts_ns:
+            raise RuntimeError("Past event within queue.")
+        self.ts_ns = ts
+
+        match event.event_type:
+            case EventType.CANCELLATION_ARRIVES_AT_MARKET:
+                event = safe_event_cast(event,CancellationArrivesAtMarketEvent)
+                self.insert_events(self.market.handle_cancellation_arrival(ts,event.cancellation_submission))
+            case EventType.UPDATE_MARKET_DATA:
+                event = safe_event_cast(event,UpdateMarketDataEvent)
+                self.insert_events(self.market.handle_market_update(ts))
+            case EventType.ORDER_ARRIVES_AT_MARKET:
+                event = safe_event_cast(event,OrderArrivesAtMarketEvent)
+                results = self.market.handle_order_arrival(ts,event.order_submission)
+                self.broker.handle_order_arrival(event.order_submission.order_id)
+                self.insert_events(results)
+            case EventType.CANCELLATION_ARRIVES_AT_BROKER:
+                event = safe_event_cast(event,CancellationArrivesAtBrokerEvent)
+                self.broker.handle_cancellation_result(event.cancellation_result)
+            case EventType.FILL_ARRIVES_AT_BROKER:
+                event = safe_event_cast(event,FillArrivesAtBrokerEvent)
+                self.broker.handle_fill(event.fill)
+            case EventType.RUN_STRATEGY:
+                event = safe_event_cast(event,RunStrategyEvent)
+                results = self.strategy.run(self.market.get_snapshot(ts),self.broker.get_snapshot())
+                self.insert_events(self.broker.handle_requests(ts,*results))
+
+class OrderCancelStrategy(Strategy):
+    """Alternates the two market orders and cancellation of test_basic_engine.Strat."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.step = 0
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.step += 1
+        if self.step % 2 == 1:
+            return [OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=5,symbol="sym1"),
+                    OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=10,symbol="sym1")],[]
+        return [],[CancellationRequest(self.step - 1)]
+
+def get_market_data(n : int) -> MarketData:
+    delta = pd.Timedelta(minutes=1)
+    start = pd.Timestamp("2000-01-01")
+
+    return MarketData(pd.DataFrame({
+        "start_ts" : [start + i * delta for i in range(n)],
+        "end_ts" : [start + (i+1) * delta for i in range(n)],
+        "open" : [1.0] * n,
+        "high" : [1.0] * n,
+        "low" : [1.0] * n,
+        "close" : [1.0] * n,
+        "volume" : [1] * n,
+        "trades" : [1] * n,
+        "VWAP" : [1.0] * n
+    }))
+
+class NullComponent:
+    def __getattr__(self, name):
+        return lambda *args : []
+
+def record_events(rounds : int, md : MarketData) -> list:
+    engine = build_engine(Engine,rounds,md)
+    events = []
+
+    process_event = engine.process_event
+    def recording_process_event(event):
+        events.append(event)
+        process_event(event)
+
+    engine.process_event = recording_process_event
+    engine.run()
+
+    return events
+
+def run_dispatch_only(engine_cls, events : list, repeats : int = 100) -> float:
+    engine = engine_cls(NullComponent(),NullComponent(),NullComponent())
+    engine.strategy.run = lambda *args : ([],[])
+    process_event = engine.process_event
+    start_ns = engine.ts_ns
+
+    begin = time.perf_counter()
+    for _ in range(repeats):
+        engine.ts_ns = start_ns
+        for event in events:
+            process_event(event)
+    elapsed = time.perf_counter() - begin
+
+    return repeats * len(events) / elapsed
+
+def build_engine(engine_cls, rounds : int, md : MarketData) -> Engine:
+    delta = pd.Timedelta(minutes=1)
+    start = pd.Timestamp("2000-01-01")
+
+    broker = Broker(1e12,PerShareFee(2),delta*2)
+    market = Market({"sym1" : md},CappedFill(5),delta*2)
+    engine = engine_cls(OrderCancelStrategy(),broker,market)
+
+    for i in range(rounds):
+        round_start = start + 10 * i * delta
+        engine.insert_event(RunStrategyEvent(EventType.RUN_STRATEGY,round_start))
+        engine.insert_event(RunStrategyEvent(EventType.RUN_STRATEGY,round_start + 5 * delta))
+        engine.insert_event(UpdateMarketDataEvent(EventType.UPDATE_MARKET_DATA,round_start + 7 * delta))
+
+    return engine
+
+def run_once(engine_cls, rounds : int, md : MarketData) -> float:
+    engine = build_engine(engine_cls,rounds,md)
+
+    begin = time.perf_counter()
+    engine.run()
+    elapsed = time.perf_counter() - begin
+
+    return engine.enqueue_id / elapsed
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    md = get_market_data(10 * rounds + 10)
+    events = record_events(rounds,md)
+
+    for name,engine_cls in [("match",MatchDispatchEngine),("table",Engine)]:
+        full = max(run_once(engine_cls,rounds,md) for _ in range(3))
+        dispatch_only = max(run_dispatch_only(engine_cls,events) for _ in range(3))
+        print(f"{name} dispatch: full {full:,.0f} events/sec, dispatch only {dispatch_only:,.0f} events/sec")
+
+if __name__ == "__main__":
+    main()
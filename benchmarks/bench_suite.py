@@ -0,0 +1,229 @@
+"""
+Simulator benchmark suite
+
+Runs synthetic scenarios that scale one axis at a time away from a small base scenario: bars per symbol, symbols, orders per strategy call, order type and cancellation rate.
+Each scenario runs in a fresh process and reports events/sec from a plain run, peak RSS, and a per component breakdown (engine, market, broker, snapshots, strategy) from a second, profiled run.
+Results are compared against benchmarks/baseline.json when it exists.
+
+Usage:
+    python benchmarks/bench_suite.py                      quick suite, compare with the baseline
+    python benchmarks/bench_suite.py --suite full         includes 1e6/1e7 bars and 1000 symbols
+    python benchmarks/bench_suite.py --only bars          scenarios whose name contains "bars"
+    python benchmarks/bench_suite.py --save-baseline      overwrite the baseline with this run
+    python benchmarks/bench_suite.py --fail-on-regression exit 1 if events/sec drops past --threshold
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass,asdict
+from pathlib import Path
+from typing import Any,Dict,List
+
+sys.path.insert(0,str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+
+from sim import *
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+@dataclass(frozen=True)
+class Scenario:
+    name : str
+    bars : int = 1000
+    symbols : int = 1
+    orders_per_call : int = 1
+    order_type : str = "MARKET"
+    cancel_rate : float = 0.0
+    seed : int = 0
+
+def scenarios(suite : str) -> List[Scenario]:
+    bars = [1_000,10_000,100_000] + ([1_000_000,10_000_000] if suite == "full" else [])
+    symbols = [1,10,100] + ([1000] if suite == "full" else [])
+
+    result = [Scenario(name=f"bars_{n}",bars=n) for n in bars]
+    result += [Scenario(name=f"symbols_{n}",symbols=n) for n in symbols if n > 1]
+    result += [Scenario(name=f"orders_{n}",orders_per_call=n) for n in [10,100]]
+    result += [Scenario(name="limit_orders",order_type="LIMIT",orders_per_call=10)]
+    result += [Scenario(name=f"cancel_{rate}",order_type="LIMIT",orders_per_call=10,cancel_rate=rate) for rate in [0.5,1.0]]
+
+    return result
+
+def synthetic_market_data(bars : int, seed : int) -> MarketData:
+    rng = np.random.default_rng(seed)
+    start_ns = pd.Timestamp("2000-01-01").value + np.arange(bars,dtype=np.int64) * 60_000_000_000
+    close = 100 * np.exp(np.cumsum(rng.normal(0,0.001,bars)))
+    open = np.concatenate([[100.0],close[:-1]])
+
+    columns = {"start_ts" : start_ns,
+               "end_ts" : start_ns + 60_000_000_000,
+               "open" : open,
+               "high" : np.maximum(open,close) * 1.0005,
+               "low" : np.minimum(open,close) * 0.9995,
+               "close" : close,
+               "VWAP" : (open + close) / 2,
+               "volume" : np.full(bars,1000,dtype=np.int64),
+               "trades" : np.full(bars,10,dtype=np.int64)}
+
+    return MarketData.from_columns(columns)
+
+class SyntheticStrategy(Strategy):
+    """
+    Buys orders_per_call times per run, cycling through the symbols. Limit orders are priced around the last close so roughly half cross.
+    Each run also cancels cancel_rate * orders_per_call of the oldest open orders.
+    """
+    def __init__(self, scenario : Scenario, symbols : List[str]) -> None:
+        super().__init__()
+        self.scenario = scenario
+        self.symbols = symbols
+        self.order_type = OrderType[scenario.order_type]
+        self.cancels_per_call = int(round(scenario.cancel_rate * scenario.orders_per_call))
+        self.rng = np.random.default_rng(scenario.seed)
+        self.next_symbol = 0
+
+    def run(self, market_snapshot, broker_snapshot):
+        orders = []
+        for _ in range(self.scenario.orders_per_call):
+            symbol = self.symbols[self.next_symbol]
+            self.next_symbol = (self.next_symbol + 1) % len(self.symbols)
+
+            limit = None
+            if self.order_type == OrderType.LIMIT:
+                last = market_snapshot.market_datas[symbol].column("close")
+                reference = last[-1] if len(last) else 100.0
+                limit = float(reference * (1 + self.rng.normal(0,0.001)))
+
+            orders.append(OrderRequest(side=OrderSide.BUY,order_type=self.order_type,qty=1,symbol=symbol,limit=limit))
+
+        cancellations = []
+        if self.cancels_per_call:
+            for order_id,order in broker_snapshot.open_orders.items():
+                if len(cancellations) == self.cancels_per_call:
+                    break
+                if order.state == OrderState.LIVE:
+                    cancellations.append(CancellationRequest(order_id))
+
+        return orders,cancellations
+
+def build_engine(scenario : Scenario, market_datas : Dict[str,MarketData]) -> Engine:
+    broker = Broker(1e18,PerShareFee(0.001),pd.Timedelta(seconds=1))
+    market = Market(market_datas,CappedFill(100),pd.Timedelta(seconds=1))
+    engine = Engine(SyntheticStrategy(scenario,list(market_datas)),broker,market)
+    engine.add_bar_schedule()
+
+    return engine
+
+def components(profiler : EngineProfiler) -> Dict[str,float]:
+    events = {name : stats.total for name,stats in profiler.events.items()}
+    sections = {name : stats.total for name,stats in profiler.sections.items()}
+
+    market = events.get("UPDATE_MARKET_DATA",0) + events.get("ORDER_ARRIVES_AT_MARKET",0) + events.get("CANCELLATION_ARRIVES_AT_MARKET",0)
+    broker = events.get("FILL_ARRIVES_AT_BROKER",0) + events.get("CANCELLATION_ARRIVES_AT_BROKER",0) + sections.get("broker.handle_requests",0)
+    snapshots = sections.get("snapshot.market",0) + sections.get("snapshot.broker",0)
+    strategy = sections.get("strategy.run",0)
+
+    return {"engine" : profiler.wall_time - market - broker - snapshots - strategy,
+            "market" : market,
+            "broker" : broker,
+            "snapshots" : snapshots,
+            "strategy" : strategy}
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def run_scenario(scenario : Scenario) -> Dict[str,Any]:
+    startup_rss = peak_rss_mb()
+    market_datas = {f"sym{i}" : synthetic_market_data(scenario.bars,scenario.seed + i) for i in range(scenario.symbols)}
+
+    engine = build_engine(scenario,market_datas)
+    begin = time.perf_counter()
+    engine.run()
+    wall_time = time.perf_counter() - begin
+
+    profiled = build_engine(scenario,market_datas)
+    profiler = EngineProfiler()
+    profiled.attach_profiler(profiler)
+    profiled.run()
+
+    return {"scenario" : asdict(scenario),
+            "events" : engine.enqueue_id,
+            "orders" : engine.broker.order_count,
+            "fills" : engine.broker.fill_count,
+            "wall_time" : wall_time,
+            "events_per_sec" : engine.enqueue_id / wall_time,
+            "peak_rss_mb" : peak_rss_mb(),
+            "scenario_rss_mb" : peak_rss_mb() - startup_rss,
+            "components" : components(profiler)}
+
+def run_isolated(scenario : Scenario) -> Dict[str,Any]:
+    """Runs the scenario in a fresh process so peak RSS is its own."""
+    with ProcessPoolExecutor(max_workers=1,mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_scenario,scenario).result()
+
+def machine() -> Dict[str,str]:
+    return {"python" : platform.python_version(), "platform" : platform.platform(), "processor" : platform.processor()}
+
+def report(results : List[Dict[str,Any]], baseline : Dict[str,Any], threshold : float) -> List[str]:
+    baseline_results = {result["scenario"]["name"] : result for result in baseline.get("results",[])}
+    regressions = []
+
+    print(f"{'scenario':<16}{'events':>11}{'events/s':>11}{'vs base':>9}{'rss MB':>8}  engine/market/broker/snapshots/strategy (s)")
+    for result in results:
+        name = result["scenario"]["name"]
+        ratio = ""
+        if name in baseline_results:
+            change = result["events_per_sec"] / baseline_results[name]["events_per_sec"]
+            ratio = f"{change:.2f}x"
+            if change < 1 - threshold:
+                regressions.append(name)
+
+        parts = "/".join(f"{value:.2f}" for value in result["components"].values())
+        print(f"{name:<16}{result['events']:>11,}{result['events_per_sec']:>11,.0f}{ratio:>9}{result['peak_rss_mb']:>8.0f}  {parts}")
+
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulator benchmark suite")
+    parser.add_argument("--suite",choices=["quick","full"],default="quick")
+    parser.add_argument("--only",default=None,help="run scenarios whose name contains this string")
+    parser.add_argument("--output",type=Path,default=None,help="write results JSON here")
+    parser.add_argument("--baseline",type=Path,default=BASELINE_PATH)
+    parser.add_argument("--save-baseline",action="store_true")
+    parser.add_argument("--threshold",type=float,default=0.2,help="relative events/sec drop counted as a regression")
+    parser.add_argument("--fail-on-regression",action="store_true")
+    args = parser.parse_args()
+
+    selected = [scenario for scenario in scenarios(args.suite) if args.only is None or args.only in scenario.name]
+    results = [run_isolated(scenario) for scenario in selected]
+    summary = {"machine" : machine(), "suite" : args.suite, "results" : results}
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = report(results,baseline,args.threshold)
+
+    if args.output is not None:
+        with open(args.output,"w") as f:
+            json.dump(summary,f,indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline,"w") as f:
+            json.dump(summary,f,indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"Regressions past {args.threshold:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
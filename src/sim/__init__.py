@@ -3,7 +3,11 @@ from sim.fill import Fill
 from sim.fill_logic import FillLogic,CappedFill
 from sim.fee_model import FeeModel,PerShareFee
 from sim.market_data import Bar,MarketData,MarketDataSnapshot
+from sim.streaming_market_data import StreamingMarketData,csv_chunks,parquet_chunks
+from sim.bar_store import save_market_data,load_market_data,save_market_datas,load_market_datas
+from sim.shared_market_data import SharedMarketData,SharedMarketDataSpec,attach_market_data,attach_market_datas
 from sim.events import Event,EventType,RunStrategyEvent,UpdateMarketDataEvent,FillArrivesAtBrokerEvent,OrderArrivesAtMarketEvent,CancellationArrivesAtBrokerEvent,CancellationArrivesAtMarketEvent
+from sim.event_source import EventSource,BarBoundarySource,MarketUpdateSource,StrategyRunSource
 from sim.portfolio import Portfolio,PortfolioSnapshot
 
 # Order Imports
@@ -22,7 +26,15 @@ from sim.cancellation_result import CancellationOutcome,CancellationResult
 
 # Logic Imports
 
+from sim.retention import ArchiveSummary,OrderArchive,RetentionMode,RetentionPolicy
+from sim.order_ids import ORDER_ID_BITS,order_broker_id
 from sim.broker import Broker,BrokerSnapshot
 from sim.strategy import Strategy
 from sim.market import Market,MarketSnapshot
 from sim.engine import Engine
+from sim.multi_engine import MultiEngine
+from sim.checkpoint import CheckpointSchedule
+from sim.profiler import EngineProfiler,TimingStats
+from sim.journal import EventJournal,Journal,JournalReplay,load_journal,replay_journal
+from sim.sweep import SweepResult,expand_grid,run_sweep
+from sim.vectorized import TargetPositionStrategy,VectorizedBacktest,VectorizedResult,VectorizedStrategy
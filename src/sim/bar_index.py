@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from sim.timestamps import column_to_ns
+
+"""
+BarIndex
+
+Responsibilities
+- Locate bar positions from timestamps using sorted int64 start_ts/end_ts arrays.
+
+Design Notes: Lookups first test the bars under forward moving cursors before falling back to binary search. The engine queries time monotonically, so most lookups are amortized O(1).
+"""
+
+class BarIndex:
+    start_ns : np.ndarray
+    end_ns : np.ndarray
+    current_cursor : int
+    recent_cursor : int
+
+    def __init__(self, start_ns : np.ndarray, end_ns : np.ndarray) -> None:
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+
+        self.current_cursor = 0
+        self.recent_cursor = -1
+
+    @classmethod
+    def from_df(cls, df : pd.DataFrame) -> "BarIndex":
+        return cls(column_to_ns(df["start_ts"]),column_to_ns(df["end_ts"]))
+
+    def __len__(self) -> int:
+        return len(self.start_ns)
+
+    def current(self, ns : int) -> int:
+        """Position of the bar with start_ts <= ns < end_ts, or -1."""
+        start_ns,end_ns = self.start_ns,self.end_ns
+        n = len(start_ns)
+
+        i = self.current_cursor
+        if i < n and start_ns[i] <= ns:
+            if ns < end_ns[i]:
+                return i
+
+            if i + 1 < n and start_ns[i+1] <= ns < end_ns[i+1]:
+                self.current_cursor = i + 1
+                return i + 1
+
+        i = int(np.searchsorted(start_ns,ns,side="right")) - 1
+
+        if i < 0:
+            return -1
+
+        self.current_cursor = i
+
+        if ns < end_ns[i]:
+            return i
+
+        return -1
+
+    def most_recent(self, ns : int) -> int:
+        """Position of the last bar with end_ts < ns, or -1."""
+        end_ns = self.end_ns
+        n = len(end_ns)
+
+        j = self.recent_cursor
+        if j < n and (j < 0 or end_ns[j] < ns):
+            if j + 1 == n or end_ns[j+1] >= ns:
+                return j
+
+            if j + 2 == n or end_ns[j+2] >= ns:
+                self.recent_cursor = j + 1
+                return j + 1
+
+        j = int(np.searchsorted(end_ns,ns,side="left")) - 1
+        self.recent_cursor = j
+
+        return j
+
+    def count_ended(self, ns : int) -> int:
+        """Number of bars with end_ts <= ns."""
+        return int(np.searchsorted(self.end_ns,ns,side="right"))
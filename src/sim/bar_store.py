@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+from typing import Dict,Union
+
+import numpy as np
+
+from sim.market_data import MarketData,TIMESTAMP_COLUMNS,FLOAT_COLUMNS,INT_COLUMNS
+from sim.timestamps import tz_key,tz_from_key
+
+"""
+Bar Store
+
+Responsibilities
+- Persist MarketData as one .npy file per column plus a meta.json stamp.
+- Open stored bars as memory mapped, read-only MarketData.
+
+Design Notes: meta.json records the row count, timezone (IANA name or fixed offset), content fingerprint and that the bars passed validation when written. Opening only reads the metadata and maps the column files, so it costs milliseconds regardless of history length. Pages are read when lookups or snapshots touch them. Each column file is checked against its expected size, which catches truncated stores without reading any data.
+"""
+
+STORE_VERSION = 1
+META_FILE = "meta.json"
+SYMBOLS_FILE = "symbols.json"
+
+STORE_COLUMNS = TIMESTAMP_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS
+
+PathLike = Union[str,Path]
+
+def save_market_data(path : PathLike, market_data : MarketData) -> None:
+    path = Path(path)
+    tz = tz_key(market_data.tz)
+    path.mkdir(parents=True,exist_ok=True)
+
+    for col in STORE_COLUMNS:
+        np.save(path / f"{col}.npy",np.ascontiguousarray(market_data.columns[col]))
+
+    meta = {
+        "version" : STORE_VERSION,
+        "length" : len(market_data),
+        "tz" : tz,
+        "fingerprint" : market_data.fingerprint,
+        "validated" : market_data._validated,
+        "nbytes" : {col : int(market_data.columns[col].nbytes) for col in STORE_COLUMNS}
+    }
+
+    with open(path / META_FILE,"w") as f:
+        json.dump(meta,f)
+
+def load_market_data(path : PathLike, validate : bool = False) -> MarketData:
+    path = Path(path)
+
+    with open(path / META_FILE) as f:
+        meta = json.load(f)
+
+    if meta["version"] != STORE_VERSION:
+        raise ValueError(f"Unsupported bar store version ({meta['version']}).")
+
+    columns = {}
+    for col in STORE_COLUMNS:
+        column = np.load(path / f"{col}.npy",mmap_mode="r")
+
+        if len(column) != meta["length"] or column.nbytes != meta["nbytes"][col]:
+            raise ValueError(f"Bar store column does not match its metadata: {col}")
+
+        columns[col] = column
+
+    market_data = MarketData.from_columns(columns,tz=tz_from_key(meta["tz"]),validate=validate or not meta["validated"],fingerprint=meta["fingerprint"],validated=meta["validated"])
+
+    return market_data
+
+def save_market_datas(root : PathLike, market_datas : Dict[str,MarketData]) -> None:
+    root = Path(root)
+    root.mkdir(parents=True,exist_ok=True)
+
+    symbols = {}
+    for i,(symbol,market_data) in enumerate(market_datas.items()):
+        directory = f"{i:06d}"
+        save_market_data(root / directory,market_data)
+        symbols[symbol] = directory
+
+    with open(root / SYMBOLS_FILE,"w") as f:
+        json.dump(symbols,f)
+
+def load_market_datas(root : PathLike, validate : bool = False) -> Dict[str,MarketData]:
+    root = Path(root)
+
+    with open(root / SYMBOLS_FILE) as f:
+        symbols = json.load(f)
+
+    return {symbol : load_market_data(root / directory,validate) for symbol,directory in symbols.items()}
@@ -1,12 +1,18 @@
-from typing import Dict,List,TYPE_CHECKING
+from typing import Dict,List,Mapping,Optional,Set,TYPE_CHECKING
 
 import pandas as pd
 
-from sim.order import Order
+from sim.order import Order,OrderSnapshot,OrderState
 from sim.portfolio import Portfolio,PortfolioSnapshot
 from sim.events import Event,EventType,OrderArrivesAtMarketEvent,CancellationArrivesAtMarketEvent
-from sim.cancellation import Cancellation
+from sim.cancellation import Cancellation,CancellationSnapshot,CancellationState
+from sim.cancellation_submission import CancellationSubmission
 from sim.cancellation_result import CancellationOutcome
+from sim.order_ids import ORDER_ID_BITS,order_broker_id,order_local_id
+from sim.order_store import ORDER_COLUMNS,OrderStore
+from sim.retention import OrderArchive,RetentionMode,RetentionPolicy,order_frame
+from sim.snapshot_map import SnapshotMap
+from sim.timestamps import timestamp_tz,to_ns,to_ns_delta
 
 if TYPE_CHECKING:
     from sim import *
@@ -20,59 +26,129 @@ Responsibilities
 - Own order state info for strategy observation.
 
 Design Note - V1: The broker currently has very few guardrails on request execution. The broker only catches references to invalid order_ids. Invalid execution states from fills are captured by as fatal errors by Portfolio.
+
+Design Note - Order Ids: Each broker numbers its orders with its broker_id in the high bits (see sim.order_ids), so brokers sharing one Market never collide. broker_id 0 gives the plain sequence 0,1,2,...
+
+Design Note - Snapshots: The broker records which orders and cancellations changed since the last snapshot. get_snapshot only rebuilds those OrderSnapshot/CancellationSnapshot objects and reuses the rest. The snapshot mappings are paged SnapshotMaps copied on write, so a new version only copies the pages holding changed ids and an unchanged broker hands out the same mapping again.
+
+Design Note - Retention: Under a compacting RetentionPolicy an order is settled once it is filled or cancelled and no cancellation result is outstanding. Settled orders beyond the policy's keep are retired: removed from orders, cancellations and the snapshots and added to archive, so the working dicts hold live orders plus the last keep settled ones. Cancellation requests for retired orders still go to the market, which resolves them as it would under KEEP_ALL, and their results are ignored.
 """
 
 class BrokerSnapshot:
+    version : int
+    orders : Mapping[int,"OrderSnapshot"]
+    cancellations : Mapping[int,"CancellationSnapshot"]
+    open_orders : Dict[int,"OrderSnapshot"]
+
     def __init__(self, broker : "Broker") -> None:
+        broker._refresh_snapshots()
+
+        self.version = broker.snapshot_version
         self.portfolio = broker.portfolio.get_snapshot()
-        self.cancellations = {order_id : cancellation.get_snapshot() for order_id, cancellation in broker.cancellations.items()}
-        self.orders = {order_id : order.get_snapshot() for order_id, order in broker.orders.items()}
+        self.cancellations = broker.cancellation_snapshots
+        self.orders = broker.order_snapshots
+        self.open_orders = {order_id : self.orders[order_id] for order_id in broker.open_order_ids}
 
 class Broker:
     fee_model : "FeeModel"
     latency : pd.Timedelta
+    latency_ns : int
     orders : Dict[int,"Order"]
     cancellations : Dict[int,"Cancellation"]
     portfolio : "Portfolio"
 
+    broker_id : int
+    tz : Optional[object]
     current_order_id : int
+    record_fills : bool
+    fill_count : int
+
+    open_order_ids : Dict[int,None]
+    dirty_orders : Set[int]
+    dirty_cancellations : Set[int]
+    snapshot_version : int
+    order_snapshots : Mapping[int,"OrderSnapshot"]
+    cancellation_snapshots : Mapping[int,"CancellationSnapshot"]
+
+    retention : RetentionPolicy
+    archive : Optional[OrderArchive]
+    settled_order_ids : Dict[int,None]
+    retired_snapshots : Set[int]
 
-    def __init__(self, initial_cash : float, fee_model : "FeeModel", latency : pd.Timedelta) -> None:
+    def __init__(self, initial_cash : float, fee_model : "FeeModel", latency : pd.Timedelta, record_fills : bool = True, broker_id : int = 0, retention : Optional[RetentionPolicy] = None) -> None:
+        if broker_id < 0:
+            raise ValueError(f"Broker created with negative broker_id ({broker_id}).")
+
+        self.broker_id = broker_id
+        self.tz = None
         self.fee_model = fee_model
         self.latency = latency
+        self.latency_ns = to_ns_delta(latency)
+        self.record_fills = record_fills
 
         self.orders = {}
         self.cancellations = {}
         self.portfolio = Portfolio(initial_cash)
         self.current_order_id = 0
+        self.fill_count = 0
+
+        self.open_order_ids = {}
+        self.dirty_orders = set()
+        self.dirty_cancellations = set()
+        self.snapshot_version = 0
+        self.order_snapshots = SnapshotMap()
+        self.cancellation_snapshots = SnapshotMap()
+
+        self.retention = RetentionPolicy.keep_all() if retention is None else retention
+        self.archive = None
+        if self.retention.compacts:
+            memory_rows = None if self.retention.spill_dir is None else 0
+            self.archive = OrderArchive(f"broker_{broker_id}",self.retention.mode == RetentionMode.KEEP_LAST,memory_rows,self.retention.spill_dir,self.retention.block_rows)
+        self.settled_order_ids = {}
+        self.retired_snapshots = set()
 
     def handle_requests(self, ts : pd.Timestamp ,order_requests : List["OrderRequest"], cancellation_requests : List["CancellationRequest"]) -> List["Event"]:
+        tz = timestamp_tz(ts)
+        if tz is None:
+            tz = self.tz
+        ts = to_ns(ts)
+        arrival_ns = ts + self.latency_ns
         events = []
 
         for order_req in order_requests:
-            new_order = Order(order_req,self._generate_order_id())
+            new_order = Order(order_req,self._generate_order_id(),self.record_fills)
             order_id = new_order.order_id
             self.orders[order_id] = new_order
+            self.open_order_ids[order_id] = None
+            self.dirty_orders.add(order_id)
 
             new_order._to_submitted()
 
             submission = new_order.get_submission()
             
-            events.append(OrderArrivesAtMarketEvent(EventType.ORDER_ARRIVES_AT_MARKET,ts+self.latency,submission))
+            events.append(OrderArrivesAtMarketEvent._make(EventType.ORDER_ARRIVES_AT_MARKET,arrival_ns,submission,tz=tz))
 
         for cancel_req in cancellation_requests:
             if not cancel_req.order_id in self.orders:
-                raise RuntimeError("Cancellation Request for non existent order.")
+                if not self._is_retired(cancel_req.order_id):
+                    raise RuntimeError("Cancellation Request for non existent order.")
+
+                # A retired order is terminal, so the market resolves the request as it would under KEEP_ALL and the result is ignored.
+                submission = CancellationSubmission._make(cancel_req.order_id)
+                events.append(CancellationArrivesAtMarketEvent._make(EventType.CANCELLATION_ARRIVES_AT_MARKET,arrival_ns,submission,tz=tz))
+                continue
 
-            new_cancellation = Cancellation(cancel_req.order_id,ts)
+            new_cancellation = Cancellation(cancel_req.order_id,ts,tz)
             self.cancellations[cancel_req.order_id] = new_cancellation
 
             new_cancellation._to_submit()
             self.orders[cancel_req.order_id]._to_cancel_pending()
+            self.dirty_orders.add(cancel_req.order_id)
+            self.dirty_cancellations.add(cancel_req.order_id)
 
             submission = new_cancellation.get_submission()
 
-            events.append(CancellationArrivesAtMarketEvent(EventType.CANCELLATION_ARRIVES_AT_MARKET,ts+self.latency,submission))
+            events.append(CancellationArrivesAtMarketEvent._make(EventType.CANCELLATION_ARRIVES_AT_MARKET,arrival_ns,submission,tz=tz))
 
         return events
     
@@ -81,6 +157,7 @@ class Broker:
             raise RuntimeError("Attempted arrival of nonexistent order.")
         
         self.orders[order_id]._to_live()
+        self.dirty_orders.add(order_id)
 
     def handle_fill(self, fill : "Fill") -> None:
         order_id = fill.order_id
@@ -90,14 +167,24 @@ class Broker:
         if not fill.side == self.orders[order_id].side:
             raise RuntimeError("Order and Fill side disagree.")
         
-        self.orders[order_id].add_fill(fill)
+        order = self.orders[order_id]
+        order.add_fill(fill)
+        self.dirty_orders.add(order_id)
+        if order.state == OrderState.FILLED:
+            self.open_order_ids.pop(order_id,None)
+            if self.archive is not None:
+                self._settle(order_id)
+
         self.portfolio.add_fill(fill)
+        self.fill_count += 1
         self.portfolio.apply_fee(self.fee_model.calculate_fee(fill))
 
     def handle_cancellation_result(self, result : "CancellationResult") -> None:
         order_id = result.order_id
 
         if not order_id in self.orders:
+            if self._is_retired(order_id):
+                return
             raise RuntimeError("Broker received CancellationResult for nonexistent order.")
 
         if not order_id in self.cancellations:
@@ -106,14 +193,80 @@ class Broker:
         if result.cancellation_outcome == CancellationOutcome.CANCELLED:
             self.cancellations[order_id]._to_cancelled()
             self.orders[order_id]._to_cancelled()
+            self.open_order_ids.pop(order_id,None)
+            self.dirty_orders.add(order_id)
         elif result.cancellation_outcome == CancellationOutcome.NO_OP:
             self.cancellations[order_id]._to_no_op()
 
+        self.dirty_cancellations.add(order_id)
+        if self.archive is not None and self.orders[order_id].state in (OrderState.FILLED,OrderState.CANCELLED):
+            self._settle(order_id)
+
+    def _settle(self, order_id : int) -> None:
+        cancellation = self.cancellations.get(order_id)
+        if cancellation is not None and cancellation.state == CancellationState.SUBMITTED:
+            return
+
+        settled = self.settled_order_ids
+        settled[order_id] = None
+        while len(settled) > self.retention.keep:
+            self._retire(next(iter(settled)))
+
+    def _retire(self, order_id : int) -> None:
+        del self.settled_order_ids[order_id]
+        self.archive.add_order(self.orders.pop(order_id),self.cancellations.pop(order_id,None))
+
+        self.dirty_orders.discard(order_id)
+        self.dirty_cancellations.discard(order_id)
+        self.retired_snapshots.add(order_id)
+
+    def _is_retired(self, order_id : int) -> bool:
+        return self.archive is not None and order_broker_id(order_id) == self.broker_id and order_local_id(order_id) < self.current_order_id and order_id not in self.orders
+
+    @property
+    def order_count(self) -> int:
+        """Orders created by this broker, including retired ones."""
+        return self.current_order_id
+
     def _generate_order_id(self) -> int:
-        order_id = self.current_order_id
+        order_id = (self.broker_id << ORDER_ID_BITS) | self.current_order_id
         self.current_order_id += 1
         
         return order_id
     
+    def _refresh_snapshots(self) -> None:
+        retired = self.retired_snapshots
+        if not self.dirty_orders and not self.dirty_cancellations and not retired:
+            return
+
+        if self.dirty_orders or retired:
+            orders = self.orders
+            self.order_snapshots = self.order_snapshots.updated({order_id : orders[order_id].get_snapshot() for order_id in self.dirty_orders},retired)
+            self.dirty_orders.clear()
+
+        if self.dirty_cancellations or retired:
+            cancellations = self.cancellations
+            self.cancellation_snapshots = self.cancellation_snapshots.updated({order_id : cancellations[order_id].get_snapshot() for order_id in self.dirty_cancellations},retired)
+            self.dirty_cancellations.clear()
+
+        retired.clear()
+
+        self.snapshot_version += 1
+
+    def get_open_orders(self) -> Dict[int,"Order"]:
+        return {order_id : self.orders[order_id] for order_id in self.open_order_ids}
+    
+    def orders_frame(self) -> pd.DataFrame:
+        """One row per order in orders or archive, sorted by order id. Orders dropped by SUMMARY_ONLY are only in archive.summary."""
+        working = OrderStore()
+        for order in self.orders.values():
+            working.add_order(order)
+
+        frames = [order_frame({name : working.column(name) for name in ORDER_COLUMNS},working.symbols)]
+        if self.archive is not None:
+            frames.insert(0,self.archive.to_frame())
+
+        return pd.concat(frames,ignore_index=True).sort_values("order_id",ignore_index=True)
+
     def get_snapshot(self):
         return BrokerSnapshot(self)
\ No newline at end of file
@@ -1,10 +1,11 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict,List,TYPE_CHECKING
+from typing import Dict,List,Optional,TYPE_CHECKING
 
 import pandas as pd
 
 from sim.cancellation_submission import CancellationSubmission
+from sim.timestamps import timestamp_tz,to_ns,to_timestamp
 
 if TYPE_CHECKING:
     from sim import *
@@ -24,13 +25,19 @@ class CancellationSnapshot:
 class Cancellation:
     state : "CancellationState"
     order_id : int
-    submission_ts : pd.Timestamp
+    submission_ns : int
+    tz : Optional[object]
 
-    def __init__(self,order_id, submission_ts) -> None:
+    def __init__(self,order_id, submission_ts, tz = None) -> None:
         self.order_id = order_id
-        self.submission_ts = submission_ts
+        self.submission_ns = to_ns(submission_ts)
+        self.tz = timestamp_tz(submission_ts) if tz is None else tz
         self.state = CancellationState.CREATED
 
+    @property
+    def submission_ts(self) -> pd.Timestamp:
+        return to_timestamp(self.submission_ns,self.tz)
+
     def _to_submit(self):
         if self.state == CancellationState.CREATED:
             self.state = CancellationState.SUBMITTED
@@ -50,7 +57,7 @@ class Cancellation:
         return False
     
     def get_submission(self) -> "CancellationSubmission":
-        return CancellationSubmission(self.order_id)
+        return CancellationSubmission._make(self.order_id)
     
     def get_snapshot(self):
         return CancellationSnapshot(self)
\ No newline at end of file
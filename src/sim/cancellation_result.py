@@ -1,14 +1,39 @@
-from dataclasses import dataclass
+from dataclasses import dataclass,field
 from enum import Enum
+from typing import Optional
 
 import pandas as pd
 
+from sim.timestamps import timestamp_tz,to_ns,to_timestamp
+
 class CancellationOutcome(Enum):
     NO_OP = "NO_OP"
     CANCELLED = "CANCELLED"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True,init=False,slots=True)
 class CancellationResult:
     order_id : int
-    ts : pd.Timestamp
-    cancellation_outcome : CancellationOutcome
\ No newline at end of file
+    ts_ns : int
+    cancellation_outcome : CancellationOutcome
+    tz : Optional[object] = field(default=None,kw_only=True,compare=False,repr=False)
+
+    def __init__(self, order_id : int, ts, cancellation_outcome : CancellationOutcome, tz = None) -> None:
+        object.__setattr__(self,"order_id",order_id)
+        object.__setattr__(self,"ts_ns",to_ns(ts))
+        object.__setattr__(self,"cancellation_outcome",cancellation_outcome)
+        object.__setattr__(self,"tz",timestamp_tz(ts) if tz is None else tz)
+
+    @classmethod
+    def _make(cls, order_id : int, ts_ns : int, cancellation_outcome : CancellationOutcome, *, tz = None) -> "CancellationResult":
+        self = object.__new__(cls)
+        _set_order_id(self,order_id)
+        _set_ts_ns(self,ts_ns)
+        _set_cancellation_outcome(self,cancellation_outcome)
+        _set_tz(self,tz)
+        return self
+
+    @property
+    def ts(self) -> pd.Timestamp:
+        return to_timestamp(self.ts_ns,self.tz)
+
+_set_order_id,_set_ts_ns,_set_cancellation_outcome,_set_tz = (getattr(CancellationResult,name).__set__ for name in ["order_id","ts_ns","cancellation_outcome","tz"])
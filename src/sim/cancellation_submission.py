@@ -1,5 +1,13 @@
 from dataclasses import dataclass
 
-@dataclass(frozen=True)
+@dataclass(frozen=True,slots=True)
 class CancellationSubmission:
-    order_id : int
\ No newline at end of file
+    order_id : int
+
+    @classmethod
+    def _make(cls, order_id : int) -> "CancellationSubmission":
+        self = object.__new__(cls)
+        _set_order_id(self,order_id)
+        return self
+
+_set_order_id = CancellationSubmission.order_id.__set__
@@ -0,0 +1,136 @@
+import io
+import os
+import pickle
+import zlib
+from pathlib import Path
+from typing import Any,Dict,Optional,Type,Union,TYPE_CHECKING
+
+import pandas as pd
+
+from sim.timestamps import to_ns_delta
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+Checkpoint
+
+Responsibilities
+- Save the full state of an Engine between two events: queue, enqueue_id, ts, event sources, Broker, Market and strategy state.
+- Rebuild an Engine from a checkpoint and the MarketDatas it ran on.
+
+Design Notes: The state is pickled and zlib compressed. MarketData objects and their column arrays are written as references to the MarketData fingerprint and resolved against the MarketDatas passed on resume, so checkpoints stay small and never copy bar data. Strategy state goes through Strategy.get_state/set_state. Handlers added with register_handler, an attached journal and the checkpoint schedule are not saved and must be set up again after resuming. Event sources over StreamingMarketData hold open readers and cannot be checkpointed.
+"""
+
+CHECKPOINT_MAGIC = b"SIMCKPT1"
+CHECKPOINT_VERSION = 1
+
+PathLike = Union[str,Path]
+
+class _CheckpointPickler(pickle.Pickler):
+    def __init__(self, file, market_datas : Dict[str,"MarketData"]) -> None:
+        super().__init__(file,protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.references = {}
+        for market_data in market_datas.values():
+            fingerprint = market_data.fingerprint
+            self.references[id(market_data)] = ("market_data",fingerprint)
+            for col,column in market_data.columns.items():
+                self.references[id(column)] = ("column",fingerprint,col)
+
+    def persistent_id(self, obj : Any) -> Optional[tuple]:
+        return self.references.get(id(obj))
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    def __init__(self, file, market_datas : Dict[str,"MarketData"]) -> None:
+        super().__init__(file)
+        self.market_datas = {market_data.fingerprint : market_data for market_data in market_datas.values()}
+
+    def persistent_load(self, pid : tuple) -> Any:
+        fingerprint = pid[1]
+        if fingerprint not in self.market_datas:
+            raise ValueError(f"Checkpoint refers to market data that was not provided (fingerprint {fingerprint}).")
+
+        market_data = self.market_datas[fingerprint]
+        if pid[0] == "market_data":
+            return market_data
+        return market_data.columns[pid[2]]
+
+def save_checkpoint(engine : "Engine", path : PathLike) -> None:
+    state = {
+        "version" : CHECKPOINT_VERSION,
+        "ts_ns" : engine.ts_ns,
+        "event_queue" : engine.event_queue,
+        "source_events" : engine.source_events,
+        "broker" : engine.broker,
+        "market" : engine.market,
+        "strategy_state" : engine.strategy.get_state()
+    }
+
+    buffer = io.BytesIO()
+    _CheckpointPickler(buffer,engine.market.market_datas).dump(state)
+
+    # Written to a temporary file first so a crash mid write keeps the previous checkpoint.
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary,"wb") as f:
+        f.write(CHECKPOINT_MAGIC)
+        f.write(zlib.compress(buffer.getbuffer(),1))
+    os.replace(temporary,path)
+
+def load_checkpoint(path : PathLike, strategy : "Strategy", market_datas : Dict[str,"MarketData"], engine_cls : Type["Engine"]) -> "Engine":
+    with open(path,"rb") as f:
+        if f.read(len(CHECKPOINT_MAGIC)) != CHECKPOINT_MAGIC:
+            raise ValueError(f"Not an engine checkpoint: {path}")
+        data = zlib.decompress(f.read())
+
+    state = _CheckpointUnpickler(io.BytesIO(data),market_datas).load()
+    if state["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version ({state['version']}).")
+
+    strategy.set_state(state["strategy_state"])
+
+    engine = engine_cls(strategy,state["broker"],state["market"])
+    engine.event_queue = state["event_queue"]
+    engine.source_events = state["source_events"]
+    engine.ts_ns = state["ts_ns"]
+
+    return engine
+
+class CheckpointSchedule:
+    """
+    Saves a checkpoint every every_events processed events and/or every `every` of simulated time, overwriting the previous one.
+    """
+    path : Path
+    every_events : Optional[int]
+    every_ns : Optional[int]
+    events : int
+    next_ns : Optional[int]
+
+    def __init__(self, path : PathLike, every_events : Optional[int] = None, every : Optional[pd.Timedelta] = None) -> None:
+        if every_events is None and every is None:
+            raise ValueError("CheckpointSchedule created without an event or time interval.")
+        if every_events is not None and every_events <= 0:
+            raise ValueError(f"CheckpointSchedule created with non-positive event interval ({every_events}).")
+
+        self.path = Path(path)
+        self.every_events = every_events
+        self.every_ns = None if every is None else to_ns_delta(every)
+        if self.every_ns is not None and self.every_ns <= 0:
+            raise ValueError(f"CheckpointSchedule created with non-positive time interval ({every}).")
+
+        self.events = 0
+        self.next_ns = None
+
+    def after_event(self, engine : "Engine") -> None:
+        self.events += 1
+
+        if self.every_ns is not None and self.next_ns is None:
+            self.next_ns = engine.ts_ns + self.every_ns
+
+        if (self.every_events is not None and self.events >= self.every_events) or (self.next_ns is not None and engine.ts_ns >= self.next_ns):
+            save_checkpoint(engine,self.path)
+
+            self.events = 0
+            if self.every_ns is not None:
+                self.next_ns = engine.ts_ns + self.every_ns
@@ -1,8 +1,13 @@
-from typing import Dict,Type,TypeVar,Tuple,TYPE_CHECKING
-from queue import PriorityQueue
+import time
+from pathlib import Path
+from typing import Callable,Dict,Iterable,List,Optional,Union,TYPE_CHECKING
 
 import pandas as pd
 
+from sim.checkpoint import CheckpointSchedule,save_checkpoint,load_checkpoint
+from sim.event_scheduler import EventScheduler
+from sim.event_source import EventSource,MarketUpdateSource,StrategyRunSource
+from sim.timestamps import to_timestamp
 from sim.events import Event,EventType,RunStrategyEvent,UpdateMarketDataEvent,FillArrivesAtBrokerEvent,OrderArrivesAtMarketEvent,CancellationArrivesAtBrokerEvent,CancellationArrivesAtMarketEvent
 
 if TYPE_CHECKING:
@@ -18,12 +23,7 @@ EVENT_PRIORITIES : Dict[EventType,int] = {
 }
 
 
-T = TypeVar("T",bound=Event)
-def safe_event_cast(event : Event, cls: Type[T]) -> T:
-    if not isinstance(event,cls):
-        raise TypeError("Invalid event cast")
-
-    return event
+EventHandler = Callable[["Event"],Optional[Iterable["Event"]]]
 
 """
 Engine
@@ -35,92 +35,214 @@ Responsibilities
 - Guarantee execution queue respects temporal and priority restrictions
 
 Design Notes - V1: Engine is extremely minimal in its guardrails. All errors that are not queue related are caught downstream.
+
+Design Notes: Handlers are bound once per event type in a table, extended with register_handler and register_priority. An EventSource keeps one pending event in the queue and is advanced when that event is popped. Journal, profiler and checkpoint schedule are optional hooks of the one run loop.
 """
 
 class Engine:
     strategy : "Strategy"
     broker : "Broker"
     market : "Market"
-    ts : pd.Timestamp
+    ts_ns : int
 
-    event_queue : PriorityQueue[Tuple[pd.Timestamp,int,int,"Event"]]
-    enqueue_id : int
+    event_queue : EventScheduler
+    handlers : Dict["EventType",EventHandler]
+    source_events : Dict[int,EventSource]
+    journal : Optional["EventJournal"]
+    checkpoints : Optional[CheckpointSchedule]
+    profiler : Optional["EngineProfiler"]
 
     def __init__(self, strategy : "Strategy", broker : "Broker",market : "Market") -> None:
         self.strategy = strategy
         self.broker = broker
         self.market = market
-
-        self.event_queue = PriorityQueue()
-        self.enqueue_id = 0
-        self.ts = pd.Timestamp(0)
+        # Events the broker creates from int ns times are shown in the market data tz.
+        broker.tz = market.tz
+
+        self.event_queue = EventScheduler(dict(EVENT_PRIORITIES))
+        self.ts_ns = 0
+        self.source_events = {}
+        self.journal = None
+        self.checkpoints = None
+        self.profiler = None
+
+        self.handlers = {
+            EventType.CANCELLATION_ARRIVES_AT_MARKET : self._handle_cancellation_arrives_at_market,
+            EventType.UPDATE_MARKET_DATA : self._handle_update_market_data,
+            EventType.ORDER_ARRIVES_AT_MARKET : self._handle_order_arrives_at_market,
+            EventType.CANCELLATION_ARRIVES_AT_BROKER : self._handle_cancellation_arrives_at_broker,
+            EventType.FILL_ARRIVES_AT_BROKER : self._handle_fill_arrives_at_broker,
+            EventType.RUN_STRATEGY : self._handle_run_strategy
+        }
+
+    def register_priority(self, event_type, priority : int) -> None:
+        """Queue priority of event_type. Events of a type with a priority but no handler can be queued and raise when processed."""
+        self.event_queue.priorities[event_type] = priority
+
+    def register_handler(self, event_type, handler : EventHandler, priority : Optional[int] = None) -> None:
+        if handler is None:
+            raise ValueError(f"Handler registered as None ({event_type}).")
+
+        if priority is not None:
+            self.register_priority(event_type,priority)
+        elif event_type not in self.event_queue.priorities:
+            raise ValueError(f"Handler registered for event type without priority ({event_type}).")
+
+        self.handlers[event_type] = handler
+
+    def attach_journal(self, journal : Optional["EventJournal"]) -> None:
+        self.journal = journal
+
+    def attach_profiler(self, profiler : Optional["EngineProfiler"]) -> None:
+        self.profiler = profiler
+
+    def checkpoint(self, path : Union[str,Path]) -> None:
+        save_checkpoint(self,path)
+
+    def enable_checkpoints(self, path : Union[str,Path], every_events : Optional[int] = None, every : Optional[pd.Timedelta] = None) -> None:
+        """Checkpoint to path every every_events processed events and/or every `every` of simulated time."""
+        self.checkpoints = CheckpointSchedule(path,every_events,every)
+
+    @classmethod
+    def resume(cls, path : Union[str,Path], strategy : "Strategy", market_datas : Dict[str,"MarketData"]) -> "Engine":
+        """Engine restored from a checkpoint. market_datas must contain the data the checkpointed run used, matched by fingerprint."""
+        return load_checkpoint(path,strategy,market_datas,cls)
+
+    def add_event_source(self, source : EventSource) -> None:
+        event = source.next_event()
+        if event is None:
+            return
+
+        enqueue_id = self.event_queue.enqueue_id
+        self.insert_event(event)
+        self.source_events[enqueue_id] = source
+
+    def add_bar_schedule(self, update_every : int = 1, strategy_every : int = 1) -> None:
+        """Market updates at bar starts and strategy runs at bar ends of every market symbol."""
+        self.add_event_source(MarketUpdateSource(self.market.market_datas,update_every))
+        self.add_event_source(StrategyRunSource(self.market.market_datas,strategy_every))
+
+    @property
+    def ts(self) -> pd.Timestamp:
+        return to_timestamp(self.ts_ns,self.market.tz)
+
+    @property
+    def enqueue_id(self) -> int:
+        return self.event_queue.enqueue_id
     
     def insert_event(self, event : "Event") -> bool:
-        ts = event.ts
-        if ts < self.ts:
+        if event.ts_ns < self.ts_ns:
             raise RuntimeError("Attempt to enqueue past event.")
         
-        self.event_queue.put((ts,EVENT_PRIORITIES[event.event_type],self.get_enqueue_id(),event))
+        self.event_queue.push(event)
+
+        return True
+
+    def insert_events(self, events : List["Event"]) -> bool:
+        if not events:
+            return True
+
+        if min(event.ts_ns for event in events) < self.ts_ns:
+            raise RuntimeError("Attempt to enqueue past event.")
+
+        self.event_queue.push_many(events)
 
         return True
     
     def process_event(self, event : "Event") -> None:
-        ts = event.ts
-        if ts < self.ts:
+        ts = event.ts_ns
+        if ts < self.ts_ns:
             raise RuntimeError("Past event within queue.")
-        self.ts = ts
-        
-        match event.event_type:
-            case EventType.CANCELLATION_ARRIVES_AT_MARKET:
-                event = safe_event_cast(event,CancellationArrivesAtMarketEvent)
-                
-                results = self.market.handle_cancellation_arrival(ts,event.cancellation_submission)
+        self.ts_ns = ts
 
-                for ev in results:
-                    self.insert_event(ev)
+        handler = self.handlers.get(event.event_type)
+        if handler is None:
+            raise RuntimeError(f"No handler registered for event type ({event.event_type}).")
 
-            case EventType.UPDATE_MARKET_DATA:
-                event = safe_event_cast(event,UpdateMarketDataEvent)
+        results = handler(event)
+        if results:
+            self.insert_events(results)
 
-                results = self.market.handle_market_update(ts)
+    def _handle_cancellation_arrives_at_market(self, event : "CancellationArrivesAtMarketEvent") -> List["Event"]:
+        return self.market.handle_cancellation_arrival(event.ts_ns,event.cancellation_submission)
 
-                for ev in results:
-                    self.insert_event(ev)
-                
-            case EventType.ORDER_ARRIVES_AT_MARKET:
-                event = safe_event_cast(event,OrderArrivesAtMarketEvent)
+    def _handle_update_market_data(self, event : "UpdateMarketDataEvent") -> List["Event"]:
+        return self.market.handle_market_update(event.ts_ns)
 
-                results = self.market.handle_order_arrival(ts,event.order_submission)
-                self.broker.handle_order_arrival(event.order_submission.order_id)
+    def _handle_order_arrives_at_market(self, event : "OrderArrivesAtMarketEvent") -> List["Event"]:
+        results = self.market.handle_order_arrival(event.ts_ns,event.order_submission)
+        self.broker.handle_order_arrival(event.order_submission.order_id)
 
-                for ev in results:
-                    self.insert_event(ev)
+        return results
 
-            case EventType.CANCELLATION_ARRIVES_AT_BROKER:
-                event = safe_event_cast(event,CancellationArrivesAtBrokerEvent)
+    def _handle_cancellation_arrives_at_broker(self, event : "CancellationArrivesAtBrokerEvent") -> None:
+        self.broker.handle_cancellation_result(event.cancellation_result)
 
-                self.broker.handle_cancellation_result(event.cancellation_result)
+    def _handle_fill_arrives_at_broker(self, event : "FillArrivesAtBrokerEvent") -> None:
+        self.broker.handle_fill(event.fill)
 
-            case EventType.FILL_ARRIVES_AT_BROKER:
-                event = safe_event_cast(event,FillArrivesAtBrokerEvent)
+    def _handle_run_strategy(self, event : "RunStrategyEvent") -> List["Event"]:
+        ts = event.ts_ns
+        market_snapshot = self._section("snapshot.market",self.market.get_snapshot,ts)
+        broker_snapshot = self._section("snapshot.broker",self.broker.get_snapshot)
+        results = self._section("strategy.run",self.strategy.run,market_snapshot,broker_snapshot)
+        if self.journal is not None:
+            self.journal.record_requests(ts,*results)
 
-                self.broker.handle_fill(event.fill)
-            case EventType.RUN_STRATEGY:
-                event = safe_event_cast(event,RunStrategyEvent)
+        return self._section("broker.handle_requests",self.broker.handle_requests,ts,*results)
 
-                results = self.strategy.run(self.market.get_snapshot(ts),self.broker.get_snapshot())
+    def _section(self, section : str, fn : Callable, *args):
+        """fn(*args), timed under section when a profiler is attached."""
+        if self.profiler is None:
+            return fn(*args)
+        return self.profiler.call(section,fn,*args)
 
-                for ev in self.broker.handle_requests(ts,*results):
-                    self.insert_event(ev)
-    
     def run(self) -> None:
-        while not self.event_queue.empty():
-            ts,priority,enqueue_id,event = self.event_queue.get()
+        profiler = self.profiler
+        if profiler is None:
+            self._loop(None)
+            return
+
+        begin = time.perf_counter()
+        try:
+            with profiler.instrument_market_datas(self.market.market_datas):
+                self._loop(profiler)
+        finally:
+            profiler.wall_time += time.perf_counter() - begin
+
+    def _loop(self, profiler : Optional["EngineProfiler"]) -> None:
+        event_queue = self.event_queue
+        source_events = self.source_events
+        journal = self.journal
+        perf_counter = time.perf_counter
+
+        after_event = None
+        if self.checkpoints is not None:
+            after_event = self.checkpoints.after_event if profiler is None else profiler.timed("checkpoint",self.checkpoints.after_event)
+
+        while event_queue:
+            if profiler is not None:
+                start = perf_counter()
+            ts,priority,enqueue_id,event = event_queue.pop()
+
+            if source_events:
+                source = source_events.pop(enqueue_id,None)
+                if source is not None:
+                    self.add_event_source(source)
+
+            if journal is not None:
+                journal.record(event,priority,enqueue_id)
 
             self.process_event(event)
 
-    
+            if profiler is not None:
+                profiler.record_event(event.event_type,perf_counter() - start,ts,len(event_queue))
+
+            if after_event is not None:
+                after_event(self)
+
+        if journal is not None:
+            journal.flush()
+
     def get_enqueue_id(self) -> int:
-        enqueue_id = self.enqueue_id
-        self.enqueue_id += 1
-        return enqueue_id
\ No newline at end of file
+        return self.event_queue.next_enqueue_id()
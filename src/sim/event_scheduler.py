@@ -0,0 +1,59 @@
+from heapq import heapify,heappop,heappush
+from typing import Dict,List,Sequence,Tuple,TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+EventScheduler
+
+Responsibilities
+- Order pending events by (ts in int nanoseconds, event priority, enqueue_id).
+
+Design Notes: The engine loop is single threaded, so a plain heapq list replaces queue.PriorityQueue and its locking. Heap entries only compare ints, enqueue_id is unique so events themselves are never compared.
+"""
+
+class EventScheduler:
+    heap : List[Tuple[int,int,int,"Event"]]
+    priorities : Dict["EventType",int]
+    enqueue_id : int
+
+    def __init__(self, priorities : Dict["EventType",int]) -> None:
+        self.heap = []
+        self.priorities = priorities
+        self.enqueue_id = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def empty(self) -> bool:
+        return not self.heap
+
+    def next_enqueue_id(self) -> int:
+        enqueue_id = self.enqueue_id
+        self.enqueue_id += 1
+        return enqueue_id
+
+    def push(self, event : "Event") -> None:
+        heappush(self.heap,(event.ts_ns,self.priorities[event.event_type],self.next_enqueue_id(),event))
+
+    def push_many(self, events : Sequence["Event"]) -> None:
+        priorities = self.priorities
+        first_id = self.enqueue_id
+        self.enqueue_id += len(events)
+
+        entries = [(event.ts_ns,priorities[event.event_type],first_id + i,event) for i,event in enumerate(events)]
+
+        heap = self.heap
+        if len(entries) > len(heap):
+            heap.extend(entries)
+            heapify(heap)
+        else:
+            for entry in entries:
+                heappush(heap,entry)
+
+    def pop(self) -> Tuple[int,int,int,"Event"]:
+        return heappop(self.heap)
+
+    def peek(self) -> Tuple[int,int,int,"Event"]:
+        return self.heap[0]
@@ -0,0 +1,115 @@
+from abc import ABC,abstractmethod
+from heapq import heapify,heapreplace,heappop
+from typing import Dict,Iterator,List,Optional,Tuple,Type,TYPE_CHECKING
+
+import numpy as np
+
+from sim.events import Event,EventType,RunStrategyEvent,UpdateMarketDataEvent
+from sim.market_data import market_tz
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+EventSource
+
+Responsibilities
+- Produce simulation events lazily in non decreasing timestamp order.
+
+Design Notes: The engine holds only the next pending event of each source in its queue and pulls the following one when it is processed. Sources keep plain positional state within the current boundary chunk of each MarketData. In memory MarketData has a single chunk, streamed MarketData reads further chunks as the source advances.
+"""
+
+class EventSource(ABC):
+    @abstractmethod
+    def next_event(self) -> Optional["Event"]:
+        """Next event, or None once the source is exhausted."""
+        pass
+
+class BarBoundarySource(EventSource):
+    """
+    Emits one event per distinct bar boundary across the given MarketDatas, optionally only every n-th boundary.
+    """
+    chunks : List[Iterator[np.ndarray]]
+    boundaries : List[Optional[np.ndarray]]
+    event_cls : Type["Event"]
+    event_type : "EventType"
+    trusted : bool
+    tz : Optional[object]
+    every : int
+
+    heap : List[Tuple[int,int]]
+    positions : List[int]
+    last_ns : Optional[int]
+    count : int
+
+    def __init__(self, market_datas : Dict[str,"MarketData"], column : str, event_cls : Type["Event"], event_type : "EventType", every : int = 1) -> None:
+        if every <= 0:
+            raise ValueError(f"BarBoundarySource created with non-positive cadence ({every}).")
+
+        self.event_cls = event_cls
+        self.trusted = "_make" in vars(event_cls)
+        self.tz = market_tz(market_datas)
+        self.event_type = event_type
+        self.every = every
+
+        self.chunks = [market_data.boundary_chunks(column) for market_data in market_datas.values()]
+        self.boundaries = [self._next_chunk(i) for i in range(len(self.chunks))]
+
+        self.positions = [0] * len(self.boundaries)
+        self.heap = [(int(boundary[0]),i) for i,boundary in enumerate(self.boundaries) if boundary is not None]
+        heapify(self.heap)
+
+        self.last_ns = None
+        self.count = 0
+
+    def _next_chunk(self, i : int) -> Optional[np.ndarray]:
+        for chunk in self.chunks[i]:
+            if len(chunk) > 0:
+                return chunk
+        return None
+
+    def _next_boundary(self) -> Optional[int]:
+        heap = self.heap
+        while heap:
+            ns,i = heap[0]
+
+            position = self.positions[i] + 1
+            boundary = self.boundaries[i]
+            if position == len(boundary):
+                boundary = self._next_chunk(i)
+                self.boundaries[i] = boundary
+                position = 0
+            self.positions[i] = position
+
+            if boundary is not None:
+                heapreplace(heap,(int(boundary[position]),i))
+            else:
+                heappop(heap)
+
+            if ns != self.last_ns:
+                self.last_ns = ns
+                return ns
+
+        return None
+
+    def next_event(self) -> Optional["Event"]:
+        while True:
+            ns = self._next_boundary()
+            if ns is None:
+                return None
+
+            self.count += 1
+            if (self.count - 1) % self.every == 0:
+                if self.trusted:
+                    return self.event_cls._make(self.event_type,ns,tz=self.tz)
+                return self.event_cls(self.event_type,ns,tz=self.tz)
+
+class MarketUpdateSource(BarBoundarySource):
+    """UpdateMarketDataEvents at bar start_ts."""
+    def __init__(self, market_datas : Dict[str,"MarketData"], every : int = 1) -> None:
+        super().__init__(market_datas,"start_ts",UpdateMarketDataEvent,EventType.UPDATE_MARKET_DATA,every)
+
+class StrategyRunSource(BarBoundarySource):
+    """RunStrategyEvents at bar end_ts, once the bar is observable in snapshots."""
+    def __init__(self, market_datas : Dict[str,"MarketData"], every : int = 1) -> None:
+        super().__init__(market_datas,"end_ts",RunStrategyEvent,EventType.RUN_STRATEGY,every)
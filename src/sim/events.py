@@ -1,9 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass,field
 from enum import Enum
-from typing import TYPE_CHECKING
+from typing import Optional,TYPE_CHECKING
 
 import pandas as pd
 
+from sim.timestamps import timestamp_tz,to_ns,to_timestamp
+
 if TYPE_CHECKING:
     from sim import *
 
@@ -15,31 +17,133 @@ class EventType(Enum):
     FILL_ARRIVES_AT_BROKER = "FILL_ARRIVES_AT_BROKER"
     CANCELLATION_ARRIVES_AT_BROKER = "CANCELLATION_ARRIVES_AT_BROKER"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True,init=False,slots=True)
 class Event:
+    """
+    Event
+
+    Design Notes: The time is kept as int ns in ts_ns. Constructors take it as ts, a pd.Timestamp or int ns, as before, and ts reads it back as a pd.Timestamp in tz, taken from an aware ts unless given. Dataclass subclasses that generate their own __init__ are converted in __post_init__.
+
+    Design Notes - _make: Each event class has a _make classmethod for simulator internals, taking ts_ns as int ns and writing the fields through their slot descriptors, bound once at the end of the module, without conversion. Subclasses do not inherit a usable _make, they define their own.
+    """
     event_type : EventType
-    ts : pd.Timestamp
+    ts_ns : int
+    tz : Optional[object] = field(default=None,kw_only=True,compare=False,repr=False)
+
+    def __init__(self, event_type : EventType, ts, tz = None) -> None:
+        object.__setattr__(self,"event_type",event_type)
+        object.__setattr__(self,"ts_ns",to_ns(ts))
+        object.__setattr__(self,"tz",timestamp_tz(ts) if tz is None else tz)
 
-@dataclass(frozen=True)
+    @classmethod
+    def _make(cls, event_type : EventType, ts_ns : int, *, tz = None) -> "Event":
+        self = object.__new__(cls)
+        _set_event_type(self,event_type)
+        _set_ts_ns(self,ts_ns)
+        _set_tz(self,tz)
+        return self
+
+    def __post_init__(self):
+        if type(self.ts_ns) is not int:
+            if self.tz is None:
+                object.__setattr__(self,"tz",timestamp_tz(self.ts_ns))
+            object.__setattr__(self,"ts_ns",to_ns(self.ts_ns))
+
+    @property
+    def ts(self) -> pd.Timestamp:
+        return to_timestamp(self.ts_ns,self.tz)
+
+@dataclass(frozen=True,init=False,slots=True)
 class RunStrategyEvent(Event):
-    pass
+    @classmethod
+    def _make(cls, event_type : EventType, ts_ns : int, *, tz = None) -> "RunStrategyEvent":
+        self = object.__new__(cls)
+        _set_event_type(self,event_type)
+        _set_ts_ns(self,ts_ns)
+        _set_tz(self,tz)
+        return self
 
-@dataclass(frozen=True)
+@dataclass(frozen=True,init=False,slots=True)
 class UpdateMarketDataEvent(Event):
-    pass
+    @classmethod
+    def _make(cls, event_type : EventType, ts_ns : int, *, tz = None) -> "UpdateMarketDataEvent":
+        self = object.__new__(cls)
+        _set_event_type(self,event_type)
+        _set_ts_ns(self,ts_ns)
+        _set_tz(self,tz)
+        return self
 
-@dataclass(frozen=True)
+@dataclass(frozen=True,init=False,slots=True)
 class OrderArrivesAtMarketEvent(Event):
     order_submission : "OrderSubmission"
 
-@dataclass(frozen=True)
+    def __init__(self, event_type : EventType, ts, order_submission : "OrderSubmission", tz = None) -> None:
+        Event.__init__(self,event_type,ts,tz)
+        object.__setattr__(self,"order_submission",order_submission)
+
+    @classmethod
+    def _make(cls, event_type : EventType, ts_ns : int, order_submission : "OrderSubmission", *, tz = None) -> "OrderArrivesAtMarketEvent":
+        self = object.__new__(cls)
+        _set_event_type(self,event_type)
+        _set_ts_ns(self,ts_ns)
+        _set_order_submission(self,order_submission)
+        _set_tz(self,tz)
+        return self
+
+@dataclass(frozen=True,init=False,slots=True)
 class CancellationArrivesAtMarketEvent(Event):
     cancellation_submission : "CancellationSubmission"
 
-@dataclass(frozen=True)
+    def __init__(self, event_type : EventType, ts, cancellation_submission : "CancellationSubmission", tz = None) -> None:
+        Event.__init__(self,event_type,ts,tz)
+        object.__setattr__(self,"cancellation_submission",cancellation_submission)
+
+    @classmethod
+    def _make(cls, event_type : EventType, ts_ns : int, cancellation_submission : "CancellationSubmission", *, tz = None) -> "CancellationArrivesAtMarketEvent":
+        self = object.__new__(cls)
+        _set_event_type(self,event_type)
+        _set_ts_ns(self,ts_ns)
+        _set_cancellation_submission(self,cancellation_submission)
+        _set_tz(self,tz)
+        return self
+
+@dataclass(frozen=True,init=False,slots=True)
 class FillArrivesAtBrokerEvent(Event):
     fill : "Fill"
 
-@dataclass(frozen=True)
+    def __init__(self, event_type : EventType, ts, fill : "Fill", tz = None) -> None:
+        Event.__init__(self,event_type,ts,tz)
+        object.__setattr__(self,"fill",fill)
+
+    @classmethod
+    def _make(cls, event_type : EventType, ts_ns : int, fill : "Fill", *, tz = None) -> "FillArrivesAtBrokerEvent":
+        self = object.__new__(cls)
+        _set_event_type(self,event_type)
+        _set_ts_ns(self,ts_ns)
+        _set_fill(self,fill)
+        _set_tz(self,tz)
+        return self
+
+@dataclass(frozen=True,init=False,slots=True)
 class CancellationArrivesAtBrokerEvent(Event):
-    cancellation_result : "CancellationResult"
\ No newline at end of file
+    cancellation_result : "CancellationResult"
+
+    def __init__(self, event_type : EventType, ts, cancellation_result : "CancellationResult", tz = None) -> None:
+        Event.__init__(self,event_type,ts,tz)
+        object.__setattr__(self,"cancellation_result",cancellation_result)
+
+    @classmethod
+    def _make(cls, event_type : EventType, ts_ns : int, cancellation_result : "CancellationResult", *, tz = None) -> "CancellationArrivesAtBrokerEvent":
+        self = object.__new__(cls)
+        _set_event_type(self,event_type)
+        _set_ts_ns(self,ts_ns)
+        _set_cancellation_result(self,cancellation_result)
+        _set_tz(self,tz)
+        return self
+
+# Slot descriptors of the final slotted classes, bound once for the _make constructors.
+_set_event_type,_set_ts_ns,_set_tz = Event.event_type.__set__,Event.ts_ns.__set__,Event.tz.__set__
+_set_order_submission = OrderArrivesAtMarketEvent.order_submission.__set__
+_set_cancellation_submission = CancellationArrivesAtMarketEvent.cancellation_submission.__set__
+_set_fill = FillArrivesAtBrokerEvent.fill.__set__
+_set_cancellation_result = CancellationArrivesAtBrokerEvent.cancellation_result.__set__
@@ -1,20 +1,51 @@
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from dataclasses import dataclass,field
+from typing import Optional,TYPE_CHECKING
 
 import pandas as pd
 
+from sim.timestamps import timestamp_tz,to_ns,to_timestamp
+
 if TYPE_CHECKING:
     from sim import *
 
-@dataclass(frozen=True)
+@dataclass(frozen=True,init=False,slots=True)
 class Fill:
     order_id : int
     qty : int
     symbol : str
     side : "OrderSide"
     fill_price : float
-    ts : pd.Timestamp
+    ts_ns : int
+    tz : Optional[object] = field(default=None,kw_only=True,compare=False,repr=False)
+
+    def __init__(self, order_id : int, qty : int, symbol : str, side : "OrderSide", fill_price : float, ts, tz = None) -> None:
+        if qty <= 0:
+            raise ValueError(f"Fill created with nonpositive qty ({qty}).")
+
+        object.__setattr__(self,"order_id",order_id)
+        object.__setattr__(self,"qty",qty)
+        object.__setattr__(self,"symbol",symbol)
+        object.__setattr__(self,"side",side)
+        object.__setattr__(self,"fill_price",fill_price)
+        object.__setattr__(self,"ts_ns",to_ns(ts))
+        object.__setattr__(self,"tz",timestamp_tz(ts) if tz is None else tz)
+
+    @classmethod
+    def _make(cls, order_id : int, qty : int, symbol : str, side : "OrderSide", fill_price : float, ts_ns : int, *, tz = None) -> "Fill":
+        """Fill from values the Market already validated, ts_ns in int ns."""
+        self = object.__new__(cls)
+        _set_order_id(self,order_id)
+        _set_qty(self,qty)
+        _set_symbol(self,symbol)
+        _set_side(self,side)
+        _set_fill_price(self,fill_price)
+        _set_ts_ns(self,ts_ns)
+        _set_tz(self,tz)
+        return self
+
+    @property
+    def ts(self) -> pd.Timestamp:
+        return to_timestamp(self.ts_ns,self.tz)
 
-    def __post_init__(self):
-        if self.qty <= 0:
-            raise ValueError(f"Fill created with nonpositive qty ({self.qty}).")
\ No newline at end of file
+# Slot descriptors of the final slotted class, bound once for _make.
+_set_order_id,_set_qty,_set_symbol,_set_side,_set_fill_price,_set_ts_ns,_set_tz = (getattr(Fill,name).__set__ for name in ["order_id","qty","symbol","side","fill_price","ts_ns","tz"])
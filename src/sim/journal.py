@@ -0,0 +1,343 @@
+import json
+import struct
+from collections import deque
+from pathlib import Path
+from typing import Deque,Dict,Iterator,List,Optional,Tuple,Union,TYPE_CHECKING
+
+import numpy as np
+
+from sim.cancellation_request import CancellationRequest
+from sim.cancellation_result import CancellationOutcome,CancellationResult
+from sim.cancellation_submission import CancellationSubmission
+from sim.engine import Engine
+from sim.event_source import EventSource
+from sim.events import Event,EventType,RunStrategyEvent,UpdateMarketDataEvent,FillArrivesAtBrokerEvent,OrderArrivesAtMarketEvent,CancellationArrivesAtBrokerEvent,CancellationArrivesAtMarketEvent
+from sim.fill import Fill
+from sim.order_request import OrderRequest,OrderSide,OrderType
+from sim.order_submission import OrderSubmission
+from sim.strategy import Strategy
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+Event Journal
+
+Responsibilities
+- Record every event processed by an Engine, and the requests each strategy run returned, to a binary file.
+- Load a journal back as columns or as events.
+- Replay recorded order flow through a Broker and Market without running the strategy.
+
+Design Notes - Format: The file is a magic string followed by blocks. A block is a length prefixed JSON header (row count, kind and symbol tables) and then each record field as one contiguous little endian column. Rows are buffered as tuples and converted to columns once per block, so recording an event costs one tuple append. Kind and symbol tables are append only, each header carries the full tables so far.
+
+Design Notes - Replay: Market updates and strategy runs are the only events not created by a handler. Replay feeds them back in recorded order as an EventSource and answers each strategy run with its recorded requests, so the Broker and Market regenerate everything else. Swapping the fee model reproduces the run exactly. Swapping the fill logic replays the same requests open loop, the strategy cannot react to the different fills.
+"""
+
+JOURNAL_MAGIC = b"SIMJRNL1"
+
+ORDER_REQUEST = "ORDER_REQUEST"
+CANCELLATION_REQUEST = "CANCELLATION_REQUEST"
+
+RECORD_DTYPE = np.dtype([
+    ("kind","<u1"),
+    ("ts_ns","<i8"),
+    ("priority","<i4"),
+    ("enqueue_id","<i8"),
+    ("order_id","<i8"),
+    ("qty","<i8"),
+    ("price","<f8"),
+    ("aux_ns","<i8"),
+    ("symbol","<i4"),
+    ("side","<i1"),
+    ("order_type","<i1"),
+    ("outcome","<i1")
+])
+
+SIDES = [None,OrderSide.BUY,OrderSide.SELL]
+ORDER_TYPES = [None,OrderType.MARKET,OrderType.LIMIT]
+OUTCOMES = [None,CancellationOutcome.NO_OP,CancellationOutcome.CANCELLED]
+
+SIDE_CODES = {side : i for i,side in enumerate(SIDES)}
+ORDER_TYPE_CODES = {order_type : i for i,order_type in enumerate(ORDER_TYPES)}
+OUTCOME_CODES = {outcome : i for i,outcome in enumerate(OUTCOMES)}
+
+PathLike = Union[str,Path]
+
+def _kind_name(event_type) -> str:
+    if isinstance(event_type,EventType):
+        return event_type.name
+    return f"{type(event_type).__qualname__}.{event_type.name}"
+
+class EventJournal:
+    """
+    Buffered journal writer. Attach to an Engine with Engine.attach_journal and close (or use as a context manager) once done.
+    """
+    block_size : int
+    rows : List[tuple]
+    kinds : List[str]
+    kind_codes : Dict[object,int]
+    symbols : List[str]
+    symbol_codes : Dict[str,int]
+
+    def __init__(self, path : PathLike, block_size : int = 65536) -> None:
+        if block_size <= 0:
+            raise ValueError(f"EventJournal created with non-positive block size ({block_size}).")
+
+        self.file = open(path,"wb")
+        self.file.write(JOURNAL_MAGIC)
+        self.block_size = block_size
+        self.rows = []
+
+        self.kinds = [event_type.name for event_type in EventType] + [ORDER_REQUEST,CANCELLATION_REQUEST]
+        self.kind_codes = {event_type : i for i,event_type in enumerate(EventType)}
+        self.kind_codes[ORDER_REQUEST] = len(EventType)
+        self.kind_codes[CANCELLATION_REQUEST] = len(EventType) + 1
+
+        self.symbols = []
+        self.symbol_codes = {}
+
+    def _add_kind(self, event_type) -> int:
+        kind = len(self.kinds)
+        self.kinds.append(_kind_name(event_type))
+        self.kind_codes[event_type] = kind
+        return kind
+
+    def _symbol(self, symbol : str) -> int:
+        code = self.symbol_codes.get(symbol)
+        if code is None:
+            code = len(self.symbols)
+            self.symbols.append(symbol)
+            self.symbol_codes[symbol] = code
+        return code
+
+    def record(self, event : "Event", priority : int, enqueue_id : int) -> None:
+        event_type = event.event_type
+        kind = self.kind_codes.get(event_type)
+        if kind is None:
+            kind = self._add_kind(event_type)
+        ts = event.ts_ns
+
+        if event_type is EventType.FILL_ARRIVES_AT_BROKER:
+            fill = event.fill
+            row = (kind,ts,priority,enqueue_id,fill.order_id,fill.qty,fill.fill_price,fill.ts_ns,self._symbol(fill.symbol),SIDE_CODES[fill.side],0,0)
+        elif event_type is EventType.ORDER_ARRIVES_AT_MARKET:
+            submission = event.order_submission
+            limit = np.nan if submission.limit is None else submission.limit
+            row = (kind,ts,priority,enqueue_id,submission.order_id,submission.qty,limit,0,self._symbol(submission.symbol),SIDE_CODES[submission.side],ORDER_TYPE_CODES[submission.order_type],0)
+        elif event_type is EventType.CANCELLATION_ARRIVES_AT_MARKET:
+            row = (kind,ts,priority,enqueue_id,event.cancellation_submission.order_id,0,np.nan,0,-1,0,0,0)
+        elif event_type is EventType.CANCELLATION_ARRIVES_AT_BROKER:
+            result = event.cancellation_result
+            row = (kind,ts,priority,enqueue_id,result.order_id,0,np.nan,result.ts_ns,-1,0,0,OUTCOME_CODES[result.cancellation_outcome])
+        else:
+            row = (kind,ts,priority,enqueue_id,-1,0,np.nan,0,-1,0,0,0)
+
+        self.rows.append(row)
+        if len(self.rows) >= self.block_size:
+            self.flush()
+
+    def record_requests(self, ts_ns : int, order_requests : List["OrderRequest"], cancellation_requests : List["CancellationRequest"]) -> None:
+        rows = self.rows
+
+        for request in order_requests:
+            limit = np.nan if request.limit is None else request.limit
+            rows.append((len(EventType),ts_ns,-1,-1,-1,request.qty,limit,0,self._symbol(request.symbol),SIDE_CODES[request.side],ORDER_TYPE_CODES[request.order_type],0))
+
+        for request in cancellation_requests:
+            rows.append((len(EventType) + 1,ts_ns,-1,-1,request.order_id,0,np.nan,0,-1,0,0,0))
+
+        if len(rows) >= self.block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.rows:
+            block = np.array(self.rows,dtype=RECORD_DTYPE)
+            header = json.dumps({"length" : len(block), "kinds" : self.kinds, "symbols" : self.symbols}).encode()
+
+            self.file.write(struct.pack("<I",len(header)))
+            self.file.write(header)
+            for name in RECORD_DTYPE.names:
+                self.file.write(np.ascontiguousarray(block[name]).tobytes())
+
+            self.rows = []
+
+        self.file.flush()
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self) -> "EventJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class Journal:
+    """
+    A loaded journal. columns holds one array per record field, kind and symbol columns index into kinds and symbols.
+    """
+    columns : Dict[str,np.ndarray]
+    kinds : List[str]
+    symbols : List[str]
+
+    def __init__(self, columns : Dict[str,np.ndarray], kinds : List[str], symbols : List[str]) -> None:
+        self.columns = columns
+        self.kinds = kinds
+        self.symbols = symbols
+
+    def __len__(self) -> int:
+        return len(self.columns["kind"])
+
+    def kind_code(self, name : str) -> int:
+        return self.kinds.index(name)
+
+    def event_mask(self) -> np.ndarray:
+        """Rows recording processed events, as opposed to strategy requests."""
+        kind = self.columns["kind"]
+        return (kind != self.kind_code(ORDER_REQUEST)) & (kind != self.kind_code(CANCELLATION_REQUEST))
+
+    def _order_request(self, i : int) -> OrderRequest:
+        columns = self.columns
+        limit = float(columns["price"][i])
+
+        return OrderRequest(side=SIDES[columns["side"][i]],
+                            order_type=ORDER_TYPES[columns["order_type"][i]],
+                            qty=int(columns["qty"][i]),
+                            symbol=self.symbols[columns["symbol"][i]],
+                            limit=None if np.isnan(limit) else limit)
+
+    def _event(self, i : int, tz = None) -> "Event":
+        columns = self.columns
+        name = self.kinds[columns["kind"][i]]
+        ts = int(columns["ts_ns"][i])
+        order_id = int(columns["order_id"][i])
+
+        if name not in EventType.__members__:
+            # Custom event types are journaled by name and time only.
+            return Event(name,ts,tz)
+
+        event_type = EventType[name]
+        if event_type is EventType.RUN_STRATEGY:
+            return RunStrategyEvent(event_type,ts,tz)
+        if event_type is EventType.UPDATE_MARKET_DATA:
+            return UpdateMarketDataEvent(event_type,ts,tz)
+        if event_type is EventType.ORDER_ARRIVES_AT_MARKET:
+            request = self._order_request(i)
+            submission = OrderSubmission(order_id=order_id,side=request.side,qty=request.qty,symbol=request.symbol,order_type=request.order_type,limit=request.limit)
+            return OrderArrivesAtMarketEvent(event_type,ts,submission,tz)
+        if event_type is EventType.CANCELLATION_ARRIVES_AT_MARKET:
+            return CancellationArrivesAtMarketEvent(event_type,ts,CancellationSubmission(order_id),tz)
+        if event_type is EventType.FILL_ARRIVES_AT_BROKER:
+            fill = Fill(order_id=order_id,
+                        qty=int(columns["qty"][i]),
+                        symbol=self.symbols[columns["symbol"][i]],
+                        side=SIDES[columns["side"][i]],
+                        fill_price=float(columns["price"][i]),
+                        ts=int(columns["aux_ns"][i]),
+                        tz=tz)
+            return FillArrivesAtBrokerEvent(event_type,ts,fill,tz)
+
+        result = CancellationResult(order_id,int(columns["aux_ns"][i]),OUTCOMES[columns["outcome"][i]],tz)
+        return CancellationArrivesAtBrokerEvent(event_type,ts,result,tz)
+
+    def events(self, tz = None) -> Iterator[Tuple["Event",int,int]]:
+        """(event, priority, enqueue_id) for every processed event, in processing order. Times are recorded as UTC ns, tz is the timezone to show them in."""
+        priority,enqueue_id = self.columns["priority"],self.columns["enqueue_id"]
+        for i in np.flatnonzero(self.event_mask()):
+            yield self._event(i,tz),int(priority[i]),int(enqueue_id[i])
+
+    def requests(self) -> Iterator[Tuple[int,List["OrderRequest"],List["CancellationRequest"]]]:
+        """(ts_ns, order requests, cancellation requests) for every recorded strategy run, in processing order."""
+        columns = self.columns
+        run,order,cancellation = self.kind_code(EventType.RUN_STRATEGY.name),self.kind_code(ORDER_REQUEST),self.kind_code(CANCELLATION_REQUEST)
+
+        kind = columns["kind"]
+        current = None
+        for i in np.flatnonzero((kind == run) | (kind == order) | (kind == cancellation)):
+            if kind[i] == run:
+                if current is not None:
+                    yield current
+                current = (int(columns["ts_ns"][i]),[],[])
+            elif kind[i] == order:
+                current[1].append(self._order_request(i))
+            else:
+                current[2].append(CancellationRequest(int(columns["order_id"][i])))
+
+        if current is not None:
+            yield current
+
+def load_journal(path : PathLike) -> Journal:
+    blocks = []
+    kinds,symbols = [],[]
+
+    with open(path,"rb") as f:
+        if f.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise ValueError(f"Not an event journal: {path}")
+
+        while size := f.read(4):
+            header = json.loads(f.read(struct.unpack("<I",size)[0]))
+            length = header["length"]
+            kinds,symbols = header["kinds"],header["symbols"]
+
+            block = {}
+            for name in RECORD_DTYPE.names:
+                dtype = RECORD_DTYPE[name]
+                data = f.read(length * dtype.itemsize)
+                if len(data) != length * dtype.itemsize:
+                    raise ValueError(f"Event journal truncated in column: {name}")
+                block[name] = np.frombuffer(data,dtype=dtype)
+            blocks.append(block)
+
+    columns = {name : np.concatenate([block[name] for block in blocks]) if blocks else np.empty(0,dtype=RECORD_DTYPE[name]) for name in RECORD_DTYPE.names}
+    return Journal(columns,kinds or [event_type.name for event_type in EventType] + [ORDER_REQUEST,CANCELLATION_REQUEST],symbols)
+
+class JournalReplay(EventSource):
+    """
+    Recorded market updates and strategy runs, with the requests each run returned.
+    """
+    ts_ns : np.ndarray
+    is_run : np.ndarray
+    position : int
+    pending_requests : Deque[Tuple[List["OrderRequest"],List["CancellationRequest"]]]
+    tz : Optional[object]
+
+    def __init__(self, journal : Journal, tz = None) -> None:
+        kind = journal.columns["kind"]
+        run,update = journal.kind_code(EventType.RUN_STRATEGY.name),journal.kind_code(EventType.UPDATE_MARKET_DATA.name)
+
+        roots = np.flatnonzero((kind == run) | (kind == update))
+        self.ts_ns = journal.columns["ts_ns"][roots]
+        self.is_run = kind[roots] == run
+        self.position = 0
+        self.tz = tz
+
+        self.pending_requests = deque((orders,cancellations) for _,orders,cancellations in journal.requests())
+
+    def next_event(self) -> Optional["Event"]:
+        i = self.position
+        if i == len(self.ts_ns):
+            return None
+        self.position = i + 1
+
+        if self.is_run[i]:
+            return RunStrategyEvent._make(EventType.RUN_STRATEGY,int(self.ts_ns[i]),tz=self.tz)
+        return UpdateMarketDataEvent._make(EventType.UPDATE_MARKET_DATA,int(self.ts_ns[i]),tz=self.tz)
+
+    def next_requests(self) -> Tuple[List["OrderRequest"],List["CancellationRequest"]]:
+        return self.pending_requests.popleft()
+
+def replay_journal(journal : Journal, broker : "Broker", market : "Market") -> Engine:
+    """Run the recorded order flow through broker and market, returns the finished engine."""
+    replay = JournalReplay(journal,market.tz)
+    engine = Engine(Strategy(),broker,market)
+
+    def handle_run_strategy(event : "RunStrategyEvent") -> List["Event"]:
+        return broker.handle_requests(event.ts_ns,*replay.next_requests())
+
+    engine.register_handler(EventType.RUN_STRATEGY,handle_run_strategy)
+    engine.add_event_source(replay)
+    engine.run()
+
+    return engine
@@ -1,8 +1,16 @@
-from typing import List,Set,Dict,Optional,TYPE_CHECKING
+from collections import ChainMap
+from typing import List,Set,Dict,Mapping,Optional,Union,TYPE_CHECKING
 
 import pandas as pd
 
 from sim import CancellationResult,FillArrivesAtBrokerEvent,CancellationArrivesAtBrokerEvent,Fill,EventType,CancellationOutcome,OrderType,OrderSide
+from sim.order_ids import order_broker_id,order_local_id
+from sim.order import OrderState
+from sim.order_book import OrderBook
+from sim.order_store import OrderStore
+from sim.retention import OrderArchive,RetentionMode,RetentionPolicy
+from sim.market_data import market_tz
+from sim.timestamps import to_ns,to_ns_delta,to_timestamp
 
 if TYPE_CHECKING:
     from sim import *
@@ -14,31 +22,93 @@ Responsibilities:
 - Own execution logic and fill communication.
 
 Design Notes - V1: Currently a single symbol structure. Will be extended to allow multiple symbols.
+
+Design Notes - Order Index: Orders with remaining quantity that have not been cancelled are kept in a per symbol OrderBook in active_orders. Completed and cancelled orders move to archived_orders, an OrderStore that keeps them as columns and returns OrderRecord views, and order_infos reads through both. Archived entries are read only records without reduce_quantity, only live entries are OrderInfos. Market updates only visit the orders a book reports as crossing the bar price, processed in arrival order.
+
+Design Notes - Retention: Under a compacting RetentionPolicy archived_orders is an OrderArchive holding the last keep archived orders (none for SUMMARY_ONLY) and cancelled_orders only holds cancellations that arrived before their order. Beyond keep, rows are spilled to the policy's spill_dir or dropped. Cancellation outcomes do not depend on those rows: last_arrivals holds the highest order id that has arrived per broker, so later ids have not arrived and are CANCELLED, and unfilled_bits has one bit per arrived order, set once it is archived with remaining quantity, which gives CANCELLED or NO_OP exactly as under KEEP_ALL. This relies on each broker's orders arriving in id order, which a fixed broker latency guarantees.
 """
 
 class MarketSnapshot:
     market_datas : Dict[str,"MarketDataSnapshot"]
+    ts_ns : int
+    tz : Optional[object]
+
     def __init__(self, market : "Market", ts : pd.Timestamp) -> None:
-        self.market_datas = {symbol : market_data.get_snapshot(ts) for symbol, market_data in market.market_datas.items()}
+        self.ts_ns = to_ns(ts)
+        self.tz = market.tz
+        self.market_datas = {symbol : market_data.get_snapshot(self.ts_ns) for symbol, market_data in market.market_datas.items()}
+
+    @property
+    def ts(self) -> pd.Timestamp:
+        return to_timestamp(self.ts_ns,self.tz)
     
     def get_symbols(self) -> List[str]:
         return list(self.market_datas.keys())
 
 class Market:
     market_datas : Dict[str,"MarketData"]
-    order_infos : Dict[int,"OrderInfo"]
+    active_orders : Dict[str,OrderBook]
+    live_orders : Dict[int,"OrderInfo"]
+    archived_orders : Union[OrderStore,OrderArchive]
+    order_infos : Mapping[int,"OrderInfo"]
     cancelled_orders : Set[int]
-    current_ts : pd.Timestamp
+    retention : RetentionPolicy
+    last_arrivals : Optional[Dict[int,int]]
+    unfilled_bits : Optional[Dict[int,bytearray]]
+    arrival_seq : int
     fill_logic : "FillLogic"
     latency : pd.Timedelta
+    latency_ns : int
+    tz : Optional[object]
 
-    def __init__(self, market_datas : Dict[str,"MarketData"], fill_logic : "FillLogic", latency : pd.Timedelta) -> None:
+    def __init__(self, market_datas : Dict[str,"MarketData"], fill_logic : "FillLogic", latency : pd.Timedelta, retention : Optional[RetentionPolicy] = None) -> None:
         self.market_datas = market_datas
         self.latency = latency
+        self.latency_ns = to_ns_delta(latency)
         self.fill_logic = fill_logic
+        self.tz = market_tz(market_datas)
 
         self.cancelled_orders = set()
-        self.order_infos = {}
+        self.active_orders = {symbol : OrderBook() for symbol in market_datas}
+        self.live_orders = {}
+        self.retention = RetentionPolicy.keep_all() if retention is None else retention
+        self.archived_orders = OrderStore(tz=self.tz)
+        self.last_arrivals = None
+        self.unfilled_bits = None
+        if self.retention.compacts:
+            keep_rows = self.retention.mode == RetentionMode.KEEP_LAST
+            self.archived_orders = OrderArchive("market",keep_rows,self.retention.keep,self.retention.spill_dir,self.retention.block_rows,self.tz)
+            self.last_arrivals = {}
+            self.unfilled_bits = {}
+        self.order_infos = ChainMap(self.live_orders,self.archived_orders)
+        self.arrival_seq = 0
+
+    def _add_live(self, order_info : "OrderInfo") -> None:
+        order_id = order_info.order_id
+        if order_info.symbol not in self.active_orders:
+            self.active_orders[order_info.symbol] = OrderBook()
+
+        self.active_orders[order_info.symbol].add(order_info,self.arrival_seq)
+        self.live_orders[order_id] = order_info
+        self.arrival_seq += 1
+
+    def _archive(self, order_info : "OrderInfo") -> None:
+        order_id = order_info.order_id
+        if self.live_orders.pop(order_id,None) is not None:
+            self.active_orders[order_info.symbol].remove(order_info)
+
+        self.archived_orders.add_order_info(order_info,OrderState.FILLED if order_info.remaining_qty == 0 else OrderState.CANCELLED)
+        if self.unfilled_bits is not None and order_info.remaining_qty > 0:
+            bits = self.unfilled_bits.setdefault(order_broker_id(order_id),bytearray())
+            local_id = order_local_id(order_id)
+            if local_id >> 3 >= len(bits):
+                bits.extend(bytes(max(len(bits),(local_id >> 3) + 1 - len(bits))))
+            bits[local_id >> 3] |= 1 << (local_id & 7)
+
+    def _is_unfilled(self, order_id : int) -> bool:
+        bits = self.unfilled_bits.get(order_broker_id(order_id),b"")
+        local_id = order_local_id(order_id)
+        return local_id >> 3 < len(bits) and bool(bits[local_id >> 3] & (1 << (local_id & 7)))
     
     def _calculate_fill_qty(self, order_info : "OrderInfo") -> int:
         fill_qty = self.fill_logic.calculate_fill_qty(order_info)
@@ -48,13 +118,8 @@ class Market:
         
         return fill_qty
 
-    def _calculate_fill_price(self, symbol : str, ts : pd.Timestamp) -> Optional[float]:
-        fill_bar = self.market_datas[symbol].current_bar(ts)
-
-        if fill_bar == None:
-            return None
-        
-        return fill_bar.open
+    def _calculate_fill_price(self, symbol : str, ts : int) -> Optional[float]:
+        return self.market_datas[symbol].current_open(ts)
 
 
     def calculate_fill(self, order_info : "OrderInfo", ts : pd.Timestamp) -> Optional["Fill"]:
@@ -69,11 +134,15 @@ class Market:
                     symbol=order_info.symbol,
                     side=order_info.side,
                     fill_price=fill_price,
-                    ts=ts)
+                    ts=ts,
+                    tz=self.tz)
 
         return fill
     
     def is_price_executable(self, order_info : "OrderInfo", fill : Fill) -> bool:
+        return self._is_price_executable(order_info,fill.fill_price)
+
+    def _is_price_executable(self, order_info : "OrderInfo", fill_price : float) -> bool:
         if order_info.order_type == OrderType.MARKET:
             return True
         
@@ -82,60 +151,119 @@ class Market:
                 raise RuntimeError("Limit order lacking limit.")
             
             if order_info.side == OrderSide.BUY:
-                return fill.fill_price <= order_info.limit
+                return fill_price <= order_info.limit
             
             if order_info.side == OrderSide.SELL:
-                return fill.fill_price >= order_info.limit
+                return fill_price >= order_info.limit
         
         raise RuntimeError(f"Unknown Order Type:{order_info.order_type}")
     
     def process_order_info(self, order_info : "OrderInfo", ts : pd.Timestamp) -> List["Event"]:
-        order_id, arrival_time = order_info.order_id, order_info.arrival_time
-        if arrival_time > ts:
+        ts = to_ns(ts)
+        order_id, arrival_ns = order_info.order_id, order_info.arrival_ns
+        if arrival_ns > ts:
             raise RuntimeError("Order processed before arrival time.")
         
         if order_id in self.cancelled_orders:
             return []
         
-        fill = self.calculate_fill(order_info,ts)
+        fill_price = self._calculate_fill_price(order_info.symbol,ts)
 
-        if fill == None:
+        if fill_price == None or not self._is_price_executable(order_info,fill_price):
             return []
-        
-        if not self.is_price_executable(order_info, fill):
+
+        return self._execute(order_info,fill_price,ts)
+
+    def _execute(self, order_info : "OrderInfo", fill_price : float, ts : int) -> List["Event"]:
+        """Fill an order already known to be price executable."""
+        fill_qty = self._calculate_fill_qty(order_info)
+
+        if fill_qty == 0:
             return []
+
+        fill = Fill._make(order_info.order_id,fill_qty,order_info.symbol,order_info.side,fill_price,ts,tz=self.tz)
         
-        self.order_infos[order_id].reduce_quantity(fill.qty)
+        order_info.reduce_quantity(fill.qty)
+        order_info.fill_notional += fill.qty * fill.fill_price
+
+        if order_info.remaining_qty == 0:
+            self._archive(order_info)
         
-        return [FillArrivesAtBrokerEvent(EventType.FILL_ARRIVES_AT_BROKER,ts + self.latency,fill)]
+        return [FillArrivesAtBrokerEvent._make(EventType.FILL_ARRIVES_AT_BROKER,ts + self.latency_ns,fill,tz=self.tz)]
 
     
     def handle_market_update(self, ts : pd.Timestamp) -> List["Event"]:
-        events = []
+        ts = to_ns(ts)
+        crossing = []
+
+        for symbol,book in self.active_orders.items():
+            if not book:
+                continue
 
-        for order_info in self.order_infos.values():
-            events += self.process_order_info(order_info,ts)
+            fill_price = self._calculate_fill_price(symbol,ts)
+
+            if fill_price != None:
+                crossing += [(seq,order_info,fill_price) for seq,order_info in book.executable(fill_price)]
+
+        # Arrival order across symbols and price levels
+        crossing.sort(key=lambda entry : entry[0])
+
+        events = []
+        for seq,order_info,fill_price in crossing:
+            events += self._execute(order_info,fill_price,ts)
 
         return events
     
     def handle_order_arrival(self, ts : pd.Timestamp, order_submission : "OrderSubmission") -> List["Event"]:
-        order_info = order_submission.get_info(ts)
+        ts = to_ns(ts)
+        order_info = order_submission.get_info(ts,self.tz)
         order_id = order_info.order_id
-        self.order_infos[order_id] = order_info
+
+        if self.last_arrivals is not None:
+            broker_id = order_broker_id(order_id)
+            if order_id > self.last_arrivals.get(broker_id,-1):
+                self.last_arrivals[broker_id] = order_id
+
+        if order_id in self.cancelled_orders:
+            if self.last_arrivals is not None:
+                self.cancelled_orders.discard(order_id)
+            self._archive(order_info)
+            return []
+
+        self._add_live(order_info)
 
         return self.process_order_info(order_info,ts)
     
     def handle_cancellation_arrival(self, ts : pd.Timestamp, cancellation_submission : "CancellationSubmission") -> List["Event"]:
+        ts = to_ns(ts)
         order_id = cancellation_submission.order_id
 
-        self.cancelled_orders.add(order_id)
+        if self.last_arrivals is not None:
+            outcome = self._compacted_cancellation_outcome(order_id)
+        else:
+            self.cancelled_orders.add(order_id)
 
-        if order_id not in self.order_infos or self.order_infos[order_id].remaining_qty > 0:
-            cancellation_result = CancellationResult(order_id,ts,CancellationOutcome.CANCELLED)
-            return [CancellationArrivesAtBrokerEvent(EventType.CANCELLATION_ARRIVES_AT_BROKER,ts+self.latency,cancellation_result)]
-        
-        cancellation_result = CancellationResult(order_id,ts,CancellationOutcome.NO_OP)
-        return [CancellationArrivesAtBrokerEvent(EventType.CANCELLATION_ARRIVES_AT_BROKER,ts+self.latency,cancellation_result)]
+            if order_id in self.live_orders:
+                self._archive(self.live_orders[order_id])
+
+            if order_id not in self.order_infos or self.order_infos[order_id].remaining_qty > 0:
+                outcome = CancellationOutcome.CANCELLED
+            else:
+                outcome = CancellationOutcome.NO_OP
+
+        cancellation_result = CancellationResult._make(order_id,ts,outcome,tz=self.tz)
+        return [CancellationArrivesAtBrokerEvent._make(EventType.CANCELLATION_ARRIVES_AT_BROKER,ts+self.latency_ns,cancellation_result,tz=self.tz)]
+
+    def _compacted_cancellation_outcome(self, order_id : int) -> CancellationOutcome:
+        if order_id in self.live_orders:
+            self._archive(self.live_orders[order_id])
+            return CancellationOutcome.CANCELLED
+
+        if order_id > self.last_arrivals.get(order_broker_id(order_id),-1):
+            self.cancelled_orders.add(order_id)
+            return CancellationOutcome.CANCELLED
+
+        return CancellationOutcome.CANCELLED if self._is_unfilled(order_id) else CancellationOutcome.NO_OP
     
     def get_snapshot(self, ts : pd.Timestamp):
         return MarketSnapshot(self,ts)
@@ -1,9 +1,14 @@
+import hashlib
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Dict,Iterator,Optional,Set,Tuple
 
+import numpy as np
 import pandas as pd
 
-@dataclass
+from sim.bar_index import BarIndex
+from sim.timestamps import column_to_ns,to_ns
+
+@dataclass(slots=True)
 class Bar():
     start_ts : pd.Timestamp
     end_ts : pd.Timestamp
@@ -28,33 +33,211 @@ class Bar():
                    VWAP=row["VWAP"])
 
 class MarketDataSnapshot:
-    df : pd.DataFrame
+    """
+    Market Data Snapshot
+
+    Responsibilities
+    - Expose the bars with end_ts <= ts at snapshot time.
+
+    Design Notes: Only the cutoff position is stored. Array slices are views over the parent MarketData and the DataFrame is built on first access.
+    """
+    market_data : "MarketData"
+    cutoff : int
+    _df : Optional[pd.DataFrame]
 
     def __init__(self, market_data : "MarketData", ts : pd.Timestamp) -> None:
-        self.df = market_data.df[market_data.df["end_ts"] <= ts]
-    
-    def current_bar(self, ts : pd.Timestamp):
-        return MarketData.current_bar_from_df(self.df,ts)
-    
-    def most_recent_bar(self, ts : pd.Timestamp):
-        return MarketData.most_recent_bar_from_df(self.df,ts)
+        self.market_data = market_data
+        self.cutoff = market_data.index.count_ended(to_ns(ts))
+        self._df = None
+
+    def __len__(self) -> int:
+        return self.cutoff
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            self._df = self.market_data.to_df(0,self.cutoff)
+        return self._df
+
+    @property
+    def start_ns(self) -> np.ndarray:
+        return self.market_data.index.start_ns[:self.cutoff]
+
+    @property
+    def end_ns(self) -> np.ndarray:
+        return self.market_data.index.end_ns[:self.cutoff]
+
+    def column(self, name : str) -> np.ndarray:
+        return self.market_data.columns[name][:self.cutoff]
+
+    def tail(self, n : int) -> pd.DataFrame:
+        return self.market_data.to_df(max(self.cutoff-n,0),self.cutoff)
+
+    def bar_at(self, i : int) -> Bar:
+        if i < 0:
+            i += self.cutoff
+        if not 0 <= i < self.cutoff:
+            raise IndexError("Snapshot bar position out of range.")
+        return self.market_data.bar_at(i)
+
+    def last_bar(self) -> Bar | None:
+        if self.cutoff == 0:
+            return None
+        return self.market_data.bar_at(self.cutoff-1)
+
+    def current_bar(self, ts : pd.Timestamp) -> Bar | None:
+        i = self.market_data.index.current(to_ns(ts))
+
+        if i < 0 or i >= self.cutoff:
+            return None
+        return self.market_data.bar_at(i)
+
+    def most_recent_bar(self, ts : pd.Timestamp) -> Bar | None:
+        i = min(self.market_data.index.most_recent(to_ns(ts)),self.cutoff-1)
+
+        if i < 0:
+            return None
+        return self.market_data.bar_at(i)
 
 EXPECTED_COLUMNS = set(["start_ts","end_ts","open","high","low","close","volume","trades","VWAP"])
 
+TIMESTAMP_COLUMNS = ["start_ts","end_ts"]
+FLOAT_COLUMNS = ["open","high","low","close","VWAP"]
+INT_COLUMNS = ["volume","trades"]
+
+# int64 value of NaT in nanosecond timestamp columns.
+NAT_NS = int(np.iinfo(np.int64).min)
+
+# Fingerprints of column data that passed validation in this process.
+_validated_fingerprints : Set[str] = set()
+
+def market_tz(market_datas : Dict[str,"MarketData"]) -> Optional[object]:
+    """tz of the first timezone aware MarketData, None if all are naive."""
+    return next((market_data.tz for market_data in market_datas.values() if market_data.tz is not None),None)
+
 class MarketData:
     """
     Market Data
 
     Responsibilities
     - Timestamp based reference to bars
+
+    Design Notes: The validated DataFrame is converted once into contiguous columns (int64 ns timestamps, float64 prices, int64 counts) which back every lookup. The DataFrame is only kept when keep_df is set, otherwise df is rebuilt from the columns on request. to_df always returns a new frame, so snapshots can not change the source data.
+
+    Design Notes - Validation: Timestamp checks run as one vectorized pass over the int64 columns and report the first offending row. Fingerprints of validated data are remembered per process, and from_columns skips validation for a known fingerprint. Hashing costs far more than validating, so the cache is only consulted when the fingerprint is already at hand, e.g. from a bar store stamp.
     """
-    df : pd.DataFrame
+    columns : Dict[str,np.ndarray]
+    index : BarIndex
+    tz : Optional[object]
+    _df : Optional[pd.DataFrame]
+    _fingerprint : Optional[str]
+    _validated : bool
+    _bar_columns : Tuple[np.ndarray,...]
+    # Buffer owner (e.g. a SharedMemory block) that must outlive columns borrowing its memory.
+    _shm : Optional[object]
 
-    def __init__(self, df) -> None:
-        validity,msg = MarketData.validate_df(df)
+    def __init__(self, df, keep_df : bool = False) -> None:
+        validity,msg = MarketData.validate_dtypes(df)
         if not validity:
             raise ValueError(f"Market Data constructed with invalid df : {msg}")
-        self.df = df
+
+        # Timestamps are checked on the converted columns, which are needed anyway.
+        columns = MarketData.df_to_columns(df)
+        i,msg = MarketData.first_invalid_bar(columns["start_ts"],columns["end_ts"])
+        if i >= 0:
+            raise ValueError(f"Market Data constructed with invalid df : {msg} at row {i}")
+
+        self._set_columns(columns,df["start_ts"].dt.tz)
+        self._df = df if keep_df else None
+
+    @classmethod
+    def from_columns(cls, columns : Dict[str,np.ndarray], tz = None, validate : bool = True, fingerprint : Optional[str] = None, validated : Optional[bool] = None) -> "MarketData":
+        """
+        Build MarketData directly over existing column arrays (int64 ns timestamps) without copying them.
+
+        fingerprint, when known, is trusted as the content hash of the columns. Validation is skipped if data with that fingerprint already passed it in this process.
+        validated records whether the columns are known to be valid, e.g. from a bar store stamp, and defaults to validate.
+        """
+        if validated is None:
+            validated = validate
+
+        if validate and fingerprint not in _validated_fingerprints:
+            validity,msg = MarketData.validate_columns(columns)
+            if not validity:
+                raise ValueError(f"Market Data constructed with invalid columns : {msg}")
+
+        market_data = cls.__new__(cls)
+        market_data._set_columns(columns,tz,validated=validated or validate)
+        market_data._df = None
+
+        if fingerprint is not None:
+            market_data._fingerprint = fingerprint
+            if validated or validate:
+                _validated_fingerprints.add(fingerprint)
+
+        return market_data
+
+    def _set_columns(self, columns : Dict[str,np.ndarray], tz, validated : bool = True) -> None:
+        self.columns = columns
+        self.tz = tz
+        self._fingerprint = None
+        self._validated = validated
+        self._shm = None
+        self.index = BarIndex(columns["start_ts"],columns["end_ts"])
+
+        self._bar_columns = tuple(columns[col] for col in ["start_ts","end_ts","open","high","low","close","volume","trades","VWAP"])
+
+    @staticmethod
+    def df_to_columns(df : pd.DataFrame) -> Dict[str,np.ndarray]:
+        """Convert a validated DataFrame to columns (int64 ns timestamps, float64 prices, int64 counts)."""
+        columns = {col : column_to_ns(df[col]) for col in TIMESTAMP_COLUMNS}
+        columns.update({col : df[col].to_numpy(dtype=np.float64) for col in FLOAT_COLUMNS})
+        columns.update({col : df[col].to_numpy(dtype=np.int64) for col in INT_COLUMNS})
+
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def boundary_chunks(self, column : str) -> Iterator[np.ndarray]:
+        """Iterator over the int64 ns values of a timestamp column, in consecutive chunks."""
+        return iter([self.columns[column]])
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the columns and timezone, computed on first access."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for col in TIMESTAMP_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS:
+                digest.update(col.encode())
+                digest.update(np.ascontiguousarray(self.columns[col]).data)
+            digest.update(str(self.tz).encode())
+
+            self._fingerprint = digest.hexdigest()
+            if self._validated:
+                _validated_fingerprints.add(self._fingerprint)
+        return self._fingerprint
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is not None:
+            return self._df
+        return self.to_df()
+
+    def to_df(self, start : int = 0, stop : Optional[int] = None) -> pd.DataFrame:
+        if self._df is not None:
+            return self._df.iloc[start:stop].copy()
+
+        data = {}
+        for col in TIMESTAMP_COLUMNS:
+            timestamps = pd.DatetimeIndex(self.columns[col][start:stop].view("datetime64[ns]"))
+            if self.tz is not None:
+                timestamps = timestamps.tz_localize("UTC").tz_convert(self.tz)
+            data[col] = timestamps
+        for col in FLOAT_COLUMNS + INT_COLUMNS:
+            data[col] = self.columns[col][start:stop]
+
+        return pd.DataFrame(data)
     
     @staticmethod
     def current_bar_from_df(df : pd.DataFrame, ts : pd.Timestamp):
@@ -77,51 +260,130 @@ class MarketData:
             return Bar.from_row(new_df.iloc[-1])
     
     @staticmethod
-    def validate_df(df : pd.DataFrame) -> Tuple[bool,str]:
+    def validate_dtypes(df : pd.DataFrame) -> Tuple[bool,str]:
         if len(EXPECTED_COLUMNS-set(df.columns)) != 0:
             return False, "missing column(s)"
-        
-        timestamp_cols = ["start_ts","end_ts"]
-        float_cols = ["open","high","low","close","VWAP"]
-        int_cols = ["volume","trades"]
-
-        # Datatype correctness
 
-        for col in timestamp_cols:
+        for col in TIMESTAMP_COLUMNS:
             if not pd.api.types.is_datetime64_any_dtype(df[col]):
                 return False, f"invalid datetime column: {col}"
-        
-        for col in float_cols:
+
+        for col in FLOAT_COLUMNS:
             if not pd.api.types.is_any_real_numeric_dtype(df[col]):
-                print(df[col].dtype)
                 return False, f"invalid float column: {col}"
-        
-        for col in int_cols:
+
+        for col in INT_COLUMNS:
             if not pd.api.types.is_integer_dtype(df[col]):
                 return False, f"invalid integer column: {col}"
-        
-        # Timestamp monotonicity
-        if not df["start_ts"].is_monotonic_increasing or df["start_ts"].duplicated().any():
-            return False,"start_ts not strictly increasing"
-        
-        if not df["end_ts"].is_monotonic_increasing or df["end_ts"].duplicated().any():
-            return False,"end_ts not strictly increasing"
-        
-        #Valid Bar Size
-        if not (df["start_ts"] < df["end_ts"]).all():
-            return False, "start_ts not strictly less than end_ts"
-
-        # Timestamp disjointness
-        if not (df["end_ts"].iloc[:-1].reset_index(drop=True) <= df["start_ts"].iloc[1:].reset_index(drop=True)).all():
-            return False, "timestamps are not disjoint"
-        
+
+        return True,""
+
+    @staticmethod
+    def first_invalid_bar(start_ns : np.ndarray, end_ns : np.ndarray) -> Tuple[int,str]:
+        """
+        Position of the first bar breaking timestamp validity and the reason, or (-1,"").
+
+        Bars with start_ts < end_ts that are disjoint from their predecessor (previous end_ts <= start_ts) are also strictly increasing in both columns, so one vectorized pass over those two conditions finds the first bad row. NaT is stored as the int64 minimum and would pass those comparisons in row 0, so it is rejected first.
+        """
+        if len(start_ns) == 0:
+            return -1,""
+
+        missing = (start_ns == NAT_NS) | (end_ns == NAT_NS)
+        if missing.any():
+            return int(missing.argmax()),"missing timestamp (NaT)"
+
+        bad = start_ns >= end_ns
+        bad[1:] |= end_ns[:-1] > start_ns[1:]
+
+        i = int(bad.argmax())
+        if not bad[i]:
+            return -1,""
+
+        if i > 0 and start_ns[i] <= start_ns[i-1]:
+            return i,"start_ts not strictly increasing"
+        if i > 0 and end_ns[i] <= end_ns[i-1]:
+            return i,"end_ts not strictly increasing"
+        if start_ns[i] >= end_ns[i]:
+            return i,"start_ts not strictly less than end_ts"
+        return i,"timestamps are not disjoint"
+
+    @staticmethod
+    def validate_df(df : pd.DataFrame) -> Tuple[bool,str]:
+        validity,msg = MarketData.validate_dtypes(df)
+        if not validity:
+            return False,msg
+
+        # Ordering does not depend on the unit, so the ns conversion is skipped unless the units differ.
+        start,end = pd.DatetimeIndex(df["start_ts"]),pd.DatetimeIndex(df["end_ts"])
+        if start.unit != end.unit:
+            start,end = start.as_unit("ns"),end.as_unit("ns")
+
+        i,msg = MarketData.first_invalid_bar(start.asi8,end.asi8)
+        if i >= 0:
+            return False,f"{msg} at row {i}"
+
+        return True,""
+
+    @staticmethod
+    def validate_columns(columns : Dict[str,np.ndarray]) -> Tuple[bool,str]:
+        if len(EXPECTED_COLUMNS-set(columns)) != 0:
+            return False, "missing column(s)"
+
+        for col in TIMESTAMP_COLUMNS + INT_COLUMNS:
+            if columns[col].dtype != np.int64:
+                return False, f"invalid int64 column: {col}"
+
+        for col in FLOAT_COLUMNS:
+            if columns[col].dtype != np.float64:
+                return False, f"invalid float64 column: {col}"
+
+        if len(set(len(column) for column in columns.values())) > 1:
+            return False, "column lengths differ"
+
+        i,msg = MarketData.first_invalid_bar(columns["start_ts"],columns["end_ts"])
+        if i >= 0:
+            return False,f"{msg} at row {i}"
+
         return True,""
 
+    def bar_at(self, i : int) -> Bar:
+        start_ts,end_ts,open,high,low,close,volume,trades,VWAP = self._bar_columns
+
+        if self.tz is None:
+            start,end = pd.Timestamp(int(start_ts[i])),pd.Timestamp(int(end_ts[i]))
+        else:
+            start,end = pd.Timestamp(int(start_ts[i]),tz=self.tz),pd.Timestamp(int(end_ts[i]),tz=self.tz)
+
+        return Bar(start_ts=start,
+                   end_ts=end,
+                   open=float(open[i]),
+                   high=float(high[i]),
+                   low=float(low[i]),
+                   close=float(close[i]),
+                   volume=int(volume[i]),
+                   trades=int(trades[i]),
+                   VWAP=float(VWAP[i]))
+
     def current_bar(self, ts : pd.Timestamp) -> Bar | None:
-        return MarketData.current_bar_from_df(self.df,ts)
+        i = self.index.current(to_ns(ts))
+
+        if i < 0:
+            return None
+        return self.bar_at(i)
 
     def most_recent_bar(self, ts : pd.Timestamp) -> Bar | None:
-        return MarketData.most_recent_bar_from_df(self.df,ts)
+        i = self.index.most_recent(to_ns(ts))
+
+        if i < 0:
+            return None
+        return self.bar_at(i)
+
+    def current_open(self, ts : pd.Timestamp) -> float | None:
+        i = self.index.current(to_ns(ts))
+
+        if i < 0:
+            return None
+        return float(self.columns["open"][i])
     
     def get_snapshot(self, ts : pd.Timestamp):
         return MarketDataSnapshot(self,ts)
\ No newline at end of file
@@ -0,0 +1,88 @@
+from pathlib import Path
+from typing import Dict,List,Optional,Sequence,Tuple,Union,TYPE_CHECKING
+
+import pandas as pd
+
+from sim.order_ids import order_broker_id
+from sim.engine import Engine
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+Multi Engine
+
+Responsibilities
+- Run many (Strategy, Broker) pairs against one Market in a single event loop.
+- Route order arrivals, fills and cancellation results back to the broker that sent the order.
+
+Design Notes: Brokers keep their own broker_id, which their order ids carry (see sim.order_ids), so all books share one Market and results route back by broker_id; broker_ids must be distinct. Each strategy gets its own market snapshot over the shared MarketData and runs in the order given. strategy and broker refer to the first pair. Journals and checkpoints assume a single broker and are not supported.
+"""
+
+class MultiEngine(Engine):
+    strategies : List["Strategy"]
+    brokers : List["Broker"]
+    routes : Dict[int,"Broker"]
+
+    def __init__(self, pairs : Sequence[Tuple["Strategy","Broker"]], market : "Market") -> None:
+        if not pairs:
+            raise ValueError("MultiEngine created without strategies.")
+
+        strategies = [strategy for strategy,_ in pairs]
+        brokers = [broker for _,broker in pairs]
+        if len({id(broker) for broker in brokers}) != len(brokers):
+            raise ValueError("MultiEngine created with a Broker shared between strategies.")
+
+        routes = {}
+        for i,broker in enumerate(brokers):
+            if broker.order_count:
+                raise ValueError(f"MultiEngine created with a Broker that already has orders (pair {i}).")
+            if broker.broker_id in routes:
+                raise ValueError(f"MultiEngine created with duplicate broker_id ({broker.broker_id}).")
+            routes[broker.broker_id] = broker
+            broker.tz = market.tz
+
+        super().__init__(strategies[0],brokers[0],market)
+
+        self.strategies = strategies
+        self.brokers = brokers
+        self.routes = routes
+
+    def attach_journal(self, journal : Optional["EventJournal"]) -> None:
+        raise RuntimeError("MultiEngine does not support journals.")
+
+    def checkpoint(self, path : Union[str,Path]) -> None:
+        raise RuntimeError("MultiEngine does not support checkpoints.")
+
+    def enable_checkpoints(self, path : Union[str,Path], every_events : Optional[int] = None, every : Optional[pd.Timedelta] = None) -> None:
+        raise RuntimeError("MultiEngine does not support checkpoints.")
+
+    @classmethod
+    def resume(cls, path : Union[str,Path], strategy : "Strategy", market_datas : Dict[str,"MarketData"]) -> "Engine":
+        raise RuntimeError("MultiEngine does not support checkpoints.")
+
+    def _handle_order_arrives_at_market(self, event : "OrderArrivesAtMarketEvent") -> List["Event"]:
+        order_id = event.order_submission.order_id
+        results = self.market.handle_order_arrival(event.ts_ns,event.order_submission)
+        self.routes[order_broker_id(order_id)].handle_order_arrival(order_id)
+
+        return results
+
+    def _handle_cancellation_arrives_at_broker(self, event : "CancellationArrivesAtBrokerEvent") -> None:
+        self.routes[order_broker_id(event.cancellation_result.order_id)].handle_cancellation_result(event.cancellation_result)
+
+    def _handle_fill_arrives_at_broker(self, event : "FillArrivesAtBrokerEvent") -> None:
+        self.routes[order_broker_id(event.fill.order_id)].handle_fill(event.fill)
+
+    def _handle_run_strategy(self, event : "RunStrategyEvent") -> List["Event"]:
+        ts = event.ts_ns
+
+        events = []
+        for strategy,broker in zip(self.strategies,self.brokers):
+            market_snapshot = self._section("snapshot.market",self.market.get_snapshot,ts)
+            broker_snapshot = self._section("snapshot.broker",broker.get_snapshot)
+            orders,cancellations = self._section("strategy.run",strategy.run,market_snapshot,broker_snapshot)
+            if orders or cancellations:
+                events += self._section("broker.handle_requests",broker.handle_requests,ts,orders,cancellations)
+
+        return events
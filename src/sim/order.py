@@ -27,18 +27,28 @@ class OrderSnapshot():
        self.state = order.state
        self.fills = order.fills
        self.limit = order.limit
+       self.filled_qty = order.filled_qty
+       self.remaining_quantity = order.remaining_quantity
+       self.average_fill_price = order.average_fill_price
    
 class Order():
+    """
+    Order
+
+    Design Notes: filled_qty and fill_notional are running totals updated by add_fill. With record_fills=False individual fills are not kept and fills is None.
+    """
     order_id : int
     side : "OrderSide"
     order_type : "OrderType"
     qty : int
     state : "OrderState"
-    fills : List["Fill"]
+    fills : Optional[List["Fill"]]
     symbol : str
     limit : Optional[float] = None
+    filled_qty : int
+    fill_notional : float
 
-    def __init__(self, order_request : "OrderRequest", order_id : int) -> None:
+    def __init__(self, order_request : "OrderRequest", order_id : int, record_fills : bool = True) -> None:
         self.order_id = order_id
         self.side  = order_request.side
         self.order_type = order_request.order_type
@@ -47,18 +57,24 @@ class Order():
         self.symbol = order_request.symbol
 
         self.state = OrderState.CREATED
-        self.fills = []
+        self.fills = [] if record_fills else None
+        self.filled_qty = 0
+        self.fill_notional = 0
     
     def add_fill(self,fill : "Fill"):
         if self.state not in [OrderState.LIVE,OrderState.PARTIALLY_FILLED,OrderState.CANCEL_PENDING]:
             raise RuntimeError(f"add_fill attempted in invalid order state ({self.state})")
         
-        if fill.qty > self.remaining_quantity:
+        if fill.qty > self.qty - self.filled_qty:
             raise ValueError(f"add_fill attempted with greater than remaining qty. ({self.qty})")
 
-        self.fills.append(fill)
+        if self.fills is not None:
+            self.fills.append(fill)
+
+        self.filled_qty += fill.qty
+        self.fill_notional += fill.qty * fill.fill_price
 
-        if self.remaining_quantity == 0:
+        if self.filled_qty == self.qty:
             self._to_filled()
         else:
             self._to_partially_filled()
@@ -101,31 +117,20 @@ class Order():
         return False
     
     def get_submission(self):
-        return OrderSubmission(
-            order_id=self.order_id,
-            side=self.side,
-            qty=self.qty,
-            order_type=self.order_type,
-            limit=self.limit,
-            symbol=self.symbol
-        )
+        # Fields were validated by the OrderRequest this order was created from.
+        return OrderSubmission._make(self.order_id,self.side,self.qty,self.symbol,self.order_type,self.limit)
     
 
     @property
     def remaining_quantity(self) -> int:
-        fill_quantities = [fill.qty for fill in self.fills]
-
-        return self.qty - sum(fill_quantities)
+        return self.qty - self.filled_qty
     
     @property
     def average_fill_price(self) -> Optional[float]:
-        fill_prices = [fill.qty * fill.fill_price for fill in self.fills]
-        fill_qty = self.qty - self.remaining_quantity
-
-        if fill_qty == 0:
+        if self.filled_qty == 0:
             return None
         else:
-            return sum(fill_prices) / fill_qty
+            return self.fill_notional / self.filled_qty
     
     def get_snapshot(self):
         return OrderSnapshot(self)
\ No newline at end of file
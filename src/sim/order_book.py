@@ -0,0 +1,89 @@
+from bisect import bisect_left,bisect_right
+from typing import Dict,Iterator,List,Tuple,TYPE_CHECKING
+
+from sim.order_request import OrderSide,OrderType
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+OrderBook
+
+Responsibilities
+- Hold the live orders of a single symbol.
+- Find the orders that can execute at a given price.
+
+Design Notes: Market orders are kept in arrival order. Limit orders are kept per side in lists sorted by (price priority, arrival sequence), so the orders crossing a price are a prefix found by bisection. Arrival sequence breaks ties within a price level.
+"""
+
+_INF = float("inf")
+
+class OrderBook:
+    market_orders : Dict[int,Tuple[int,"OrderInfo"]]
+    buy_keys : List[Tuple[float,int]]
+    buy_orders : List["OrderInfo"]
+    sell_keys : List[Tuple[float,int]]
+    sell_orders : List["OrderInfo"]
+    seqs : Dict[int,int]
+
+    def __init__(self) -> None:
+        self.market_orders = {}
+        self.buy_keys,self.buy_orders = [],[]
+        self.sell_keys,self.sell_orders = [],[]
+        self.seqs = {}
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.seqs)
+
+    def _limit_side(self, order_info : "OrderInfo") -> Tuple[List[Tuple[float,int]],List["OrderInfo"],Tuple[float,int]]:
+        seq = self.seqs[order_info.order_id]
+
+        if order_info.side == OrderSide.BUY:
+            return self.buy_keys,self.buy_orders,(-order_info.limit,seq)
+        return self.sell_keys,self.sell_orders,(order_info.limit,seq)
+
+    def add(self, order_info : "OrderInfo", seq : int) -> None:
+        self.seqs[order_info.order_id] = seq
+
+        if order_info.order_type == OrderType.MARKET:
+            self.market_orders[order_info.order_id] = (seq,order_info)
+            return
+
+        if order_info.order_type != OrderType.LIMIT:
+            raise RuntimeError(f"Unknown Order Type:{order_info.order_type}")
+
+        if order_info.limit == None:
+            raise RuntimeError("Limit order lacking limit.")
+
+        keys,orders,key = self._limit_side(order_info)
+        i = bisect_right(keys,key)
+        keys.insert(i,key)
+        orders.insert(i,order_info)
+
+    def remove(self, order_info : "OrderInfo") -> None:
+        if order_info.order_type == OrderType.MARKET:
+            del self.market_orders[order_info.order_id]
+        else:
+            keys,orders,key = self._limit_side(order_info)
+            i = bisect_left(keys,key)
+            del keys[i]
+            del orders[i]
+
+        del self.seqs[order_info.order_id]
+
+    def executable(self, price : float) -> List[Tuple[int,"OrderInfo"]]:
+        """(arrival sequence, order) pairs for every order able to execute at price."""
+        crossing = list(self.market_orders.values())
+
+        n_buys = bisect_right(self.buy_keys,(-price,_INF))
+        for i in range(n_buys):
+            crossing.append((self.buy_keys[i][1],self.buy_orders[i]))
+
+        n_sells = bisect_right(self.sell_keys,(price,_INF))
+        for i in range(n_sells):
+            crossing.append((self.sell_keys[i][1],self.sell_orders[i]))
+
+        return crossing
@@ -0,0 +1,17 @@
+"""
+Order Ids
+
+Responsibilities
+- Define the layout of order ids shared by Broker, Market and MultiEngine.
+
+Design Notes: Order ids carry the broker_id in the bits above ORDER_ID_BITS and the broker's own sequence number below them, so brokers sharing one Market never collide and a fill or cancellation result can be routed back with order_broker_id. broker_id 0 gives the plain sequence 0,1,2,...
+"""
+
+ORDER_ID_BITS = 40
+
+def order_broker_id(order_id : int) -> int:
+    return order_id >> ORDER_ID_BITS
+
+def order_local_id(order_id : int) -> int:
+    """The broker's own sequence number of order_id."""
+    return order_id & ((1 << ORDER_ID_BITS) - 1)
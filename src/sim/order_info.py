@@ -1,31 +1,41 @@
-from dataclasses import dataclass
+from dataclasses import dataclass,field
 from typing import Optional,TYPE_CHECKING
 
 import pandas as pd
 
 from sim.order_request import OrderType
+from sim.timestamps import timestamp_tz,to_ns,to_timestamp
 
 if TYPE_CHECKING:
     from sim import *
 
-@dataclass
+@dataclass(init=False,slots=True)
 class OrderInfo():
     order_id : int
-    arrival_time : pd.Timestamp
+    arrival_ns : int
     side : "OrderSide"
     remaining_qty : int
     order_type : "OrderType"
     symbol : str
     limit : Optional[float] = None
+    qty : Optional[int] = None
+    fill_notional : float = field(default=0.0,kw_only=True)
+    tz : Optional[object] = field(default=None,kw_only=True,compare=False,repr=False)
 
-    def reduce_quantity(self, qty : int):
-        if qty <= 0:
-            raise ValueError(f"reduce_quantity attempted with non positive qty ({qty}).")
-        if qty > self.remaining_qty:
-            raise ValueError(f"reduce_quantity attempted with more than remaining qty ({qty})")
-        self.remaining_qty -= qty
+    def __init__(self, order_id : int, arrival_time, side : "OrderSide", remaining_qty : int, order_type : "OrderType", symbol : str, limit : Optional[float] = None, qty : Optional[int] = None, tz = None) -> None:
+        self.order_id = order_id
+        self.arrival_ns = to_ns(arrival_time)
+        self.tz = timestamp_tz(arrival_time) if tz is None else tz
+        self.side = side
+        self.remaining_qty = remaining_qty
+        self.order_type = order_type
+        self.symbol = symbol
+        self.limit = limit
+        #Original quantity, defaults to the remaining quantity at creation
+        self.qty = remaining_qty if qty is None else qty
+        #Sum of qty * price over the fills, so archived rows keep the average fill price
+        self.fill_notional = 0.0
 
-    def __post_init__(self):
         #Validate Qty
         if self.remaining_qty <= 0:
             raise ValueError(f"OrderInfo created with non-positive quantity ({self.remaining_qty}).")
@@ -36,4 +46,31 @@ class OrderInfo():
         
         #Validate limit
         if self.limit and self.limit <= 0:
-            raise ValueError(f"OrderInfo created with non-positive limit ({self.limit}).")
\ No newline at end of file
+            raise ValueError(f"OrderInfo created with non-positive limit ({self.limit}).")
+
+    @classmethod
+    def _make(cls, order_id : int, arrival_ns : int, side : "OrderSide", remaining_qty : int, order_type : "OrderType", symbol : str, limit : Optional[float] = None, qty : Optional[int] = None, *, fill_notional : float = 0.0, tz = None) -> "OrderInfo":
+        """OrderInfo of a validated OrderSubmission, arrival_ns in int ns and qty given."""
+        self = object.__new__(cls)
+        self.order_id = order_id
+        self.arrival_ns = arrival_ns
+        self.side = side
+        self.remaining_qty = remaining_qty
+        self.order_type = order_type
+        self.symbol = symbol
+        self.limit = limit
+        self.qty = qty
+        self.fill_notional = fill_notional
+        self.tz = tz
+        return self
+
+    def reduce_quantity(self, qty : int):
+        if qty <= 0:
+            raise ValueError(f"reduce_quantity attempted with non positive qty ({qty}).")
+        if qty > self.remaining_qty:
+            raise ValueError(f"reduce_quantity attempted with more than remaining qty ({qty})")
+        self.remaining_qty -= qty
+
+    @property
+    def arrival_time(self) -> pd.Timestamp:
+        return to_timestamp(self.arrival_ns,self.tz)
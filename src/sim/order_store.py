@@ -0,0 +1,298 @@
+from typing import Dict,Iterator,List,Mapping,Optional,TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from sim.order import OrderSnapshot,OrderState
+from sim.order_request import OrderSide,OrderType
+from sim.timestamps import to_timestamp
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+Order Store
+
+Responsibilities
+- Hold many orders as columns: id, side, type, qty, remaining, limit, state, symbol, arrival ns, filled qty and notional.
+- Hand out Order/OrderInfo compatible OrderRecord views by order id on demand.
+
+Design Notes: Appended orders are buffered as tuples and written to the columns once per block, as in the event journal, so appending costs one tuple append and records of buffered rows read the tuple. Columns are numpy arrays grown by doubling and an order costs about 60 bytes of columns instead of an object with its own __dict__ and fill list. Ids are found through a sorted id/row index plus a dict of recently added ids, merged into the index once it passes an eighth of the index size, so the index adds 16 bytes per order and lookups are a dict probe and a binary search. Enums and symbols are stored as small integer codes. A missing limit is NaN and an unknown arrival time MISSING_NS. Records read through to the columns, individual fills are not kept.
+
+Design Notes - Scope: The store backs retired orders only, the Market's archived_orders and the OrderArchive blocks of a compacting RetentionPolicy. Live orders stay Order and OrderInfo objects, and so do all of the Broker's orders under KEEP_ALL.
+"""
+
+SIDES = list(OrderSide)
+ORDER_TYPES = list(OrderType)
+ORDER_STATES = list(OrderState)
+
+SIDE_CODES = {side : i for i,side in enumerate(SIDES)}
+ORDER_TYPE_CODES = {order_type : i for i,order_type in enumerate(ORDER_TYPES)}
+ORDER_STATE_CODES = {state : i for i,state in enumerate(ORDER_STATES)}
+
+MISSING_NS = int(np.iinfo(np.int64).min)
+
+MERGE_MIN = 4096
+FLUSH_ROWS = 1024
+
+ORDER_COLUMNS : Dict[str,np.dtype] = {
+    "order_id" : np.dtype(np.int64),
+    "side" : np.dtype(np.int8),
+    "order_type" : np.dtype(np.int8),
+    "qty" : np.dtype(np.int64),
+    "remaining" : np.dtype(np.int64),
+    "limit" : np.dtype(np.float64),
+    "state" : np.dtype(np.int8),
+    "symbol" : np.dtype(np.int32),
+    "arrival_ns" : np.dtype(np.int64),
+    "filled_qty" : np.dtype(np.int64),
+    "fill_notional" : np.dtype(np.float64)
+}
+
+PENDING_FIELDS = {name : i for i,name in enumerate(ORDER_COLUMNS)}
+CODES = {"side" : SIDE_CODES, "order_type" : ORDER_TYPE_CODES, "state" : ORDER_STATE_CODES}
+
+class OrderRecord:
+    """
+    Read only view of one stored order, usable where an Order, OrderSnapshot or OrderInfo is read. It has no reduce_quantity, stored orders are terminal.
+    """
+    __slots__ = ("store","row")
+
+    store : "OrderStore"
+    row : int
+
+    def __init__(self, store : "OrderStore", row : int) -> None:
+        self.store = store
+        self.row = row
+
+    def _get(self, column : str):
+        store = self.store
+        if self.row >= store.length:
+            return store._pending_value(self.row,column)
+        return store.columns[column][self.row].item()
+
+    @property
+    def order_id(self) -> int:
+        return self._get("order_id")
+
+    @property
+    def side(self) -> OrderSide:
+        return SIDES[self._get("side")]
+
+    @property
+    def order_type(self) -> OrderType:
+        return ORDER_TYPES[self._get("order_type")]
+
+    @property
+    def qty(self) -> int:
+        return self._get("qty")
+
+    @property
+    def remaining_qty(self) -> int:
+        return self._get("remaining")
+
+    @property
+    def remaining_quantity(self) -> int:
+        return self._get("remaining")
+
+    @property
+    def limit(self) -> Optional[float]:
+        limit = self._get("limit")
+        return None if limit != limit else limit
+
+    @property
+    def state(self) -> OrderState:
+        return ORDER_STATES[self._get("state")]
+
+    @property
+    def symbol(self) -> str:
+        return self.store.symbols[self._get("symbol")]
+
+    @property
+    def arrival_ns(self) -> Optional[int]:
+        arrival_ns = self._get("arrival_ns")
+        return None if arrival_ns == MISSING_NS else arrival_ns
+
+    @property
+    def arrival_time(self) -> Optional[pd.Timestamp]:
+        arrival_ns = self.arrival_ns
+        return None if arrival_ns is None else to_timestamp(arrival_ns,self.store.tz)
+
+    @property
+    def filled_qty(self) -> int:
+        return self._get("filled_qty")
+
+    @property
+    def fill_notional(self) -> float:
+        return self._get("fill_notional")
+
+    @property
+    def average_fill_price(self) -> Optional[float]:
+        filled_qty = self.filled_qty
+        return None if filled_qty == 0 else self.fill_notional / filled_qty
+
+    @property
+    def fills(self) -> None:
+        return None
+
+    def get_snapshot(self) -> OrderSnapshot:
+        return OrderSnapshot(self)
+
+    def __repr__(self) -> str:
+        return f"OrderRecord(order_id={self.order_id}, side={self.side}, order_type={self.order_type}, qty={self.qty}, remaining={self.remaining_qty}, state={self.state}, symbol={self.symbol!r})"
+
+class OrderStore(Mapping[int,OrderRecord]):
+    columns : Dict[str,np.ndarray]
+    length : int
+    index_ids : np.ndarray
+    index_rows : np.ndarray
+    recent : Dict[int,int]
+    pending : List[tuple]
+    symbols : List[str]
+    symbol_codes : Dict[str,int]
+    tz : Optional[object]
+
+    def __init__(self, capacity : int = 1024, tz = None) -> None:
+        if capacity <= 0:
+            raise ValueError(f"OrderStore created with non-positive capacity ({capacity}).")
+
+        self.columns = {name : np.empty(capacity,dtype=dtype) for name,dtype in ORDER_COLUMNS.items()}
+        self.length = 0
+        self.index_ids = np.empty(0,dtype=np.int64)
+        self.index_rows = np.empty(0,dtype=np.int64)
+        self.recent = {}
+        self.pending = []
+        self.symbols = []
+        self.symbol_codes = {}
+        self.tz = tz
+
+    @property
+    def capacity(self) -> int:
+        return len(self.columns["order_id"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def __getstate__(self) -> Dict:
+        # Only the used rows are pickled, unused capacity holds uninitialized memory.
+        self._flush()
+        state = dict(self.__dict__)
+        state["columns"] = {name : column[:self.length].copy() for name,column in self.columns.items()}
+        return state
+
+    def __setstate__(self, state : Dict) -> None:
+        self.__dict__.update(state)
+        if self.length == 0:
+            self.columns = {name : np.empty(1,dtype=dtype) for name,dtype in ORDER_COLUMNS.items()}
+
+    def _symbol_code(self, symbol : str) -> int:
+        code = self.symbol_codes.get(symbol)
+        if code is None:
+            code = self.symbol_codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def append(self, order_id : int, side : OrderSide, order_type : OrderType, qty : int, remaining : int, limit : Optional[float], state : OrderState, symbol : str,
+               arrival_ns : Optional[int] = None, filled_qty : int = 0, fill_notional : float = 0.0) -> int:
+        """Stores an order and returns its row. Order ids must be unique within a store."""
+        row = self.length + len(self.pending)
+        self.pending.append((order_id,side,order_type,qty,remaining,limit,state,symbol,arrival_ns,filled_qty,fill_notional))
+        self.recent[order_id] = row
+
+        if len(self.pending) >= FLUSH_ROWS:
+            self._flush()
+        if len(self.recent) > max(MERGE_MIN,len(self.index_ids) // 8):
+            self._merge()
+
+        return row
+
+    def _pending_value(self, row : int, column : str):
+        """A column value of a row still in the append buffer, encoded as in the columns."""
+        value = self.pending[row - self.length][PENDING_FIELDS[column]]
+        if column in CODES:
+            return CODES[column][value]
+        if column == "symbol":
+            return self._symbol_code(value)
+        if value is None:
+            return np.nan if column == "limit" else MISSING_NS
+        return value
+
+    def _flush(self) -> None:
+        pending = self.pending
+        if not pending:
+            return
+
+        begin,end = self.length,self.length + len(pending)
+        capacity = self.capacity
+        if end > capacity:
+            while end > capacity:
+                capacity *= 2
+            for name,column in self.columns.items():
+                grown = np.empty(capacity,dtype=column.dtype)
+                grown[:begin] = column[:begin]
+                self.columns[name] = grown
+
+        order_id,side,order_type,qty,remaining,limit,state,symbol,arrival_ns,filled_qty,fill_notional = zip(*pending)
+        columns = self.columns
+        columns["order_id"][begin:end] = order_id
+        columns["side"][begin:end] = [SIDE_CODES[value] for value in side]
+        columns["order_type"][begin:end] = [ORDER_TYPE_CODES[value] for value in order_type]
+        columns["qty"][begin:end] = qty
+        columns["remaining"][begin:end] = remaining
+        columns["limit"][begin:end] = [np.nan if value is None else value for value in limit]
+        columns["state"][begin:end] = [ORDER_STATE_CODES[value] for value in state]
+        columns["symbol"][begin:end] = [self._symbol_code(value) for value in symbol]
+        columns["arrival_ns"][begin:end] = [MISSING_NS if value is None else value for value in arrival_ns]
+        columns["filled_qty"][begin:end] = filled_qty
+        columns["fill_notional"][begin:end] = fill_notional
+
+        self.length = end
+        self.pending = []
+
+    def add_order_info(self, order_info : "OrderInfo", state : OrderState) -> int:
+        return self.append(order_info.order_id,order_info.side,order_info.order_type,order_info.qty,order_info.remaining_qty,order_info.limit,state,order_info.symbol,
+                           arrival_ns=order_info.arrival_ns,filled_qty=order_info.qty - order_info.remaining_qty,fill_notional=order_info.fill_notional)
+
+    def add_order(self, order : "Order", arrival_ns : Optional[int] = None) -> int:
+        return self.append(order.order_id,order.side,order.order_type,order.qty,order.remaining_quantity,order.limit,order.state,order.symbol,
+                           arrival_ns=arrival_ns,filled_qty=order.filled_qty,fill_notional=order.fill_notional)
+
+    def _merge(self) -> None:
+        ids = np.concatenate([self.index_ids,np.fromiter(self.recent.keys(),dtype=np.int64,count=len(self.recent))])
+        rows = np.concatenate([self.index_rows,np.fromiter(self.recent.values(),dtype=np.int64,count=len(self.recent))])
+
+        order = np.argsort(ids,kind="stable")
+        self.index_ids,self.index_rows = ids[order],rows[order]
+        self.recent = {}
+
+    def _row(self, order_id : int) -> int:
+        row = self.recent.get(order_id)
+        if row is not None:
+            return row
+
+        index_ids = self.index_ids
+        i = int(index_ids.searchsorted(order_id))
+        if i < len(index_ids) and index_ids[i] == order_id:
+            return int(self.index_rows[i])
+        return -1
+
+    def column(self, name : str) -> np.ndarray:
+        """The stored values of one column, a view that is invalidated by the next append."""
+        self._flush()
+        return self.columns[name][:self.length]
+
+    def __getitem__(self, order_id : int) -> OrderRecord:
+        row = self._row(order_id) if isinstance(order_id,(int,np.integer)) else -1
+        if row < 0:
+            raise KeyError(order_id)
+        return OrderRecord(self,row)
+
+    def __contains__(self, order_id : object) -> bool:
+        return isinstance(order_id,(int,np.integer)) and self._row(order_id) >= 0
+
+    def __len__(self) -> int:
+        return self.length + len(self.pending)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.column("order_id").tolist())
@@ -8,7 +8,7 @@ from sim.order_info import OrderInfo,OrderType
 if TYPE_CHECKING:
     from sim import *
 
-@dataclass(frozen=True)
+@dataclass(frozen=True,slots=True)
 class OrderSubmission():
     order_id : int
     side : "OrderSide"
@@ -17,6 +17,18 @@ class OrderSubmission():
     order_type : "OrderType"
     limit : Optional[float] = None
 
+    @classmethod
+    def _make(cls, order_id : int, side : "OrderSide", qty : int, symbol : str, order_type : "OrderType", limit : Optional[float] = None) -> "OrderSubmission":
+        """Submission of an Order, whose OrderRequest already validated these fields."""
+        self = object.__new__(cls)
+        _set_order_id(self,order_id)
+        _set_side(self,side)
+        _set_qty(self,qty)
+        _set_symbol(self,symbol)
+        _set_order_type(self,order_type)
+        _set_limit(self,limit)
+        return self
+
     def __post_init__(self):
         #Validate Qty
         if self.qty <= 0:
@@ -30,11 +42,18 @@ class OrderSubmission():
         if self.limit and self.limit <= 0:
             raise ValueError(f"OrderSubmission created with non-positive limit ({self.limit}).")
         
-    def get_info(self, arrival_time : pd.Timestamp):
+    def get_info(self, arrival_time : pd.Timestamp, tz = None):
+        if type(arrival_time) is int:
+            return OrderInfo._make(self.order_id,arrival_time,self.side,self.qty,self.order_type,self.symbol,self.limit,self.qty,tz=tz)
+
         return OrderInfo(order_id=self.order_id,
                          arrival_time=arrival_time,
                          side=self.side,
                          remaining_qty=self.qty,
                          order_type=self.order_type,
                          limit=self.limit,
-                         symbol=self.symbol)
\ No newline at end of file
+                         symbol=self.symbol,
+                         qty=self.qty,
+                         tz=tz)
+
+_set_order_id,_set_side,_set_qty,_set_symbol,_set_order_type,_set_limit = (getattr(OrderSubmission,name).__set__ for name in ["order_id","side","qty","symbol","order_type","limit"])
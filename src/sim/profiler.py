@@ -0,0 +1,159 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any,Callable,Dict,Iterator,List,Tuple,Union,TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+Engine Profiler
+
+Responsibilities
+- Collect wall time statistics per event type and per simulator section during Engine.run.
+- Sample the event queue depth over simulated time.
+- Export the results as a dict, a flat CSV or JSON.
+
+Design Notes: The engine checks for a profiler once per run; without one its loop skips every timing hook. Sections are nested inside event timings: strategy.run, snapshot.market and snapshot.broker sit inside RUN_STRATEGY, and market_data.* lookups inside the market handlers. Lookup timing wraps the bound methods of each MarketData instance for the duration of the run only.
+"""
+
+PathLike = Union[str,Path]
+
+LOOKUP_METHODS = ["current_open","current_bar","most_recent_bar"]
+
+class TimingStats:
+    count : int
+    total : float
+    min : float
+    max : float
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, elapsed : float) -> None:
+        self.count += 1
+        self.total += elapsed
+        if elapsed < self.min:
+            self.min = elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str,float]:
+        return {"count" : self.count,
+                "total" : self.total,
+                "mean" : self.mean,
+                "min" : self.min if self.count else 0.0,
+                "max" : self.max}
+
+class EngineProfiler:
+    """
+    Attach with Engine.attach_profiler. Statistics accumulate across runs until reset.
+    """
+    events : Dict[str,TimingStats]
+    sections : Dict[str,TimingStats]
+    depth_samples : List[Tuple[int,int,int]]
+    sample_every : int
+    event_count : int
+    max_depth : int
+    wall_time : float
+
+    def __init__(self, sample_every : int = 100) -> None:
+        if sample_every <= 0:
+            raise ValueError(f"EngineProfiler created with non-positive sample interval ({sample_every}).")
+
+        self.sample_every = sample_every
+        self.reset()
+
+    def reset(self) -> None:
+        self.events = {}
+        self.sections = {}
+        self.depth_samples = []
+        self.event_count = 0
+        self.max_depth = 0
+        self.wall_time = 0.0
+
+    def _stats(self, table : Dict[str,TimingStats], name : str) -> TimingStats:
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = TimingStats()
+        return stats
+
+    def record_event(self, event_type, elapsed : float, ts_ns : int, depth : int) -> None:
+        name = event_type.name if hasattr(event_type,"name") else str(event_type)
+        self._stats(self.events,name).add(elapsed)
+
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.event_count % self.sample_every == 0:
+            self.depth_samples.append((self.event_count,ts_ns,depth))
+        self.event_count += 1
+
+    def call(self, section : str, fn : Callable, *args) -> Any:
+        begin = time.perf_counter()
+        result = fn(*args)
+        self._stats(self.sections,section).add(time.perf_counter() - begin)
+
+        return result
+
+    def timed(self, section : str, fn : Callable) -> Callable:
+        stats = self._stats(self.sections,section)
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            begin = perf_counter()
+            result = fn(*args,**kwargs)
+            stats.add(perf_counter() - begin)
+            return result
+
+        return wrapper
+
+    @contextmanager
+    def instrument_market_datas(self, market_datas : Dict[str,"MarketData"]) -> Iterator[None]:
+        instrumented = {}
+        for market_data in market_datas.values():
+            if id(market_data) in instrumented:
+                continue
+            for method in LOOKUP_METHODS:
+                setattr(market_data,method,self.timed(f"market_data.{method}",getattr(market_data,method)))
+            instrumented[id(market_data)] = market_data
+
+        try:
+            yield
+        finally:
+            for market_data in instrumented.values():
+                for method in LOOKUP_METHODS:
+                    delattr(market_data,method)
+
+    def to_dict(self) -> Dict[str,Any]:
+        return {"wall_time" : self.wall_time,
+                "event_count" : self.event_count,
+                "events_per_sec" : self.event_count / self.wall_time if self.wall_time else 0.0,
+                "max_queue_depth" : self.max_depth,
+                "events" : {name : stats.to_dict() for name,stats in self.events.items()},
+                "sections" : {name : stats.to_dict() for name,stats in self.sections.items()},
+                "queue_depth" : [{"event" : i, "ts_ns" : ts_ns, "depth" : depth} for i,ts_ns,depth in self.depth_samples]}
+
+    def to_rows(self) -> List[Dict[str,Any]]:
+        """One flat row per event type and section."""
+        rows = [{"kind" : "event", "name" : name, **stats.to_dict()} for name,stats in self.events.items()]
+        rows += [{"kind" : "section", "name" : name, **stats.to_dict()} for name,stats in self.sections.items()]
+        return rows
+
+    def to_csv(self, path : PathLike) -> None:
+        with open(path,"w",newline="") as f:
+            writer = csv.DictWriter(f,fieldnames=["kind","name","count","total","mean","min","max"])
+            writer.writeheader()
+            writer.writerows(self.to_rows())
+
+    def to_json(self, path : PathLike) -> None:
+        with open(path,"w") as f:
+            json.dump(self.to_dict(),f,indent=2)
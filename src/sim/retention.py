@@ -0,0 +1,233 @@
+import json
+import tempfile
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Dict,Iterator,List,Mapping,Optional,Union,TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from sim.cancellation import CancellationState
+from sim.order import OrderState
+from sim.order_store import ORDER_COLUMNS,ORDER_STATES,ORDER_TYPES,SIDES,OrderRecord,OrderStore
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+Retention
+
+Responsibilities
+- Configure how long Broker and Market keep terminal (filled or cancelled) orders in their working dicts.
+- Compact retired orders into an append-only columnar OrderArchive, optionally spilled to disk, and keep summary totals over every retired order.
+
+Design Notes: KEEP_ALL keeps every order in the working dicts and is the default. KEEP_LAST keeps the last keep terminal orders there, so strategies still see recent fills in their snapshots, and retires older ones into the archive. SUMMARY_ONLY retires an order as soon as it is terminal and keeps only the summary. The archive holds rows in OrderStore blocks of block_rows orders sharing one symbol table. Blocks beyond memory_rows are written as .npz files to a fresh directory the archive creates inside spill_dir, so runs sharing a spill_dir never collide, or, without a spill_dir, dropped, so memory stays bounded while to_frame still returns every order that was kept or spilled.
+"""
+
+PathLike = Union[str,Path]
+
+class RetentionMode(Enum):
+    KEEP_ALL = "KEEP_ALL"
+    KEEP_LAST = "KEEP_LAST"
+    SUMMARY_ONLY = "SUMMARY_ONLY"
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    mode : RetentionMode = RetentionMode.KEEP_ALL
+    keep : int = 0
+    spill_dir : Optional[Path] = None
+    block_rows : int = 65536
+
+    def __post_init__(self) -> None:
+        if self.keep < 0:
+            raise ValueError(f"RetentionPolicy created with negative keep ({self.keep}).")
+        if self.block_rows <= 0:
+            raise ValueError(f"RetentionPolicy created with non-positive block_rows ({self.block_rows}).")
+        if self.spill_dir is not None and self.mode != RetentionMode.KEEP_LAST:
+            raise ValueError(f"RetentionPolicy {self.mode.value} does not spill orders.")
+        if self.spill_dir is not None and not isinstance(self.spill_dir,Path):
+            object.__setattr__(self,"spill_dir",Path(self.spill_dir))
+
+    @classmethod
+    def keep_all(cls) -> "RetentionPolicy":
+        return cls()
+
+    @classmethod
+    def keep_last(cls, n : int, spill_dir : Optional[PathLike] = None, block_rows : int = 65536) -> "RetentionPolicy":
+        return cls(RetentionMode.KEEP_LAST,n,spill_dir,block_rows)
+
+    @classmethod
+    def summary_only(cls) -> "RetentionPolicy":
+        return cls(RetentionMode.SUMMARY_ONLY)
+
+    @property
+    def compacts(self) -> bool:
+        return self.mode != RetentionMode.KEEP_ALL
+
+@dataclass
+class ArchiveSummary:
+    orders : int = 0
+    filled : int = 0
+    cancelled : int = 0
+    filled_qty : int = 0
+    fill_notional : float = 0.0
+    cancellations : int = 0
+    no_op_cancellations : int = 0
+
+class OrderArchive(Mapping[int,OrderRecord]):
+    """
+    Append-only archive of retired orders. Lookups see the blocks still in memory, summary and to_frame cover every archived order.
+    """
+    name : str
+    rows : bool
+    memory_rows : Optional[int]
+    spill_dir : Optional[Path]
+    spill_path : Optional[Path]
+    block_rows : int
+
+    summary : ArchiveSummary
+    blocks : List[OrderStore]
+    rows_in_memory : int
+    spilled : List[Path]
+    dropped_rows : int
+    symbols : List[str]
+    symbol_codes : Dict[str,int]
+    spilled_symbols : int
+    tz : Optional[object]
+
+    def __init__(self, name : str, rows : bool = True, memory_rows : Optional[int] = None, spill_dir : Optional[PathLike] = None, block_rows : int = 65536, tz = None) -> None:
+        if block_rows <= 0:
+            raise ValueError(f"OrderArchive created with non-positive block_rows ({block_rows}).")
+
+        self.name = name
+        self.rows = rows
+        self.memory_rows = memory_rows
+        self.spill_dir = None if spill_dir is None else Path(spill_dir)
+        self.spill_path = None
+        self.block_rows = block_rows
+        self.tz = tz
+
+        self.summary = ArchiveSummary()
+        self.rows_in_memory = 0
+        self.spilled = []
+        self.dropped_rows = 0
+        self.symbols = []
+        self.symbol_codes = {}
+        self.spilled_symbols = 0
+        self.blocks = [self._new_block()]
+
+    def _new_block(self) -> OrderStore:
+        block = OrderStore(min(self.block_rows,1024),self.tz)
+        block.symbols = self.symbols
+        block.symbol_codes = self.symbol_codes
+        return block
+
+    def add_order(self, order : "Order", cancellation : Optional["Cancellation"] = None) -> None:
+        summary = self.summary
+        summary.orders += 1
+        summary.filled += order.state == OrderState.FILLED
+        summary.cancelled += order.state == OrderState.CANCELLED
+        summary.filled_qty += order.filled_qty
+        summary.fill_notional += order.fill_notional
+        if cancellation is not None:
+            summary.cancellations += 1
+            summary.no_op_cancellations += cancellation.state == CancellationState.NO_OP
+
+        if self.rows:
+            self.blocks[-1].add_order(order)
+            self._appended()
+
+    def add_order_info(self, order_info : "OrderInfo", state : OrderState) -> None:
+        summary = self.summary
+        summary.orders += 1
+        summary.filled += state == OrderState.FILLED
+        summary.cancelled += state == OrderState.CANCELLED
+        summary.filled_qty += order_info.qty - order_info.remaining_qty
+        summary.fill_notional += order_info.fill_notional
+
+        if self.rows:
+            self.blocks[-1].add_order_info(order_info,state)
+            self._appended()
+
+    def _appended(self) -> None:
+        self.rows_in_memory += 1
+        if len(self.blocks[-1]) < self.block_rows:
+            return
+
+        self.blocks.append(self._new_block())
+        if self.memory_rows is None:
+            return
+
+        while len(self.blocks) > 1 and self.rows_in_memory - len(self.blocks[0]) >= self.memory_rows:
+            block = self.blocks.pop(0)
+            self.rows_in_memory -= len(block)
+            if self.spill_dir is None:
+                self.dropped_rows += len(block)
+            else:
+                self._spill(block)
+
+    def _spill(self, block : OrderStore) -> None:
+        if self.spill_path is None:
+            self.spill_dir.mkdir(parents=True,exist_ok=True)
+            self.spill_path = Path(tempfile.mkdtemp(prefix=f"{self.name}_",dir=self.spill_dir))
+
+        path = self.spill_path / f"{len(self.spilled):06d}.npz"
+        np.savez(path,**{name : block.column(name) for name in ORDER_COLUMNS})
+
+        # Spilled blocks only use symbols known by now, so the file is rewritten only when that set grew.
+        if len(self.symbols) > self.spilled_symbols:
+            with open(self.spill_path / "symbols.json","w") as f:
+                json.dump(self.symbols,f)
+            self.spilled_symbols = len(self.symbols)
+
+        self.spilled.append(path)
+
+    def columns(self) -> Dict[str,np.ndarray]:
+        """Every kept or spilled row, oldest first. Symbols are codes into symbols."""
+        parts = []
+        for path in self.spilled:
+            with np.load(path) as data:
+                parts.append({name : data[name] for name in ORDER_COLUMNS})
+        parts += [{name : block.column(name) for name in ORDER_COLUMNS} for block in self.blocks]
+
+        return {name : np.concatenate([part[name] for part in parts]) for name in ORDER_COLUMNS}
+
+    def to_frame(self) -> pd.DataFrame:
+        return order_frame(self.columns(),self.symbols,self.tz)
+
+    def __getitem__(self, order_id : int) -> OrderRecord:
+        for block in reversed(self.blocks):
+            if order_id in block:
+                return block[order_id]
+        raise KeyError(order_id)
+
+    def __contains__(self, order_id : object) -> bool:
+        return any(order_id in block for block in self.blocks)
+
+    def __len__(self) -> int:
+        return self.rows_in_memory
+
+    def __iter__(self) -> Iterator[int]:
+        for block in self.blocks:
+            yield from block
+
+def order_frame(columns : Dict[str,np.ndarray], symbols : List[str], tz = None) -> pd.DataFrame:
+    """Decodes order columns into a DataFrame with enum, symbol, NaN limit and NaT arrival values."""
+    arrival_time = pd.DatetimeIndex(columns["arrival_ns"].view("datetime64[ns]"))
+    if tz is not None:
+        arrival_time = arrival_time.tz_localize("UTC").tz_convert(tz)
+
+    return pd.DataFrame({
+        "order_id" : columns["order_id"],
+        "side" : [SIDES[code] for code in columns["side"]],
+        "order_type" : [ORDER_TYPES[code] for code in columns["order_type"]],
+        "qty" : columns["qty"],
+        "remaining" : columns["remaining"],
+        "limit" : columns["limit"],
+        "state" : [ORDER_STATES[code] for code in columns["state"]],
+        "symbol" : [symbols[code] for code in columns["symbol"]],
+        "arrival_time" : arrival_time,
+        "filled_qty" : columns["filled_qty"],
+        "fill_notional" : columns["fill_notional"]
+    })
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict,List,Optional,Set
+
+import numpy as np
+
+from sim.market_data import MarketData,TIMESTAMP_COLUMNS,FLOAT_COLUMNS,INT_COLUMNS
+from sim.timestamps import tz_key,tz_from_key
+
+"""
+Shared Market Data
+
+Responsibilities
+- Publish MarketData columns into multiprocessing.shared_memory blocks.
+- Attach read-only, zero-copy MarketData instances to published blocks from any process.
+
+Design Notes: Each symbol is one block holding its columns back to back, all 8 byte wide. A SharedMarketDataSpec is a few bytes to pickle, so workers receive specs instead of data. The tz travels as its IANA name or fixed offset, other tz objects are rejected at publish time. The publishing process owns the blocks and must close (and unlink) them once every attached process is done.
+"""
+
+SHARED_COLUMNS = [(col,np.int64) for col in TIMESTAMP_COLUMNS] + [(col,np.float64) for col in FLOAT_COLUMNS] + [(col,np.int64) for col in INT_COLUMNS]
+
+# Blocks created by this process stay registered with the resource tracker.
+_published_names : Set[str] = set()
+
+@dataclass(frozen=True)
+class SharedMarketDataSpec:
+    shm_name : str
+    length : int
+    tz : Optional[str]
+
+def _attach_block(name : str) -> SharedMemory:
+    if name in _published_names:
+        return SharedMemory(name=name)
+
+    try:
+        return SharedMemory(name=name,track=False)
+    except TypeError:
+        # Python < 3.13 registers attached blocks with the resource tracker, which would unlink them when this process exits.
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name,"shared_memory")
+        return shm
+
+def _column_views(buffer, length : int) -> Dict[str,np.ndarray]:
+    columns = {}
+    for i,(col,dtype) in enumerate(SHARED_COLUMNS):
+        columns[col] = np.ndarray((length,),dtype=dtype,buffer=buffer,offset=i * 8 * length)
+    return columns
+
+class SharedMarketData:
+    """
+    Owner of the shared memory blocks published for a set of MarketDatas. Usable as a context manager which unlinks the blocks on exit.
+    """
+    specs : Dict[str,SharedMarketDataSpec]
+    blocks : List[SharedMemory]
+
+    def __init__(self, market_datas : Dict[str,MarketData]) -> None:
+        self.specs = {}
+        self.blocks = []
+        tzs = {symbol : tz_key(market_data.tz) for symbol,market_data in market_datas.items()}
+
+        try:
+            for symbol,market_data in market_datas.items():
+                length = len(market_data)
+                shm = SharedMemory(create=True,size=max(len(SHARED_COLUMNS) * 8 * length,1))
+                self.blocks.append(shm)
+                _published_names.add(shm.name)
+
+                for col,view in _column_views(shm.buf,length).items():
+                    view[:] = market_data.columns[col]
+
+                self.specs[symbol] = SharedMarketDataSpec(shm_name=shm.name,length=length,tz=tzs[symbol])
+        except BaseException:
+            self.unlink()
+            raise
+
+    def close(self) -> None:
+        for shm in self.blocks:
+            shm.close()
+
+    def unlink(self) -> None:
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+            _published_names.discard(shm.name)
+        self.blocks = []
+
+    def __enter__(self) -> "SharedMarketData":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.unlink()
+
+def attach_market_data(spec : SharedMarketDataSpec) -> MarketData:
+    shm = _attach_block(spec.shm_name)
+
+    columns = _column_views(shm.buf,spec.length)
+    for column in columns.values():
+        column.flags.writeable = False
+
+    market_data = MarketData.from_columns(columns,tz=tz_from_key(spec.tz),validate=False)
+    # The views borrow the block's buffer, so the block must live as long as the MarketData.
+    market_data._shm = shm
+
+    return market_data
+
+def attach_market_datas(specs : Dict[str,SharedMarketDataSpec]) -> Dict[str,MarketData]:
+    return {symbol : attach_market_data(spec) for symbol,spec in specs.items()}
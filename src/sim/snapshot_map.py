@@ -0,0 +1,73 @@
+from typing import Dict,Iterable,Iterator,Mapping,TypeVar
+
+"""
+SnapshotMap
+
+Responsibilities
+- Immutable int keyed mapping that is cheap to copy with a few entries changed.
+
+Design Notes: Keys are grouped into pages of 2**PAGE_BITS consecutive ids. updated copies only the pages holding changed keys and shares the rest with the previous map, so publishing a new version costs O(changes + pages) instead of O(entries). Pages are never mutated once a map refers to them. Removed keys are dropped from their copied page and empty pages are dropped from the map.
+"""
+
+PAGE_BITS = 10
+
+V = TypeVar("V")
+
+class SnapshotMap(Mapping[int,V]):
+    __slots__ = ("pages","length")
+
+    pages : Dict[int,Dict[int,V]]
+    length : int
+
+    def __init__(self, pages : Dict[int,Dict[int,V]] = None, length : int = 0) -> None:
+        self.pages = {} if pages is None else pages
+        self.length = length
+
+    def __getitem__(self, key : int) -> V:
+        page = self.pages.get(key >> PAGE_BITS)
+        if page is None:
+            raise KeyError(key)
+        return page[key]
+
+    def __contains__(self, key) -> bool:
+        page = self.pages.get(key >> PAGE_BITS)
+        return page is not None and key in page
+
+    def __iter__(self) -> Iterator[int]:
+        for page in self.pages.values():
+            yield from page
+
+    def __len__(self) -> int:
+        return self.length
+
+    def updated(self, changes : Mapping[int,V], removed : Iterable[int] = ()) -> "SnapshotMap[V]":
+        pages = dict(self.pages)
+        length = self.length
+        copied = set()
+
+        for key,value in changes.items():
+            page_no = key >> PAGE_BITS
+            if page_no not in copied:
+                pages[page_no] = dict(pages.get(page_no,()))
+                copied.add(page_no)
+
+            page = pages[page_no]
+            if key not in page:
+                length += 1
+            page[key] = value
+
+        for key in removed:
+            page_no = key >> PAGE_BITS
+            if key not in pages.get(page_no,()):
+                continue
+            if page_no not in copied:
+                pages[page_no] = dict(pages[page_no])
+                copied.add(page_no)
+
+            page = pages[page_no]
+            del page[key]
+            length -= 1
+            if not page:
+                del pages[page_no]
+
+        return SnapshotMap(pages,length)
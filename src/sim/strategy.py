@@ -1,5 +1,5 @@
 from abc import ABC,abstractmethod
-from typing import List,Tuple,TYPE_CHECKING
+from typing import Any,List,Tuple,TYPE_CHECKING
 
 if TYPE_CHECKING:
     from sim import *
@@ -9,4 +9,11 @@ class Strategy(ABC):
         super().__init__()
 
     def run(self, market_snapshot : "MarketSnapshot", broker_snapshot : "BrokerSnapshot") -> Tuple[List["OrderRequest"],List["CancellationRequest"]]:
-        return [],[]
\ No newline at end of file
+        return [],[]
+
+    def get_state(self) -> Any:
+        """State saved in engine checkpoints. Defaults to the instance attributes."""
+        return dict(self.__dict__)
+
+    def set_state(self, state : Any) -> None:
+        self.__dict__.update(state)
\ No newline at end of file
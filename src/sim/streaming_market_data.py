@@ -0,0 +1,163 @@
+from pathlib import Path
+from typing import Callable,Dict,Iterator,List,Optional,Union
+
+import numpy as np
+import pandas as pd
+
+from sim.market_data import MarketData,MarketDataSnapshot,TIMESTAMP_COLUMNS,FLOAT_COLUMNS,INT_COLUMNS
+from sim.timestamps import column_to_ns,to_ns
+
+"""
+Streaming Market Data
+
+Responsibilities
+- Read bars from CSV or Parquet in chunks as simulation time advances.
+- Keep only a bounded window of bars: the unread part of the current chunk plus a lookback of completed bars.
+- Validate every chunk, and the seam to the previous chunk, as it is read.
+
+Design Notes: The window is an ordinary set of MarketData columns, so lookups reuse BarIndex. offset is the position of the first retained bar in the full history. A lookup first reads chunks until a bar starting after the query time is loaded, then drops completed bars beyond the lookback, so memory is bounded by lookback plus two chunks regardless of history length. Queries must not go back in time past the retained window. Snapshots are taken over a frozen view of the window, so they stay valid after it moves on. Bar boundary event sources re-read only the timestamp column through a separate reader.
+"""
+
+# Called with the columns to read (None for all), returns DataFrame chunks in file order.
+ChunkReader = Callable[[Optional[List[str]]],Iterator[pd.DataFrame]]
+
+PathLike = Union[str,Path]
+
+STREAM_COLUMNS = TIMESTAMP_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS
+
+def csv_chunks(path : PathLike, chunksize : int = 100_000, **read_csv_kwargs) -> ChunkReader:
+    def read(columns : Optional[List[str]]) -> Iterator[pd.DataFrame]:
+        parse_dates = [col for col in TIMESTAMP_COLUMNS if columns is None or col in columns]
+        return iter(pd.read_csv(path,chunksize=chunksize,usecols=columns,parse_dates=parse_dates,**read_csv_kwargs))
+    return read
+
+def parquet_chunks(path : PathLike, batch_size : int = 100_000) -> ChunkReader:
+    def read(columns : Optional[List[str]]) -> Iterator[pd.DataFrame]:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet market data requires pyarrow.") from e
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size,columns=columns):
+            yield batch.to_pandas()
+    return read
+
+class StreamingMarketData(MarketData):
+    """
+    MarketData over a chunked reader. len, columns, df and bar_at refer to the retained window, offset + i is the position of window bar i in the full history.
+    """
+    reader : ChunkReader
+    chunks : Iterator[pd.DataFrame]
+    lookback : int
+    offset : int
+    exhausted : bool
+    _frozen : Optional[MarketData]
+
+    def __init__(self, reader : ChunkReader, lookback : int = 1) -> None:
+        if lookback < 0:
+            raise ValueError(f"StreamingMarketData created with negative lookback ({lookback}).")
+
+        self.reader = reader
+        self.chunks = iter(reader(None))
+        self.lookback = lookback
+        self.offset = 0
+        self.exhausted = False
+        self._df = None
+        self._frozen = None
+
+        self._set_columns({col : np.empty(0,dtype=np.float64 if col in FLOAT_COLUMNS else np.int64) for col in STREAM_COLUMNS},None)
+        self._load_chunk(None)
+
+    @classmethod
+    def from_csv(cls, path : PathLike, chunksize : int = 100_000, lookback : int = 1, **read_csv_kwargs) -> "StreamingMarketData":
+        return cls(csv_chunks(path,chunksize,**read_csv_kwargs),lookback)
+
+    @classmethod
+    def from_parquet(cls, path : PathLike, batch_size : int = 100_000, lookback : int = 1) -> "StreamingMarketData":
+        return cls(parquet_chunks(path,batch_size),lookback)
+
+    def ensure_lookback(self, n : int) -> None:
+        """Retain at least n completed bars from now on. Bars already dropped are not read again."""
+        self.lookback = max(self.lookback,n)
+
+    def _validate_chunk(self, df : pd.DataFrame, chunk : Dict[str,np.ndarray]) -> None:
+        position = self.offset + len(self)
+
+        validity,msg = MarketData.validate_dtypes(df)
+        if not validity:
+            raise ValueError(f"Market Data chunk starting at bar {position} is invalid : {msg}")
+
+        start_ns,end_ns = chunk["start_ts"],chunk["end_ts"]
+        if position > 0:
+            if df["start_ts"].dt.tz != self.tz:
+                raise ValueError(f"Market Data chunk starting at bar {position} changes timezone.")
+
+            # Prepend the previous bar to continue the checks across the chunk boundary.
+            start_ns = np.concatenate([self.index.start_ns[-1:],start_ns])
+            end_ns = np.concatenate([self.index.end_ns[-1:],end_ns])
+            position -= 1
+
+        i,msg = MarketData.first_invalid_bar(start_ns,end_ns)
+        if i >= 0:
+            raise ValueError(f"Market Data chunk starting at bar {self.offset + len(self)} is invalid : {msg} at bar {position + i}")
+
+    def _load_chunk(self, ns : Optional[int]) -> bool:
+        for df in self.chunks:
+            if len(df) == 0:
+                continue
+
+            chunk = MarketData.df_to_columns(df)
+            self._validate_chunk(df,chunk)
+
+            if self.offset + len(self) == 0:
+                self.tz = df["start_ts"].dt.tz
+
+            # Completed bars beyond the lookback are dropped. One is always kept for most_recent_bar.
+            keep = 0 if ns is None else max(self.index.count_ended(ns) - max(self.lookback,1),0)
+
+            columns = {col : np.concatenate([self.columns[col][keep:],chunk[col]]) for col in STREAM_COLUMNS}
+            self.offset += keep
+            self._set_columns(columns,self.tz)
+            self._frozen = None
+
+            return True
+
+        self.exhausted = True
+        return False
+
+    def _advance(self, ns : int) -> None:
+        start_ns = self.index.start_ns
+        if self.offset > 0 and ns < start_ns[0]:
+            raise ValueError("StreamingMarketData queried before its retained window.")
+
+        while not self.exhausted and (len(start_ns) == 0 or start_ns[-1] <= ns):
+            self._load_chunk(ns)
+            start_ns = self.index.start_ns
+
+    def boundary_chunks(self, column : str) -> Iterator[np.ndarray]:
+        for df in self.reader([column]):
+            if len(df) > 0:
+                yield column_to_ns(df[column])
+
+    def current_bar(self, ts : pd.Timestamp):
+        ns = to_ns(ts)
+        self._advance(ns)
+        return super().current_bar(ns)
+
+    def most_recent_bar(self, ts : pd.Timestamp):
+        ns = to_ns(ts)
+        self._advance(ns)
+        return super().most_recent_bar(ns)
+
+    def current_open(self, ts : pd.Timestamp) -> float | None:
+        ns = to_ns(ts)
+        self._advance(ns)
+        return super().current_open(ns)
+
+    def get_snapshot(self, ts : pd.Timestamp) -> MarketDataSnapshot:
+        ns = to_ns(ts)
+        self._advance(ns)
+
+        if self._frozen is None:
+            self._frozen = MarketData.from_columns(self.columns,self.tz,validate=False)
+        return MarketDataSnapshot(self._frozen,ns)
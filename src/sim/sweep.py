@@ -0,0 +1,101 @@
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any,Callable,Dict,Iterable,List,Optional,Sequence,Union,TYPE_CHECKING
+
+from sim.portfolio import PortfolioSnapshot
+from sim.shared_market_data import SharedMarketData,SharedMarketDataSpec,attach_market_datas
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+Sweep
+
+Responsibilities
+- Run many engine configurations over the same market data in a process pool.
+
+Design Notes: Market data reaches each worker once through the pool initializer instead of being pickled with every task. With shared_memory=True the columns are published once into shared memory and workers attach zero-copy views. The factory must be a picklable (module level) callable building an Engine, with events or sources already scheduled, from a parameter dict and the worker's market data. Results are returned in parameter order.
+"""
+
+EngineFactory = Callable[[Dict[str,Any],Dict[str,"MarketData"]],"Engine"]
+
+@dataclass(frozen=True)
+class SweepResult:
+    index : int
+    params : Dict[str,Any]
+    portfolio : PortfolioSnapshot
+    order_count : int
+    fill_count : int
+    event_count : int
+    wall_time : float
+
+_worker_market_datas : Optional[Dict[str,"MarketData"]] = None
+
+def _init_worker(market_datas : Dict[str,"MarketData"]) -> None:
+    global _worker_market_datas
+    _worker_market_datas = market_datas
+
+def _init_shared_worker(specs : Dict[str,SharedMarketDataSpec]) -> None:
+    _init_worker(attach_market_datas(specs))
+
+def _run_task(factory : EngineFactory, index : int, params : Dict[str,Any]) -> SweepResult:
+    if _worker_market_datas is None:
+        raise RuntimeError("Sweep task run without worker market data.")
+
+    begin = time.perf_counter()
+
+    engine = factory(params,_worker_market_datas)
+    engine.run()
+
+    wall_time = time.perf_counter() - begin
+
+    portfolio = engine.broker.portfolio
+    return SweepResult(index=index,
+                       params=params,
+                       portfolio=PortfolioSnapshot(cash=portfolio.cash,
+                                                   positions=dict(portfolio.positions),
+                                                   average_costs=dict(portfolio.average_costs),
+                                                   realized_pnl=portfolio.realized_pnl),
+                       order_count=engine.broker.order_count,
+                       fill_count=engine.broker.fill_count,
+                       event_count=engine.enqueue_id,
+                       wall_time=wall_time)
+
+def expand_grid(param_grid : Dict[str,Sequence[Any]]) -> List[Dict[str,Any]]:
+    """Cartesian product of the grid, last key varying fastest."""
+    keys = list(param_grid)
+    return [dict(zip(keys,values)) for values in itertools.product(*(param_grid[key] for key in keys))]
+
+def run_sweep(factory : EngineFactory, param_grid : Union[Dict[str,Sequence[Any]],Iterable[Dict[str,Any]]], market_datas : Dict[str,"MarketData"], max_workers : Optional[int] = None, chunksize : int = 1, shared_memory : bool = False) -> List[SweepResult]:
+    """
+    Run factory(params,market_datas).run() for every parameter set.
+
+    param_grid is either a dict of value lists expanded with expand_grid or an iterable of parameter dicts. max_workers=0 runs in the calling process.
+    """
+    if isinstance(param_grid,dict):
+        params_list = expand_grid(param_grid)
+    else:
+        params_list = list(param_grid)
+
+    task = partial(_run_task,factory)
+    indices = range(len(params_list))
+
+    if max_workers == 0:
+        global _worker_market_datas
+        previous = _worker_market_datas
+        _init_worker(market_datas)
+        try:
+            return [task(i,params) for i,params in zip(indices,params_list)]
+        finally:
+            _worker_market_datas = previous
+
+    if shared_memory:
+        with SharedMarketData(market_datas) as shared:
+            with ProcessPoolExecutor(max_workers=max_workers,initializer=_init_shared_worker,initargs=(shared.specs,)) as executor:
+                return list(executor.map(task,indices,params_list,chunksize=chunksize))
+
+    with ProcessPoolExecutor(max_workers=max_workers,initializer=_init_worker,initargs=(market_datas,)) as executor:
+        return list(executor.map(task,indices,params_list,chunksize=chunksize))
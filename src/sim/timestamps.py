@@ -0,0 +1,81 @@
+import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+"""
+Timestamps
+
+Responsibilities
+- Convert between pandas time objects and int64 nanoseconds since epoch.
+- Name timezones in a string form that can be stored and turned back into the same tz.
+
+Design Notes: The event loop keeps time as int nanoseconds and converts to pd.Timestamp only at user facing edges. Timezone aware values are normalized to UTC nanoseconds. Objects that hand out timestamps keep the tz of the value they were given or of the market data, and convert back in it, naive values convert back naive.
+"""
+
+def to_ns(ts) -> int:
+    if type(ts) is int:
+        return ts
+
+    return pd.Timestamp(ts).value
+
+def to_ns_delta(delta) -> int:
+    if type(delta) is int:
+        return delta
+
+    return pd.Timedelta(delta).value
+
+def to_timestamp(ns : int, tz = None) -> pd.Timestamp:
+    if tz is None:
+        return pd.Timestamp(ns)
+
+    return pd.Timestamp(ns,tz="UTC").tz_convert(tz)
+
+def timestamp_tz(ts):
+    """tz of a timestamp like value, None for naive values and int ns."""
+    if type(ts) is int:
+        return None
+
+    return getattr(ts,"tzinfo",None)
+
+def tz_key(tz) -> Optional[str]:
+    """
+    IANA name or fixed UTC offset ("+05:30") for tz, which pandas turns back into the same tz. None for naive.
+
+    Raises ValueError for tz objects without such a name, e.g. dateutil zones read from a file.
+    """
+    if tz is None:
+        return None
+    if isinstance(tz,str):
+        tz = tz_from_key(tz)
+
+    if isinstance(tz,ZoneInfo):
+        key = tz.key
+    elif isinstance(tz,datetime.timezone):
+        seconds = int(tz.utcoffset(None).total_seconds())
+        sign = "-" if seconds < 0 else "+"
+        hours,minutes = divmod(abs(seconds) // 60,60)
+        key = "UTC" if seconds == 0 else f"{sign}{hours:02d}:{minutes:02d}"
+    else:
+        key = str(tz)
+
+    try:
+        restored = tz_from_key(key)
+    except Exception:
+        restored = None
+    if restored != tz:
+        raise ValueError(f"Timezone {tz!r} has no IANA name or fixed offset that round-trips.")
+
+    return key
+
+def tz_from_key(key : Optional[str]):
+    """tz object named by a tz_key, None for naive."""
+    if key is None:
+        return None
+
+    return pd.Timestamp(0,tz=key).tz
+
+def column_to_ns(column : pd.Series) -> np.ndarray:
+    return pd.DatetimeIndex(column).as_unit("ns").asi8
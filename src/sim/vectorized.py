@@ -0,0 +1,306 @@
+from abc import ABC,abstractmethod
+from dataclasses import dataclass
+from typing import Dict,List,Mapping,Union,TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from sim.broker import Broker
+from sim.engine import Engine
+from sim.fee_model import PerShareFee
+from sim.fill_logic import CappedFill
+from sim.market import Market
+from sim.order_request import OrderRequest,OrderSide,OrderType
+from sim.portfolio import PortfolioSnapshot
+from sim.strategy import Strategy
+from sim.timestamps import to_ns_delta
+
+if TYPE_CHECKING:
+    from sim import *
+
+"""
+Vectorized Backtest
+
+Responsibilities
+- Run target position strategies, one target per bar and symbol, with array operations instead of the event loop.
+- Produce the same fills, fees, cash and positions as Engine + Broker + Market under the default bar schedule.
+- Build the equivalent event driven Engine for a set of targets.
+
+Design Notes: A target decided at the end of bar k becomes a market order for the change from the previous target, submitted at end_ts[k] and arriving at the market after the broker latency. Every order is filled on its own: once at arrival if a bar is open then, then at each later market update (the distinct bar starts of all symbols) where its symbol has an open bar, CappedFill.max_fill shares at a time. Fills reach the broker in the engine's order, by fill time, market updates before arrivals, then arrival sequence. Cash is accumulated with np.cumsum over the interleaved trade values and fees, which adds in the same sequence as Portfolio and gives identical floats. Average costs and realized pnl follow a recurrence that does not vectorize exactly, so they are replayed in a loop over the fills only. Only PerShareFee and CappedFill are supported.
+"""
+
+Targets = Mapping[str,Union[np.ndarray,List[int]]]
+
+class VectorizedStrategy(ABC):
+    """
+    Returns the target position of every symbol after each of its bars. targets[symbol][k] may only depend on bars up to and including k.
+    """
+    @abstractmethod
+    def targets(self, market_datas : Dict[str,"MarketData"]) -> Targets:
+        pass
+
+class TargetPositionStrategy(Strategy):
+    """
+    Event driven reference for VectorizedBacktest. At every run it orders the difference between the target of each symbol's last completed bar and the quantity it has ordered so far.
+    """
+    targets : Dict[str,np.ndarray]
+    ordered : Dict[str,int]
+
+    def __init__(self, targets : Targets) -> None:
+        super().__init__()
+
+        self.targets = {symbol : np.asarray(target,dtype=np.int64) for symbol,target in targets.items()}
+        self.ordered = {symbol : 0 for symbol in self.targets}
+
+    def run(self, market_snapshot, broker_snapshot):
+        orders = []
+        for symbol,target in self.targets.items():
+            k = len(market_snapshot.market_datas[symbol]) - 1
+            if k < 0:
+                continue
+
+            delta = int(target[k]) - self.ordered[symbol]
+            if delta != 0:
+                side = OrderSide.BUY if delta > 0 else OrderSide.SELL
+                orders.append(OrderRequest(side=side,order_type=OrderType.MARKET,qty=abs(delta),symbol=symbol))
+                self.ordered[symbol] += delta
+
+        return orders,[]
+
+@dataclass(frozen=True)
+class VectorizedResult:
+    """
+    orders and fills are columns. Symbols are codes into symbols, sides are +1 for buys and -1 for sells, fills["order"] indexes the orders columns. Fills are in the order the broker applied them.
+    """
+    symbols : List[str]
+    orders : Dict[str,np.ndarray]
+    fills : Dict[str,np.ndarray]
+    portfolio : PortfolioSnapshot
+
+    @property
+    def order_count(self) -> int:
+        return len(self.orders["qty"])
+
+    @property
+    def fill_count(self) -> int:
+        return len(self.fills["qty"])
+
+class VectorizedBacktest:
+    market_datas : Dict[str,"MarketData"]
+    initial_cash : float
+    fee_model : PerShareFee
+    fill_logic : CappedFill
+    broker_latency : pd.Timedelta
+    market_latency : pd.Timedelta
+    broker_latency_ns : int
+    market_latency_ns : int
+
+    update_ns : List[np.ndarray]
+    update_open : List[np.ndarray]
+
+    def __init__(self, market_datas : Dict[str,"MarketData"], initial_cash : float, fee_model : PerShareFee, fill_logic : CappedFill, broker_latency : pd.Timedelta, market_latency : pd.Timedelta) -> None:
+        if type(fee_model) is not PerShareFee:
+            raise TypeError(f"VectorizedBacktest supports PerShareFee only ({type(fee_model).__name__}).")
+        if type(fill_logic) is not CappedFill:
+            raise TypeError(f"VectorizedBacktest supports CappedFill only ({type(fill_logic).__name__}).")
+        if fill_logic.max_fill <= 0:
+            raise ValueError(f"VectorizedBacktest created with non-positive max_fill ({fill_logic.max_fill}).")
+
+        self.market_datas = market_datas
+        self.initial_cash = initial_cash
+        self.fee_model = fee_model
+        self.fill_logic = fill_logic
+        self.broker_latency = broker_latency
+        self.market_latency = market_latency
+        self.broker_latency_ns = to_ns_delta(broker_latency)
+        self.market_latency_ns = to_ns_delta(market_latency)
+
+        # Market updates where each symbol has an open bar, with that bar's open.
+        updates = np.unique(np.concatenate([market_data.columns["start_ts"] for market_data in market_datas.values()]))
+        self.update_ns = []
+        self.update_open = []
+        for market_data in market_datas.values():
+            covered,bar = self._open_bar(market_data,updates)
+            self.update_ns.append(updates[covered])
+            self.update_open.append(market_data.columns["open"][bar[covered]])
+
+    @staticmethod
+    def _open_bar(market_data : "MarketData", ns : np.ndarray):
+        """Mask of times inside a bar, and the position of that bar."""
+        start_ns,end_ns = market_data.columns["start_ts"],market_data.columns["end_ts"]
+        bar = np.searchsorted(start_ns,ns,side="right") - 1
+        covered = bar >= 0
+        covered[covered] = ns[covered] < end_ns[bar[covered]]
+        return covered,bar
+
+    def engine(self, strategy : Union[VectorizedStrategy,Targets]) -> Engine:
+        """The event driven Engine these results reproduce."""
+        targets = self._targets(strategy)
+        broker = Broker(self.initial_cash,PerShareFee(self.fee_model.share_fee),self.broker_latency)
+        market = Market(self.market_datas,CappedFill(self.fill_logic.max_fill),self.market_latency)
+
+        engine = Engine(TargetPositionStrategy(targets),broker,market)
+        engine.add_bar_schedule()
+
+        return engine
+
+    def _targets(self, strategy : Union[VectorizedStrategy,Targets]) -> Dict[str,np.ndarray]:
+        targets = strategy.targets(self.market_datas) if isinstance(strategy,VectorizedStrategy) else strategy
+
+        unknown = set(targets) - set(self.market_datas)
+        if unknown:
+            raise ValueError(f"Targets given for symbols without market data: {sorted(unknown)}")
+
+        # Market data order, which is also the order TargetPositionStrategy submits in.
+        result = {}
+        for symbol,market_data in self.market_datas.items():
+            if symbol not in targets:
+                continue
+            target = np.asarray(targets[symbol])
+            if target.shape != (len(market_data),):
+                raise ValueError(f"Targets for {symbol} have shape {target.shape}, expected ({len(market_data)},).")
+            if not np.issubdtype(target.dtype,np.integer):
+                raise ValueError(f"Targets for {symbol} must be integers ({target.dtype}).")
+            result[symbol] = target.astype(np.int64,copy=False)
+
+        return result
+
+    def _orders(self, targets : Dict[str,np.ndarray]) -> Dict[str,np.ndarray]:
+        symbols = list(self.market_datas)
+        parts = []
+        for symbol,target in targets.items():
+            delta = np.diff(target,prepend=0)
+            k = np.flatnonzero(delta)
+            parts.append((np.full(len(k),symbols.index(symbol),dtype=np.int64),self.market_datas[symbol].columns["end_ts"][k],delta[k]))
+
+        symbol = np.concatenate([part[0] for part in parts]) if parts else np.empty(0,dtype=np.int64)
+        submit_ns = np.concatenate([part[1] for part in parts]) if parts else np.empty(0,dtype=np.int64)
+        delta = np.concatenate([part[2] for part in parts]) if parts else np.empty(0,dtype=np.int64)
+
+        # Arrival sequence at the market: runs in time order, symbols in request order within a run.
+        order = np.lexsort((symbol,submit_ns))
+        symbol,submit_ns,delta = symbol[order],submit_ns[order],delta[order]
+
+        return {"symbol" : symbol,
+                "submit_ns" : submit_ns,
+                "arrival_ns" : submit_ns + self.broker_latency_ns,
+                "qty" : np.abs(delta),
+                "side" : np.sign(delta)}
+
+    def _fills(self, orders : Dict[str,np.ndarray]) -> Dict[str,np.ndarray]:
+        cap = self.fill_logic.max_fill
+        market_datas = list(self.market_datas.values())
+        n_orders = len(orders["qty"])
+
+        # Fill at arrival when the symbol has an open bar, then at the later updates.
+        at_arrival = np.zeros(n_orders,dtype=bool)
+        arrival_open = np.zeros(n_orders,dtype=np.float64)
+        first_update = np.zeros(n_orders,dtype=np.int64)
+        available = np.zeros(n_orders,dtype=np.int64)
+
+        offsets = np.cumsum([0] + [len(update_ns) for update_ns in self.update_ns])
+        for i,market_data in enumerate(market_datas):
+            mask = orders["symbol"] == i
+            arrival_ns = orders["arrival_ns"][mask]
+
+            covered,bar = self._open_bar(market_data,arrival_ns)
+            at_arrival[mask] = covered
+            arrival_open[mask] = np.where(covered,market_data.columns["open"][np.maximum(bar,0)],0.0) if len(market_data) else 0.0
+
+            position = np.searchsorted(self.update_ns[i],arrival_ns,side="right")
+            first_update[mask] = offsets[i] + position
+            available[mask] = len(self.update_ns[i]) - position
+
+        count = np.minimum(-(-orders["qty"] // cap),at_arrival + available)
+
+        order = np.repeat(np.arange(n_orders),count)
+        j = np.arange(len(order)) - np.repeat(np.cumsum(count) - count,count)
+
+        from_arrival = at_arrival[order] & (j == 0)
+        update = first_update[order] + j - at_arrival[order]
+        update = np.where(from_arrival,0,update)
+
+        update_ns = np.concatenate(self.update_ns)
+        update_open = np.concatenate(self.update_open)
+
+        ts_ns = np.where(from_arrival,orders["arrival_ns"][order],update_ns[update] if len(update_ns) else 0)
+        price = np.where(from_arrival,arrival_open[order],update_open[update] if len(update_open) else 0.0)
+        qty = np.minimum(cap,orders["qty"][order] - j * cap)
+
+        # The engine's processing order: time, updates (priority 1) before arrivals (priority 2), arrival sequence.
+        sequence = np.lexsort((order,from_arrival,ts_ns))
+
+        return {"order" : order[sequence],
+                "symbol" : orders["symbol"][order][sequence],
+                "ts_ns" : ts_ns[sequence],
+                "broker_ns" : ts_ns[sequence] + self.market_latency_ns,
+                "qty" : qty[sequence],
+                "side" : orders["side"][order][sequence],
+                "price" : price[sequence]}
+
+    def _settle(self, fills : Dict[str,np.ndarray]) -> PortfolioSnapshot:
+        symbols = list(self.market_datas)
+        qty,side,price,symbol = fills["qty"],fills["side"],fills["price"],fills["symbol"]
+        n = len(qty)
+
+        trade_value = qty * price
+        fee = self.fee_model.share_fee * qty
+        if n and fee.min() < 0:
+            raise ValueError(f"Portfolio attempted to use negative fee. ({fee.min()})")
+
+        flows = np.empty(2 * n + 1,dtype=np.float64)
+        flows[0] = self.initial_cash
+        flows[1::2] = np.where(side > 0,-trade_value,trade_value)
+        flows[2::2] = -fee
+        cash = np.cumsum(flows)
+
+        signed = side * qty
+        by_symbol = np.argsort(symbol,kind="stable")
+        running = np.cumsum(signed[by_symbol])
+        starts = np.flatnonzero(np.diff(symbol[by_symbol],prepend=-1))
+        running -= np.repeat(running[starts] - signed[by_symbol][starts],np.diff(np.append(starts,n)))
+        position = np.empty(n,dtype=np.int64)
+        position[by_symbol] = running
+        position_before = position - signed
+
+        failures = [(side > 0) & (cash[0:-1:2] < trade_value),
+                    (side < 0) & (position_before < qty),
+                    cash[1::2] < fee]
+        messages = ["Portfolio attempted to buy more than current cash.",
+                    "Portfolio attempted to sell more than current position.",
+                    "Portfolio can not afford fee."]
+        first = [int(np.argmax(failure)) if failure.any() else n for failure in failures]
+        if min(first) < n:
+            raise RuntimeError(messages[first.index(min(first))])
+
+        fills["fee"] = fee
+        fills["cash"] = cash[2::2]
+        fills["position"] = position
+
+        # Same recurrence as Portfolio.add_fill.
+        positions,average_costs,realized_pnl = {},{},0
+        for s,q,p,buy in zip(symbol.tolist(),qty.tolist(),price.tolist(),(side > 0).tolist()):
+            name = symbols[s]
+            if name not in positions:
+                positions[name] = 0
+                average_costs[name] = 0
+
+            if buy:
+                average_costs[name] = (average_costs[name] * positions[name] + q * p) / (positions[name] + q)
+                positions[name] += q
+            else:
+                realized_pnl += (p - average_costs[name]) * q
+                positions[name] -= q
+                if positions[name] == 0:
+                    average_costs[name] = 0
+
+        return PortfolioSnapshot(cash=float(cash[-1]),positions=positions,average_costs=average_costs,realized_pnl=realized_pnl)
+
+    def run(self, strategy : Union[VectorizedStrategy,Targets]) -> VectorizedResult:
+        orders = self._orders(self._targets(strategy))
+        fills = self._fills(orders)
+        portfolio = self._settle(fills)
+
+        orders["filled_qty"] = np.bincount(fills["order"],weights=fills["qty"],minlength=len(orders["qty"])).astype(np.int64)
+
+        return VectorizedResult(symbols=list(self.market_datas),orders=orders,fills=fills,portfolio=portfolio)
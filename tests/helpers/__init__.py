@@ -1,4 +1,5 @@
 from . import broker
 from . import order
 from . import misc
-from . import market_data
\ No newline at end of file
+from . import market_data
+from . import sweep
\ No newline at end of file
@@ -9,5 +9,5 @@ def get_simple_broker_delta():
 def create_live_order(broker,order_req,ts):
     ev = broker.handle_requests(ts, [order_req], [])[0]
     order_id = ev.order_submission.order_id
-    broker.orders[order_id]._to_live()
+    broker.handle_order_arrival(order_id)
     return order_id
\ No newline at end of file
@@ -2,13 +2,13 @@ import pandas as pd
 
 from sim import *
 
-def get_simple_market_data(n : int):
+def get_simple_market_data(n : int, tz = None):
 
     delta = pd.Timedelta(minutes=1)
 
     df = pd.DataFrame([{
-        "start_ts" : pd.Timestamp("2000-01-01") + i * delta,
-        "end_ts" : pd.Timestamp("2000-01-01") + (i+1) * delta,
+        "start_ts" : pd.Timestamp("2000-01-01",tz=tz) + i * delta,
+        "end_ts" : pd.Timestamp("2000-01-01",tz=tz) + (i+1) * delta,
         "open" : i,
         "close" : i,
         "high" : i+1,
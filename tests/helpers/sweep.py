@@ -0,0 +1,23 @@
+import pandas as pd
+
+from sim import *
+
+class BuyQty(Strategy):
+    def __init__(self, qty : int) -> None:
+        super().__init__()
+        self.qty = qty
+        self.done = False
+
+    def run(self, market_snapshot, broker_snapshot):
+        if self.done:
+            return [],[]
+        self.done = True
+        return [OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=self.qty,symbol="sym1")],[]
+
+def build_engine(params, market_datas):
+    broker = Broker(1000,PerShareFee(params["fee"]),pd.Timedelta(0))
+    market = Market(market_datas,CappedFill(params["cap"]),pd.Timedelta(0))
+    engine = Engine(BuyQty(10),broker,market)
+    engine.add_bar_schedule()
+
+    return engine
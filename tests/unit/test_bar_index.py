@@ -0,0 +1,48 @@
+import pandas as pd
+
+from sim import *
+from sim.bar_index import BarIndex
+import helpers
+
+def get_gapped_market_data():
+    delta = pd.Timedelta(minutes=1)
+    start = pd.Timestamp("2000-01-01")
+
+    df = pd.DataFrame([{
+        "start_ts" : start + 2 * i * delta,
+        "end_ts" : start + (2 * i + 1) * delta,
+        "open" : i,
+        "close" : i,
+        "high" : i+1,
+        "low" : i-1,
+        "volume" : i,
+        "trades" : i,
+        "VWAP" : i
+    } for i in range(5)])
+
+    return MarketData(df),start,delta
+
+def test_matches_df_lookups():
+    md,start,delta = get_gapped_market_data()
+
+    query_times = [start + (k/2) * delta for k in range(-2,24)]
+
+    # Forward, backward and repeated queries exercise both cursor and search paths.
+    for ts in query_times + query_times[::-1] + query_times[::3]:
+        assert md.current_bar(ts) == MarketData.current_bar_from_df(md.df,ts)
+        assert md.most_recent_bar(ts) == MarketData.most_recent_bar_from_df(md.df,ts)
+
+def test_positions():
+    md,start,end = helpers.market_data.get_simple_market_data_with_ts(5)
+    index = BarIndex.from_df(md.df)
+    delta = (end-start)/5
+
+    assert index.current((start - delta).value) == -1
+    assert index.current(start.value) == 0
+    assert index.current((start + 4 * delta).value) == 4
+    assert index.current(end.value) == -1
+
+    assert index.most_recent(start.value) == -1
+    assert index.most_recent((start + delta).value) == -1
+    assert index.most_recent((start + 2 * delta).value) == 0
+    assert index.most_recent((end + delta).value) == 4
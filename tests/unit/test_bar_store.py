@@ -0,0 +1,81 @@
+import datetime
+import json
+
+import numpy as np
+import pytest
+
+from sim import *
+import helpers
+
+def test_round_trip(tmp_path):
+    md,start,end = helpers.market_data.get_simple_market_data_with_ts(5)
+    delta = (end-start)/5
+
+    save_market_data(tmp_path / "sym1",md)
+    loaded = load_market_data(tmp_path / "sym1")
+
+    assert isinstance(loaded.columns["open"],np.memmap)
+    assert loaded._fingerprint == md.fingerprint
+
+    for i in range(5):
+        assert loaded.bar_at(i) == md.bar_at(i)
+
+    assert loaded.current_bar(start + delta) == md.current_bar(start + delta)
+    assert loaded.get_snapshot(start + 3 * delta).last_bar() == md.bar_at(2)
+
+    # Recomputing the hash over the mapped columns matches the stamp
+    loaded._fingerprint = None
+    assert loaded.fingerprint == md.fingerprint
+
+def test_timezone_round_trip(tmp_path):
+    for i,tz in enumerate(["America/New_York",datetime.timezone(datetime.timedelta(hours=-3,minutes=-30))]):
+        md = helpers.market_data.get_simple_market_data(3,tz=tz)
+        save_market_data(tmp_path / f"sym{i}",md)
+        loaded = load_market_data(tmp_path / f"sym{i}")
+
+        assert loaded.tz == md.tz
+        assert loaded.bar_at(2) == md.bar_at(2)
+
+def test_multiple_symbols(tmp_path):
+    md_1 = helpers.market_data.get_simple_market_data(5)
+    md_2 = helpers.market_data.get_simple_market_data(3)
+
+    save_market_datas(tmp_path,{"sym1" : md_1, "sym/2" : md_2})
+    loaded = load_market_datas(tmp_path,validate=True)
+
+    assert set(loaded) == set(["sym1","sym/2"])
+    assert len(loaded["sym/2"]) == 3
+    assert loaded["sym1"].fingerprint == md_1.fingerprint
+
+def test_truncated_store(tmp_path):
+    md = helpers.market_data.get_simple_market_data(5)
+    save_market_data(tmp_path,md)
+
+    np.save(tmp_path / "open.npy",np.zeros(4))
+
+    with pytest.raises(ValueError,match="does not match"):
+        load_market_data(tmp_path)
+
+def test_unvalidated_data_is_validated_on_load(tmp_path):
+    columns = dict(helpers.market_data.get_simple_market_data(5).columns)
+    columns["end_ts"] = columns["end_ts"].copy()
+    columns["end_ts"][2] = columns["start_ts"][2]
+
+    save_market_data(tmp_path,MarketData.from_columns(columns,validate=False))
+
+    with pytest.raises(ValueError,match="invalid columns"):
+        load_market_data(tmp_path)
+
+def test_validated_stamp_survives_resave(tmp_path, monkeypatch):
+    save_market_data(tmp_path / "first",helpers.market_data.get_simple_market_data(5))
+    loaded = load_market_data(tmp_path / "first")
+    assert loaded._validated
+
+    save_market_data(tmp_path / "second",loaded)
+    with open(tmp_path / "second" / "meta.json") as f:
+        assert json.load(f)["validated"]
+
+    calls = []
+    monkeypatch.setattr(MarketData,"validate_columns",staticmethod(lambda columns : calls.append(1) or (True,"")))
+    load_market_data(tmp_path / "second")
+    assert calls == []
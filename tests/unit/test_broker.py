@@ -94,3 +94,44 @@ def test_handle_fill():
                                 side=OrderSide.BUY,
                                 fill_price=9,
                                 ts=ts + 2*delta))
+
+def test_incremental_snapshot():
+    broker = Broker(1000,PerShareFee(0),pd.Timedelta(0))
+    ts = pd.Timestamp("2000-01-01")
+    symbol = "sym1"
+
+    order_req = OrderRequest(OrderSide.BUY,OrderType.MARKET,10,symbol=symbol)
+    id_1 = create_live_order(broker,order_req,ts)
+    id_2 = create_live_order(broker,order_req,ts)
+
+    S1 = broker.get_snapshot()
+    S2 = broker.get_snapshot()
+
+    assert S1.orders is S2.orders
+    assert S1.version == S2.version
+    assert S1.orders[id_1].state == OrderState.LIVE
+    assert set(S1.open_orders) == set([id_1,id_2])
+
+    broker.handle_fill(Fill(order_id=id_1,qty=10,symbol=symbol,side=OrderSide.BUY,fill_price=1,ts=ts))
+    broker.handle_requests(ts,[],[CancellationRequest(id_2)])
+
+    S3 = broker.get_snapshot()
+
+    assert S3.version > S2.version
+    assert S3.orders[id_1].state == OrderState.FILLED
+    assert S3.orders[id_2].state == OrderState.CANCEL_PENDING
+    assert S3.cancellations[id_2].state == CancellationState.SUBMITTED
+    assert set(S3.open_orders) == set([id_2])
+
+    # Older snapshots are unaffected
+    assert S1.orders[id_1].state == OrderState.LIVE
+    assert len(S1.cancellations) == 0
+
+    broker.handle_cancellation_result(CancellationResult(id_2,ts,CancellationOutcome.CANCELLED))
+
+    S4 = broker.get_snapshot()
+
+    assert S4.orders[id_1] is S3.orders[id_1]
+    assert S4.orders[id_2].state == OrderState.CANCELLED
+    assert len(S4.open_orders) == 0
+    assert len(broker.get_open_orders()) == 0
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from sim import *
+import helpers
+
+class Crash(Exception):
+    pass
+
+class Trader(Strategy):
+    def __init__(self, crash_at = None) -> None:
+        super().__init__()
+        self.calls = 0
+        self.crash_at = crash_at
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.calls += 1
+        if self.calls == self.crash_at:
+            raise Crash()
+
+        if self.calls % 3 == 1:
+            return [OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=7,symbol="sym1"),
+                    OrderRequest(side=OrderSide.BUY,order_type=OrderType.LIMIT,qty=3,symbol="sym1",limit=0.5)],[]
+        if self.calls % 3 == 2:
+            return [],[CancellationRequest(len(broker_snapshot.orders) - 1)]
+        return [],[]
+
+    def get_state(self):
+        return {"calls" : self.calls}
+
+def build(strategy, market_datas):
+    broker = Broker(10000,PerShareFee(1),pd.Timedelta(seconds=1))
+    market = Market(market_datas,CappedFill(4),pd.Timedelta(seconds=1))
+    engine = Engine(strategy,broker,market)
+    engine.add_bar_schedule()
+
+    return engine
+
+def test_resume_after_crash(tmp_path):
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(12)}
+
+    reference = build(Trader(),market_datas)
+    reference.run()
+
+    crashed = build(Trader(crash_at=9),market_datas)
+    crashed.enable_checkpoints(tmp_path / "run.ckpt",every_events=5)
+    with pytest.raises(Crash):
+        crashed.run()
+
+    strategy = Trader()
+    resumed = Engine.resume(tmp_path / "run.ckpt",strategy,{"other" : market_datas["sym1"]})
+
+    assert 0 < strategy.calls < 9
+    assert resumed.ts_ns <= crashed.ts_ns
+    assert resumed.market.market_datas["sym1"] is market_datas["sym1"]
+
+    resumed.run()
+
+    assert resumed.enqueue_id == reference.enqueue_id
+    assert strategy.calls == 12
+    assert resumed.broker.portfolio.get_snapshot() == reference.broker.portfolio.get_snapshot()
+    assert [order.state for order in resumed.broker.orders.values()] == [order.state for order in reference.broker.orders.values()]
+
+def test_checkpoint_refers_to_market_data(tmp_path):
+    md = helpers.market_data.get_simple_market_data(2000)
+    engine = build(Strategy(),{"sym1" : md})
+    engine.enable_checkpoints(tmp_path / "run.ckpt",every=pd.Timedelta(minutes=500))
+    engine.run()
+
+    assert (tmp_path / "run.ckpt").stat().st_size < md.columns["open"].nbytes / 4
+
+    with pytest.raises(ValueError,match="not provided"):
+        Engine.resume(tmp_path / "run.ckpt",Trader(),{"sym1" : helpers.market_data.get_simple_market_data(5)})
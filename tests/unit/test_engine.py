@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from enum import Enum
+
+import pandas as pd
+import pytest
+
+from sim import *
+import helpers
+
+class CustomEventType(Enum):
+    PING = "PING"
+    PONG = "PONG"
+
+@dataclass(frozen=True)
+class PingEvent(Event):
+    pass
+
+def get_engine():
+    md = helpers.market_data.get_simple_market_data(5)
+    broker,delta = helpers.broker.get_simple_broker_delta()
+    market = Market({"sym1" : md},CappedFill(5),delta)
+
+    return Engine(Strategy(),broker,market)
+
+def test_register_handler():
+    engine = get_engine()
+    ts = helpers.misc.get_simple_ts()
+    seen = []
+
+    def handle_ping(event):
+        seen.append(("ping",event.ts))
+        return [PingEvent(CustomEventType.PONG,event.ts)]
+
+    def handle_pong(event):
+        seen.append(("pong",event.ts))
+
+    engine.register_handler(CustomEventType.PING,handle_ping,priority=-1)
+    engine.register_handler(CustomEventType.PONG,handle_pong,priority=10)
+
+    engine.insert_event(RunStrategyEvent(EventType.RUN_STRATEGY,ts))
+    engine.insert_event(PingEvent(CustomEventType.PING,ts))
+
+    engine.run()
+
+    assert seen == [("ping",ts),("pong",ts)]
+
+    with pytest.raises(ValueError,match="without priority"):
+        get_engine().register_handler(CustomEventType.PONG,handle_pong)
+
+def test_unhandled_event_type():
+    engine = get_engine()
+
+    with pytest.raises(ValueError,match="None"):
+        engine.register_handler(CustomEventType.PING,None,priority=0)
+    assert CustomEventType.PING not in engine.event_queue.priorities
+
+    engine.register_priority(CustomEventType.PING,0)
+    engine.insert_event(PingEvent(CustomEventType.PING,helpers.misc.get_simple_ts()))
+
+    with pytest.raises(RuntimeError,match="No handler"):
+        engine.run()
+
+def test_integer_time():
+    engine = get_engine()
+    ts = helpers.misc.get_simple_ts()
+
+    event = RunStrategyEvent(EventType.RUN_STRATEGY,ts)
+
+    assert event.ts_ns == ts.value
+    assert event.ts == ts
+    assert RunStrategyEvent(EventType.RUN_STRATEGY,ts.value) == event
+
+    fill = Fill(order_id=0,qty=1,symbol="sym1",side=OrderSide.BUY,fill_price=1,ts=ts.value)
+    assert fill.ts == ts
+
+    assert Event(event_type=EventType.RUN_STRATEGY,ts=ts).ts == ts
+    assert CancellationResult(order_id=0,ts=ts,cancellation_outcome=CancellationOutcome.NO_OP).ts == ts
+    assert OrderInfo(order_id=0,arrival_time=ts,side=OrderSide.BUY,remaining_qty=1,order_type=OrderType.MARKET,symbol="sym1").arrival_time == ts
+
+    engine.insert_event(event)
+    engine.run()
+
+    assert type(engine.ts_ns) is int
+    assert engine.ts == ts
+
+class BuyOnce(Strategy):
+    def __init__(self) -> None:
+        super().__init__()
+        self.snapshot_times = []
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.snapshot_times.append(market_snapshot.ts)
+        if len(self.snapshot_times) > 1:
+            return [],[]
+        return [OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=1,symbol="sym1")],[]
+
+def test_timezone_aware_times():
+    md = helpers.market_data.get_simple_market_data(5,tz="America/New_York")
+    broker = Broker(100,PerShareFee(0),pd.Timedelta(seconds=1))
+    market = Market({"sym1" : md},CappedFill(5),pd.Timedelta(seconds=1))
+    strategy = BuyOnce()
+
+    engine = Engine(strategy,broker,market)
+    engine.add_bar_schedule()
+    engine.run()
+
+    [fill] = broker.orders[0].fills
+    bar = md.current_bar(fill.ts)
+    assert bar.start_ts <= fill.ts < bar.end_ts
+    assert fill.ts == md.df["end_ts"][0] + pd.Timedelta(seconds=1)
+    assert str(fill.ts.tz) == "America/New_York"
+
+    assert strategy.snapshot_times == list(md.df["end_ts"])
+    assert engine.ts == md.df["end_ts"].iloc[-1]
+    assert market.archived_orders[0].arrival_time == fill.ts
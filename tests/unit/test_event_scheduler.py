@@ -0,0 +1,48 @@
+import pandas as pd
+
+from sim import *
+from sim.engine import EVENT_PRIORITIES
+from sim.event_scheduler import EventScheduler
+import helpers
+
+def drain(scheduler):
+    events = []
+    while scheduler:
+        events.append(scheduler.pop()[-1])
+    return events
+
+def test_ordering():
+    ts = helpers.misc.get_simple_ts()
+    later = helpers.misc.get_simple_ts(1)
+
+    run = RunStrategyEvent(EventType.RUN_STRATEGY,ts)
+    update = UpdateMarketDataEvent(EventType.UPDATE_MARKET_DATA,ts)
+    update_2 = UpdateMarketDataEvent(EventType.UPDATE_MARKET_DATA,ts)
+    early_run = RunStrategyEvent(EventType.RUN_STRATEGY,ts)
+    late_update = UpdateMarketDataEvent(EventType.UPDATE_MARKET_DATA,later)
+
+    scheduler = EventScheduler(EVENT_PRIORITIES)
+    for event in [late_update,run,update,update_2,early_run]:
+        scheduler.push(event)
+
+    assert len(scheduler) == 5
+    assert scheduler.peek()[-1] is update
+
+    assert [id(ev) for ev in drain(scheduler)] == [id(ev) for ev in [update,update_2,run,early_run,late_update]]
+    assert scheduler.empty()
+    assert scheduler.enqueue_id == 5
+
+def test_push_many_matches_push():
+    events = [UpdateMarketDataEvent(EventType.UPDATE_MARKET_DATA,helpers.misc.get_simple_ts(i % 3)) for i in range(10)]
+    events += [RunStrategyEvent(EventType.RUN_STRATEGY,helpers.misc.get_simple_ts(i % 4)) for i in range(10)]
+
+    single = EventScheduler(EVENT_PRIORITIES)
+    for event in events:
+        single.push(event)
+
+    bulk = EventScheduler(EVENT_PRIORITIES)
+    bulk.push(events[0])
+    bulk.push_many(events[1:5])
+    bulk.push_many(events[5:])
+
+    assert [id(ev) for ev in drain(single)] == [id(ev) for ev in drain(bulk)]
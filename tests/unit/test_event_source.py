@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from sim import *
+import helpers
+
+@dataclass(frozen=True)
+class BoundaryEvent(Event):
+    pass
+
+def drain(source):
+    events = []
+    while (event := source.next_event()) is not None:
+        events.append(event)
+    return events
+
+def get_shifted_market_data(n : int, shift : int):
+    md = helpers.market_data.get_simple_market_data(n)
+    df = md.df.copy()
+    df["start_ts"] += shift * pd.Timedelta(minutes=1)
+    df["end_ts"] += shift * pd.Timedelta(minutes=1)
+
+    return MarketData(df)
+
+def test_bar_boundaries():
+    md,start,end = helpers.market_data.get_simple_market_data_with_ts(5)
+    delta = (end-start)/5
+
+    updates = drain(MarketUpdateSource({"sym1" : md}))
+    runs = drain(StrategyRunSource({"sym1" : md}))
+
+    assert all(isinstance(ev,UpdateMarketDataEvent) for ev in updates)
+    assert [ev.ts for ev in updates] == [start + i * delta for i in range(5)]
+    assert [ev.ts for ev in runs] == [start + (i+1) * delta for i in range(5)]
+
+    every_other = drain(MarketUpdateSource({"sym1" : md},every=2))
+    assert [ev.ts for ev in every_other] == [start + i * delta for i in [0,2,4]]
+
+def test_merged_symbols():
+    md,start,end = helpers.market_data.get_simple_market_data_with_ts(3)
+    delta = (end-start)/3
+    shifted = get_shifted_market_data(3,2)
+
+    updates = drain(MarketUpdateSource({"sym1" : md, "sym2" : shifted}))
+
+    assert [ev.ts for ev in updates] == [start + i * delta for i in range(5)]
+
+class BuyOnce(Strategy):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.calls += 1
+        if self.calls == 1:
+            return [OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=10,symbol="sym1")],[]
+        return [],[]
+
+def test_engine_bar_schedule():
+    md = helpers.market_data.get_simple_market_data(10)
+    strategy = BuyOnce()
+    broker = Broker(1000,PerShareFee(0),pd.Timedelta(0))
+    market = Market({"sym1" : md},CappedFill(4),pd.Timedelta(0))
+    engine = Engine(strategy,broker,market)
+
+    engine.add_bar_schedule()
+
+    assert len(engine.event_queue) == 2
+
+    engine.run()
+
+    assert strategy.calls == 10
+    assert broker.orders[0].state == OrderState.FILLED
+    assert [fill.qty for fill in broker.orders[0].fills] == [4,4,2]
+    assert [fill.fill_price for fill in broker.orders[0].fills] == [1,2,3]
+    assert len(engine.source_events) == 0
+
+def test_event_classes_without_make_keep_tz():
+    md = helpers.market_data.get_simple_market_data(3,tz="America/New_York")
+    events = drain(BarBoundarySource({"sym1" : md},"start_ts",BoundaryEvent,EventType.UPDATE_MARKET_DATA))
+
+    assert all(type(event) is BoundaryEvent for event in events)
+    assert [event.ts for event in events] == list(md.df["start_ts"])
+    assert all(str(event.ts.tz) == "America/New_York" for event in events)
@@ -0,0 +1,70 @@
+import pandas as pd
+
+from sim import *
+import helpers
+
+class LimitAndCancel(Strategy):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.calls += 1
+        if self.calls == 1:
+            return [OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=10,symbol="sym1"),
+                    OrderRequest(side=OrderSide.BUY,order_type=OrderType.LIMIT,qty=5,symbol="sym1",limit=0.5)],[]
+        if self.calls == 2:
+            return [],[CancellationRequest(1)]
+        return [],[]
+
+def build(fee : float = 0):
+    md = helpers.market_data.get_simple_market_data(8)
+    broker = Broker(1000,PerShareFee(fee),pd.Timedelta(seconds=1))
+    market = Market({"sym1" : md},CappedFill(4),pd.Timedelta(seconds=1))
+
+    return broker,market
+
+def record(tmp_path):
+    broker,market = build()
+    strategy = LimitAndCancel()
+    engine = Engine(strategy,broker,market)
+    engine.add_bar_schedule()
+
+    with EventJournal(tmp_path / "run.journal",block_size=7) as journal:
+        engine.attach_journal(journal)
+        engine.run()
+
+    return engine,load_journal(tmp_path / "run.journal")
+
+def test_journal_round_trip(tmp_path):
+    engine,journal = record(tmp_path)
+
+    events = list(journal.events())
+    assert len(events) == engine.enqueue_id
+    assert all(events[i][0].ts_ns <= events[i+1][0].ts_ns for i in range(len(events)-1))
+
+    fills = [event.fill for event,_,_ in events if event.event_type == EventType.FILL_ARRIVES_AT_BROKER]
+    assert fills == engine.broker.orders[0].fills
+
+    results = [event.cancellation_result for event,_,_ in events if event.event_type == EventType.CANCELLATION_ARRIVES_AT_BROKER]
+    assert [result.cancellation_outcome for result in results] == [CancellationOutcome.CANCELLED]
+
+    requests = list(journal.requests())
+    assert len(requests) == 8
+    assert requests[0][1][1] == OrderRequest(side=OrderSide.BUY,order_type=OrderType.LIMIT,qty=5,symbol="sym1",limit=0.5)
+    assert requests[1][2] == [CancellationRequest(1)]
+
+def test_replay(tmp_path):
+    engine,journal = record(tmp_path)
+
+    broker,market = build()
+    replayed = replay_journal(journal,broker,market)
+
+    assert replayed.enqueue_id == engine.enqueue_id
+    assert broker.portfolio.get_snapshot() == engine.broker.portfolio.get_snapshot()
+    assert broker.orders[1].state == OrderState.CANCELLED
+
+    broker,market = build(fee=1)
+    replay_journal(journal,broker,market)
+
+    assert broker.portfolio.cash == engine.broker.portfolio.cash - 10
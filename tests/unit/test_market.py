@@ -95,4 +95,30 @@ def test_limit_order():
 
     events = market.handle_order_arrival(end-delta,order_submission)
 
-    assert len(events) == 1
\ No newline at end of file
+    assert len(events) == 1
+
+def test_active_order_index():
+    md,start,end = helpers.market_data.get_simple_market_data_with_ts(5)
+    delta = (end-start)/5
+    latency = pd.Timedelta(minutes=0)
+    S1,S2 = "sym1","sym2"
+    market = Market({S1 : md, S2 : md}, CappedFill(5), latency)
+
+    market.handle_order_arrival(start,OrderSubmission(order_id=0,side=OrderSide.BUY,qty=10,symbol=S1,order_type=OrderType.MARKET))
+    market.handle_order_arrival(start,OrderSubmission(order_id=1,side=OrderSide.BUY,qty=20,symbol=S1,order_type=OrderType.MARKET))
+
+    assert list(market.active_orders[S1]) == [0,1]
+    assert len(market.active_orders[S2]) == 0
+
+    events = market.handle_market_update(start + delta)
+
+    assert [ev.fill.order_id for ev in events] == [0,1]
+    assert list(market.active_orders[S1]) == [1]
+    assert market.archived_orders[0].remaining_qty == 0
+    assert market.order_infos[0].remaining_qty == 0
+
+    market.handle_cancellation_arrival(start + delta,CancellationSubmission(1))
+
+    assert len(market.active_orders[S1]) == 0
+    assert market.order_infos[1].remaining_qty == 10
+    assert market.handle_market_update(start + 2 * delta) == []
@@ -1,5 +1,6 @@
 from dataclasses import asdict
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -43,3 +44,73 @@ def test_validate():
 
         MarketData(pd.DataFrame([r1,r2]))
 
+
+def test_columnar_storage():
+    md = helpers.market_data.get_simple_market_data(5)
+    columnar = MarketData(md.df)
+
+    assert columnar._df is None
+    assert len(columnar) == 5
+    assert columnar.columns["open"].dtype == np.float64
+    assert columnar.columns["volume"].dtype == np.int64
+    assert columnar.columns["start_ts"].dtype == np.int64
+
+    for i in range(5):
+        assert columnar.bar_at(i) == Bar.from_row(md.df.iloc[i])
+
+    exported = columnar.df
+    assert set(exported.columns) == set(md.df.columns)
+    assert (exported["start_ts"] == md.df["start_ts"]).all()
+    assert (exported["VWAP"] == md.df["VWAP"]).all()
+
+def test_timezone_aware_bars():
+    md = helpers.market_data.get_simple_market_data(3)
+    df = md.df.copy()
+    df["start_ts"] = df["start_ts"].dt.tz_localize("US/Eastern")
+    df["end_ts"] = df["end_ts"].dt.tz_localize("US/Eastern")
+
+    aware = MarketData(df,keep_df=False)
+
+    assert aware.current_bar(df["start_ts"].iloc[1]) == Bar.from_row(df.iloc[1])
+    assert (aware.df["end_ts"] == df["end_ts"]).all()
+
+def test_validate_reports_first_row(capsys):
+    md = helpers.market_data.get_simple_market_data(6)
+    df = md.df.copy()
+    df.loc[4,"end_ts"] = df.loc[5,"end_ts"]
+    df.loc[2,"start_ts"] = df.loc[2,"end_ts"]
+
+    assert MarketData.validate_df(df) == (False,"start_ts not strictly less than end_ts at row 2")
+
+    df["open"] = "x"
+    assert MarketData.validate_df(df) == (False,"invalid float column: open")
+    assert capsys.readouterr().out == ""
+
+def test_validate_rejects_nat():
+    md = helpers.market_data.get_simple_market_data(4)
+    df = md.df.copy()
+    df.loc[0,"start_ts"] = pd.NaT
+
+    assert MarketData.validate_df(df) == (False,"missing timestamp (NaT) at row 0")
+    with pytest.raises(ValueError):
+        MarketData(df)
+
+    columns = {name : md.columns[name].copy() for name in md.columns}
+    columns["end_ts"][2] = np.iinfo(np.int64).min
+    with pytest.raises(ValueError,match="NaT"):
+        MarketData.from_columns(columns)
+
+def test_validation_cache(monkeypatch):
+    md = helpers.market_data.get_simple_market_data(5)
+    fingerprint = md.fingerprint
+
+    calls = []
+    validate_columns = MarketData.validate_columns
+    monkeypatch.setattr(MarketData,"validate_columns",staticmethod(lambda columns : calls.append(1) or validate_columns(columns)))
+
+    cached = MarketData.from_columns(md.columns,fingerprint=fingerprint)
+    assert calls == []
+    assert cached.fingerprint == fingerprint
+
+    MarketData.from_columns(md.columns,fingerprint="0" * 32)
+    assert calls == [1]
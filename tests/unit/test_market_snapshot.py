@@ -38,4 +38,38 @@ def test_get_symbols():
     M1 = Market({S1 : md, S2 : md}, CappedFill(5), latency)
     snapshot = M1.get_snapshot(end)
 
-    assert set(snapshot.get_symbols()) == set([S1,S2])
\ No newline at end of file
+    assert set(snapshot.get_symbols()) == set([S1,S2])
+
+def test_lazy_views():
+    md,start,end = helpers.market_data.get_simple_market_data_with_ts(5)
+    delta = (end-start)/5
+    ts = start + delta * 3
+
+    snapshot = md.get_snapshot(ts)
+
+    assert len(snapshot) == 3
+    assert snapshot._df is None
+
+    assert list(snapshot.column("open")) == [0,1,2]
+    assert list(snapshot.end_ns) == [(start + delta * (i+1)).value for i in range(3)]
+    assert snapshot.last_bar() == Bar.from_row(md.df.iloc[2])
+    assert snapshot.bar_at(-1) == Bar.from_row(md.df.iloc[2])
+    assert list(snapshot.tail(2)["open"]) == [1,2]
+    assert snapshot._df is None
+
+    pd.testing.assert_frame_equal(snapshot.df,md.df[md.df["end_ts"] <= ts])
+
+    assert len(md.get_snapshot(start)) == 0
+    assert md.get_snapshot(start).last_bar() == None
+
+def test_snapshot_frames_are_copies():
+    for keep_df in [True,False]:
+        md = MarketData(helpers.market_data.get_simple_market_data(5).df,keep_df=keep_df)
+        snapshot = md.get_snapshot(md.df["end_ts"].iloc[-1])
+
+        snapshot.df.loc[0,"open"] = 100.0
+        tail = snapshot.tail(2)
+        tail.loc[4,"close"] = 100.0
+
+        assert md.columns["open"][0] == 0 and md.columns["close"][4] == 4
+        assert md.df["open"].iloc[0] == 0 and md.df["close"].iloc[4] == 4
@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+
+from sim import *
+import helpers
+
+class Trader(Strategy):
+    """Alternates buying and selling qty shares, cancelling open orders every cancel_every runs."""
+    def __init__(self, qty : int, order_type : OrderType, cancel_every : int = 0) -> None:
+        super().__init__()
+        self.qty = qty
+        self.order_type = order_type
+        self.cancel_every = cancel_every
+        self.runs = 0
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.runs += 1
+        side = OrderSide.BUY if self.runs % 2 else OrderSide.SELL
+        if side == OrderSide.SELL and broker_snapshot.portfolio.positions.get("sym1",0) < self.qty:
+            side = OrderSide.BUY
+
+        last = market_snapshot.market_datas["sym1"].column("close")[-1]
+        limit = float(last) + 0.5 if self.order_type == OrderType.LIMIT else None
+        orders = [OrderRequest(side=side,order_type=self.order_type,qty=self.qty,symbol="sym1",limit=limit)]
+
+        cancellations = []
+        if self.cancel_every and self.runs % self.cancel_every == 0:
+            cancellations = [CancellationRequest(order_id) for order_id in broker_snapshot.open_orders]
+
+        return orders,cancellations
+
+def get_strategies():
+    return [Trader(3,OrderType.MARKET),Trader(5,OrderType.LIMIT,cancel_every=3),Trader(2,OrderType.MARKET,cancel_every=2)]
+
+def get_broker(i : int):
+    return Broker(10_000,PerShareFee(0.01 * i),pd.Timedelta(seconds=i),broker_id=i)
+
+def test_multi_engine_matches_separate_engines():
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(50)}
+
+    brokers = [get_broker(i) for i in range(3)]
+    engine = MultiEngine(list(zip(get_strategies(),brokers)),Market(market_datas,CappedFill(2),pd.Timedelta(seconds=2)))
+    engine.add_bar_schedule()
+    engine.run()
+
+    for i,strategy in enumerate(get_strategies()):
+        single = Engine(strategy,get_broker(i),Market(market_datas,CappedFill(2),pd.Timedelta(seconds=2)))
+        single.add_bar_schedule()
+        single.run()
+
+        broker = brokers[i]
+        assert broker.portfolio.get_snapshot() == single.broker.portfolio.get_snapshot()
+        assert broker.fill_count == single.broker.fill_count
+        assert len(broker.cancellations) == len(single.broker.cancellations)
+        assert [order.state for order in broker.orders.values()] == [order.state for order in single.broker.orders.values()]
+        assert all(order_broker_id(order_id) == i for order_id in broker.orders)
+
+    assert engine.broker is brokers[0]
+
+def test_multi_engine_invalid_pairs():
+    market = Market({"sym1" : helpers.market_data.get_simple_market_data(5)},CappedFill(2),pd.Timedelta(0))
+    broker = get_broker(0)
+
+    with pytest.raises(ValueError):
+        MultiEngine([],market)
+    with pytest.raises(ValueError):
+        MultiEngine([(Strategy(),broker),(Strategy(),broker)],market)
+    with pytest.raises(ValueError,match="duplicate broker_id"):
+        MultiEngine([(Strategy(),broker),(Strategy(),Broker(10_000,PerShareFee(0),pd.Timedelta(0)))],market)
+
+    broker.handle_requests(pd.Timestamp("2000-01-01"),[OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=1,symbol="sym1")],[])
+    with pytest.raises(ValueError):
+        MultiEngine([(Strategy(),broker)],market)
+
+def test_multi_engine_rejects_journals_and_checkpoints(tmp_path):
+    market = Market({"sym1" : helpers.market_data.get_simple_market_data(5)},CappedFill(2),pd.Timedelta(0))
+    engine = MultiEngine([(Strategy(),get_broker(0))],market)
+
+    with pytest.raises(RuntimeError,match="journals"):
+        engine.attach_journal(None)
+    with pytest.raises(RuntimeError,match="checkpoints"):
+        engine.checkpoint(tmp_path / "checkpoint")
+    with pytest.raises(RuntimeError,match="checkpoints"):
+        engine.enable_checkpoints(tmp_path / "checkpoint",every_events=10)
+
+class Tagger(Strategy):
+    """Records the market snapshot it was given and tags it."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.snapshots = []
+
+    def run(self, market_snapshot, broker_snapshot):
+        assert not hasattr(market_snapshot,"tag")
+        market_snapshot.tag = self
+        self.snapshots.append(market_snapshot)
+        return [],[]
+
+def test_strategies_get_their_own_snapshots():
+    market = Market({"sym1" : helpers.market_data.get_simple_market_data(5)},CappedFill(2),pd.Timedelta(0))
+    strategies = [Tagger(),Tagger()]
+    brokers = [get_broker(7),get_broker(2)]
+
+    engine = MultiEngine(list(zip(strategies,brokers)),market)
+    engine.add_bar_schedule()
+    engine.run()
+
+    assert [broker.broker_id for broker in brokers] == [7,2]
+    assert len(strategies[0].snapshots) == 5
+    assert all(a is not b and a.ts == b.ts for a,b in zip(*[strategy.snapshots for strategy in strategies]))
+
+def test_broker_id_namespaces_order_ids():
+    broker = Broker(1000,PerShareFee(0),pd.Timedelta(0),broker_id=3)
+    broker.handle_requests(pd.Timestamp("2000-01-01"),[OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=1,symbol="sym1")] * 2,[])
+
+    assert [order_broker_id(order_id) for order_id in broker.orders] == [3,3]
+    assert list(broker.orders) == [3 << ORDER_ID_BITS,(3 << ORDER_ID_BITS) + 1]
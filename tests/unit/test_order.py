@@ -126,4 +126,35 @@ def test_add_fill():
         get_cancelled_order().add_fill(fill)
     
     with pytest.raises(RuntimeError,match="invalid order state"):
-        get_filled_order().add_fill(fill)
\ No newline at end of file
+        get_filled_order().add_fill(fill)
+
+def test_fill_aggregates():
+    O1 = get_live_order()
+    ts = pd.Timestamp("2000-01-01")
+
+    assert O1.average_fill_price == None
+
+    O1.add_fill(Fill(order_id=0,qty=30,symbol="sym1",side=OrderSide.BUY,fill_price=10,ts=ts))
+    O1.add_fill(Fill(order_id=0,qty=10,symbol="sym1",side=OrderSide.BUY,fill_price=6,ts=ts))
+
+    assert O1.filled_qty == 40
+    assert O1.remaining_quantity == 60
+    assert O1.average_fill_price == pytest.approx(9)
+    assert len(O1.fills) == 2
+
+    snapshot = O1.get_snapshot()
+    assert snapshot.remaining_quantity == 60
+    assert snapshot.average_fill_price == pytest.approx(9)
+
+def test_aggregate_only_order():
+    O1 = Order(OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=100,symbol=""),0,record_fills=False)
+    O1._to_submitted()
+    O1._to_live()
+
+    for _ in range(100):
+        O1.add_fill(Fill(order_id=0,qty=1,symbol="sym1",side=OrderSide.BUY,fill_price=2,ts=pd.Timestamp("2000-01-01")))
+
+    assert O1.fills == None
+    assert O1.state == OrderState.FILLED
+    assert O1.remaining_quantity == 0
+    assert O1.average_fill_price == pytest.approx(2)
@@ -0,0 +1,70 @@
+import pandas as pd
+
+from sim import *
+from sim.order_book import OrderBook
+import helpers
+
+def get_info(order_id, side, order_type, limit=None):
+    return OrderInfo(order_id=order_id,arrival_time=helpers.misc.get_simple_ts(),side=side,remaining_qty=10,order_type=order_type,symbol="sym1",limit=limit)
+
+def test_executable():
+    book = OrderBook()
+
+    orders = [
+        get_info(0,OrderSide.BUY,OrderType.LIMIT,5),
+        get_info(1,OrderSide.SELL,OrderType.LIMIT,7),
+        get_info(2,OrderSide.BUY,OrderType.LIMIT,6),
+        get_info(3,OrderSide.BUY,OrderType.MARKET),
+        get_info(4,OrderSide.BUY,OrderType.LIMIT,5),
+        get_info(5,OrderSide.SELL,OrderType.LIMIT,4),
+    ]
+
+    for seq,order_info in enumerate(orders):
+        book.add(order_info,seq)
+
+    assert len(book) == 6
+    assert list(book) == [0,1,2,3,4,5]
+
+    def crossing(price):
+        return sorted(order_info.order_id for seq,order_info in book.executable(price))
+
+    assert crossing(3) == [0,2,3,4]
+    assert crossing(5) == [0,2,3,4,5]
+    assert crossing(5.5) == [2,3,5]
+    assert crossing(8) == [1,3,5]
+
+    # FIFO within a price level
+    assert [order_info.order_id for seq,order_info in book.executable(5) if order_info.limit == 5 and order_info.side == OrderSide.BUY] == [0,4]
+
+    book.remove(orders[0])
+    book.remove(orders[3])
+
+    assert crossing(3) == [2,4]
+    assert len(book) == 4
+
+class CountingFill(CappedFill):
+    def __init__(self, max_fill : int) -> None:
+        super().__init__(max_fill)
+        self.calls = 0
+
+    def calculate_fill_qty(self, order_info):
+        self.calls += 1
+        return super().calculate_fill_qty(order_info)
+
+def test_market_skips_non_crossing_limits():
+    md,start,end = helpers.market_data.get_simple_market_data_with_ts(5)
+    delta = (end-start)/5
+    symbol = "sym1"
+    fill_logic = CountingFill(5)
+    market = Market({symbol : md}, fill_logic, pd.Timedelta(minutes=0))
+
+    for order_id,limit in enumerate([1,2,3,4]):
+        market.handle_order_arrival(start,OrderSubmission(order_id=order_id,side=OrderSide.SELL,qty=5,symbol=symbol,order_type=OrderType.LIMIT,limit=limit))
+
+    assert fill_logic.calls == 0
+
+    events = market.handle_market_update(start + 2 * delta)
+
+    assert [ev.fill.order_id for ev in events] == [0,1]
+    assert fill_logic.calls == 2
+    assert list(market.active_orders[symbol]) == [2,3]
@@ -0,0 +1,65 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from sim import *
+from sim.order_store import OrderStore
+import helpers
+
+def test_order_store_append_and_records():
+    store = OrderStore(capacity=2)
+
+    store.append(7,OrderSide.BUY,OrderType.MARKET,10,0,None,OrderState.FILLED,"sym1",arrival_ns=5,filled_qty=10,fill_notional=25.0)
+    store.append(3,OrderSide.SELL,OrderType.LIMIT,4,4,1.5,OrderState.CANCELLED,"sym2")
+    store.append(9,OrderSide.BUY,OrderType.LIMIT,6,2,2.5,OrderState.CANCELLED,"sym1")
+
+    assert len(store) == 3
+    assert 3 in store and 4 not in store
+    assert store.column("symbol").tolist() == [0,1,0]
+    assert store.capacity == 4
+    assert list(store) == [7,3,9]
+
+    record = store[7]
+    assert (record.side,record.order_type,record.state,record.symbol) == (OrderSide.BUY,OrderType.MARKET,OrderState.FILLED,"sym1")
+    assert (record.qty,record.remaining_qty,record.filled_qty,record.limit) == (10,0,10,None)
+    assert record.arrival_time == pd.Timestamp(5)
+    assert record.average_fill_price == 2.5
+
+    assert store[3].limit == 1.5
+    assert store[3].arrival_ns is None
+    assert store[3].average_fill_price is None
+
+    snapshot = store[9].get_snapshot()
+    assert (snapshot.order_id,snapshot.remaining_quantity,snapshot.state) == (9,2,OrderState.CANCELLED)
+
+def test_order_store_pickles_used_rows():
+    store = OrderStore(capacity=1024)
+    store.append(0,OrderSide.BUY,OrderType.MARKET,1,0,None,OrderState.FILLED,"sym1")
+
+    copy = pickle.loads(pickle.dumps(store))
+
+    assert copy.capacity == 1
+    assert copy[0].qty == 1
+    copy.append(1,OrderSide.SELL,OrderType.MARKET,1,0,None,OrderState.FILLED,"sym1")
+    assert copy.column("order_id").tolist() == [0,1]
+
+def test_market_archives_into_order_store():
+    market = Market({"sym1" : helpers.market_data.get_simple_market_data(10)},CappedFill(10),pd.Timedelta(0))
+    ts = pd.Timestamp("2000-01-01 00:05:30")
+
+    filled = OrderSubmission(order_id=0,side=OrderSide.BUY,qty=5,symbol="sym1",order_type=OrderType.MARKET)
+    resting = OrderSubmission(order_id=1,side=OrderSide.BUY,qty=5,symbol="sym1",order_type=OrderType.LIMIT,limit=0.5)
+    market.handle_order_arrival(ts,filled)
+    market.handle_order_arrival(ts,resting)
+    market.handle_cancellation_arrival(ts,CancellationSubmission(1))
+
+    assert isinstance(market.archived_orders,OrderStore)
+    assert market.order_infos[0].state == OrderState.FILLED
+    assert market.order_infos[0].filled_qty == 5
+    assert market.order_infos[0].average_fill_price == 5.0
+    assert market.order_infos[0].fill_notional == 25.0
+    assert not hasattr(market.order_infos[0],"reduce_quantity")
+    assert market.order_infos[1].state == OrderState.CANCELLED
+    assert market.order_infos[1].remaining_qty == 5
+    assert market.order_infos[1].limit == 0.5
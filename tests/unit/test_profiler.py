@@ -0,0 +1,48 @@
+import csv
+import json
+
+import pandas as pd
+
+from sim import *
+import helpers
+
+class BuyEveryRun(Strategy):
+    def run(self, market_snapshot, broker_snapshot):
+        return [OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=1,symbol="sym1")],[]
+
+def test_profiled_run(tmp_path):
+    md = helpers.market_data.get_simple_market_data(10)
+    broker = Broker(1000,PerShareFee(0),pd.Timedelta(seconds=1))
+    market = Market({"sym1" : md},CappedFill(5),pd.Timedelta(seconds=1))
+    engine = Engine(BuyEveryRun(),broker,market)
+    engine.add_bar_schedule()
+
+    profiler = EngineProfiler(sample_every=5)
+    engine.attach_profiler(profiler)
+    engine.run()
+
+    assert sum(stats.count for stats in profiler.events.values()) == engine.enqueue_id == profiler.event_count
+    assert profiler.events["RUN_STRATEGY"].count == 10
+    assert profiler.events["FILL_ARRIVES_AT_BROKER"].count == broker.fill_count
+    assert profiler.sections["strategy.run"].count == 10
+    assert profiler.sections["snapshot.market"].count == profiler.sections["snapshot.broker"].count == 10
+    assert profiler.sections["market_data.current_open"].count > 0
+    assert len(profiler.depth_samples) == (profiler.event_count + 4) // 5
+
+    # The engine is restored once the profiled run ends.
+    assert "current_open" not in vars(md)
+    assert engine.handlers[EventType.RUN_STRATEGY] == engine._handle_run_strategy
+
+    report = profiler.to_dict()
+    assert report["events"]["RUN_STRATEGY"]["count"] == 10
+    assert report["max_queue_depth"] >= 1
+
+    profiler.to_csv(tmp_path / "profile.csv")
+    profiler.to_json(tmp_path / "profile.json")
+
+    with open(tmp_path / "profile.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert {(row["kind"],row["name"]) for row in rows} >= {("event","RUN_STRATEGY"),("section","strategy.run")}
+
+    with open(tmp_path / "profile.json") as f:
+        assert json.load(f)["event_count"] == engine.enqueue_id
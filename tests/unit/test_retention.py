@@ -0,0 +1,193 @@
+import json
+
+import pandas as pd
+import pytest
+
+from sim import *
+import helpers
+
+class Trader(Strategy):
+    """Buys or sells qty shares every run, cancelling open orders every cancel_every runs."""
+    def __init__(self, qty : int, cancel_every : int) -> None:
+        super().__init__()
+        self.qty = qty
+        self.cancel_every = cancel_every
+        self.runs = 0
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.runs += 1
+        side = OrderSide.BUY if self.runs % 3 else OrderSide.SELL
+        if side == OrderSide.SELL and broker_snapshot.portfolio.positions.get("sym1",0) < self.qty:
+            side = OrderSide.BUY
+
+        last = float(market_snapshot.market_datas["sym1"].column("close")[-1])
+        orders = [OrderRequest(side=side,order_type=OrderType.LIMIT,qty=self.qty,symbol="sym1",limit=last + 0.5 if side == OrderSide.BUY else last - 0.5)]
+
+        cancellations = []
+        if self.runs % self.cancel_every == 0:
+            cancellations = [CancellationRequest(order_id) for order_id in broker_snapshot.open_orders]
+
+        return orders,cancellations
+
+class Recanceller(Strategy):
+    """Buys at market and far below the market, cancels open orders and repeats cancels of orders it saw that are no longer open."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.runs = 0
+        self.seen = set()
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.runs += 1
+        open_orders = set(broker_snapshot.open_orders)
+        self.seen |= open_orders
+
+        orders = [
+            OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=3,symbol="sym1"),
+            OrderRequest(side=OrderSide.BUY,order_type=OrderType.LIMIT,qty=1,symbol="sym1",limit=0.5)
+        ]
+
+        cancellations = []
+        if self.runs % 3 == 0:
+            cancellations += [CancellationRequest(order_id) for order_id in sorted(open_orders)]
+        if self.runs % 5 == 0:
+            cancellations += [CancellationRequest(order_id) for order_id in sorted(self.seen - open_orders)]
+
+        return orders,cancellations
+
+class RecordingMarket(Market):
+    """Market recording the outcome of every cancellation it handles."""
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args,**kwargs)
+        self.outcomes = []
+
+    def handle_cancellation_arrival(self, ts, cancellation_submission):
+        events = super().handle_cancellation_arrival(ts,cancellation_submission)
+        self.outcomes += [(event.cancellation_result.order_id,event.cancellation_result.cancellation_outcome) for event in events]
+        return events
+
+def run(retention = None, n : int = 60):
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(n)}
+    broker = Broker(100_000,PerShareFee(0.01),pd.Timedelta(seconds=1),retention=retention)
+    market = Market(market_datas,CappedFill(2),pd.Timedelta(seconds=1),retention=retention)
+
+    engine = Engine(Trader(5,cancel_every=4),broker,market)
+    engine.add_bar_schedule()
+    engine.run()
+    return engine
+
+def live_ids(broker):
+    return sorted(order_id for order_id,order in broker.orders.items() if order.state not in (OrderState.FILLED,OrderState.CANCELLED))
+
+def test_policies_match_keep_all():
+    full = run()
+    expected = full.broker.orders_frame()
+
+    for retention in [RetentionPolicy.keep_last(3),RetentionPolicy.summary_only()]:
+        engine = run(retention)
+        broker = engine.broker
+
+        assert broker.portfolio.get_snapshot() == full.broker.portfolio.get_snapshot()
+        assert broker.fill_count == full.broker.fill_count
+        assert broker.order_count == len(full.broker.orders)
+        assert live_ids(broker) == live_ids(full.broker)
+        assert len(broker.orders) <= len(live_ids(broker)) + retention.keep
+        assert len(broker.orders) + broker.archive.summary.orders == broker.order_count
+        assert set(broker.get_snapshot().orders) == set(broker.orders)
+        assert set(broker.get_snapshot().cancellations) == set(broker.cancellations)
+        assert not engine.market.cancelled_orders
+
+    summary = broker.archive.summary
+    retired = expected[~expected["order_id"].isin(broker.orders)]
+    assert summary.filled == (retired["state"] == OrderState.FILLED).sum()
+    assert summary.cancelled == (retired["state"] == OrderState.CANCELLED).sum()
+    assert summary.filled_qty == retired["filled_qty"].sum()
+    assert len(engine.market.archived_orders) == 0
+
+def test_keep_last_orders_frame_sees_every_order(tmp_path):
+    expected = run().broker.orders_frame()
+    engine = run(RetentionPolicy.keep_last(2,spill_dir=tmp_path,block_rows=4))
+    archive = engine.broker.archive
+
+    assert archive.spilled and all(path.exists() for path in archive.spilled)
+    assert len(archive) < 4
+    pd.testing.assert_frame_equal(engine.broker.orders_frame(),expected)
+
+def test_spill_dir_is_reusable(tmp_path):
+    first = run(RetentionPolicy.keep_last(2,spill_dir=tmp_path,block_rows=4)).broker.archive
+    second = run(RetentionPolicy.keep_last(2,spill_dir=tmp_path,block_rows=4)).broker.archive
+
+    assert first.spill_path != second.spill_path
+    assert first.spill_path.parent == tmp_path and second.spill_path.parent == tmp_path
+    assert json.loads((second.spill_path / "symbols.json").read_text()) == second.symbols
+    pd.testing.assert_frame_equal(first.to_frame(),second.to_frame())
+
+def test_keep_last_without_spill_keeps_rows_in_memory():
+    engine = run(RetentionPolicy.keep_last(0,block_rows=4))
+    archive = engine.broker.archive
+
+    assert not archive.spilled and archive.dropped_rows == 0
+    assert len(archive) == archive.summary.orders
+    assert set(archive) == set(engine.broker.orders_frame()["order_id"]) - set(engine.broker.orders)
+
+def test_market_keeps_last_archived_orders():
+    engine = run(RetentionPolicy.keep_last(5,block_rows=4))
+    archive = engine.market.archived_orders
+
+    assert 5 <= len(archive) < 5 + 2 * 4
+    assert archive.dropped_rows > 0 and archive.dropped_rows + len(archive) == archive.summary.orders
+
+def test_cancellation_outcomes_after_retirement():
+    market = Market({"sym1" : helpers.market_data.get_simple_market_data(5)},CappedFill(10),pd.Timedelta(0),retention=RetentionPolicy.summary_only())
+    submission = lambda order_id : OrderSubmission(order_id=order_id,side=OrderSide.BUY,order_type=OrderType.MARKET,qty=1,symbol="sym1")
+    ts = pd.Timestamp("2000-01-01 00:01")
+
+    market.handle_order_arrival(ts,submission(0))
+    [filled] = market.handle_cancellation_arrival(ts,CancellationSubmission(order_id=0))
+    [early] = market.handle_cancellation_arrival(ts,CancellationSubmission(order_id=1))
+
+    assert filled.cancellation_result.cancellation_outcome == CancellationOutcome.NO_OP
+    assert early.cancellation_result.cancellation_outcome == CancellationOutcome.CANCELLED
+    assert market.cancelled_orders == {1}
+
+    assert market.handle_order_arrival(ts,submission(1)) == []
+    assert not market.cancelled_orders and not market.live_orders
+    assert market.archived_orders.summary.cancelled == 1
+
+def test_cancelling_retired_orders():
+    for retention in [RetentionPolicy.keep_all(),RetentionPolicy.keep_last(0),RetentionPolicy.summary_only()]:
+        engine = run(retention,n=10)
+        broker = engine.broker
+        assert (0 in broker.orders) == (not retention.compacts)
+
+        events = broker.handle_requests(engine.ts,[],[CancellationRequest(0)])
+        assert [event.cancellation_submission.order_id for event in events] == [0]
+
+        engine.insert_events(events)
+        engine.run()
+
+        assert (0 in broker.cancellations) == (not retention.compacts)
+        with pytest.raises(RuntimeError,match="non existent"):
+            broker.handle_requests(engine.ts,[],[CancellationRequest(broker.order_count)])
+
+def test_cancellation_outcomes_match_keep_all(tmp_path):
+    def outcomes(retention):
+        market_datas = {"sym1" : helpers.market_data.get_simple_market_data(40)}
+        broker = Broker(100_000,PerShareFee(0),pd.Timedelta(seconds=1),retention=retention)
+        market = RecordingMarket(market_datas,CappedFill(2),pd.Timedelta(seconds=1),retention=retention)
+
+        engine = Engine(Recanceller(),broker,market)
+        engine.add_bar_schedule()
+        engine.run()
+        return market.outcomes
+
+    expected = outcomes(None)
+    assert {outcome for _,outcome in expected} == {CancellationOutcome.CANCELLED,CancellationOutcome.NO_OP}
+
+    for retention in [RetentionPolicy.keep_last(0),RetentionPolicy.keep_last(0,spill_dir=tmp_path,block_rows=2),RetentionPolicy.summary_only()]:
+        assert outcomes(retention) == expected
+
+def test_invalid_policies():
+    with pytest.raises(ValueError):
+        RetentionPolicy.keep_last(-1)
+    with pytest.raises(ValueError):
+        RetentionPolicy(RetentionMode.SUMMARY_ONLY,spill_dir="orders")
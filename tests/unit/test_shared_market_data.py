@@ -0,0 +1,54 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from sim import *
+import helpers
+
+def test_publish_and_attach():
+    md,start,end = helpers.market_data.get_simple_market_data_with_ts(5)
+    delta = (end-start)/5
+
+    with SharedMarketData({"sym1" : md}) as shared:
+        attached = attach_market_data(shared.specs["sym1"])
+
+        assert attached._df is None
+        assert len(attached) == 5
+        assert np.shares_memory(attached.columns["open"],np.ndarray((5,),dtype=np.float64,buffer=attached._shm.buf,offset=2 * 8 * 5))
+
+        with pytest.raises(ValueError):
+            attached.columns["open"][0] = 1
+
+        for i in range(5):
+            assert attached.bar_at(i) == md.bar_at(i)
+
+        assert attached.current_bar(start + delta) == md.current_bar(start + delta)
+        assert attached.most_recent_bar(end) == md.most_recent_bar(end)
+        assert attached.get_snapshot(start + 2 * delta).last_bar() == md.bar_at(1)
+        assert (attached.df["end_ts"] == md.df["end_ts"]).all()
+
+def test_timezones_round_trip():
+    zones = ["America/New_York","UTC",datetime.timezone(datetime.timedelta(hours=5,minutes=30))]
+    market_datas = {f"sym{i}" : helpers.market_data.get_simple_market_data(3,tz=tz) for i,tz in enumerate(zones)}
+
+    with SharedMarketData(market_datas) as shared:
+        for symbol,market_data in market_datas.items():
+            attached = attach_market_data(shared.specs[symbol])
+            assert attached.tz == market_data.tz
+            assert attached.bar_at(1) == market_data.bar_at(1)
+
+def test_unnamed_timezone_rejected():
+    md = helpers.market_data.get_simple_market_data(3,tz=datetime.timezone(datetime.timedelta(seconds=30)))
+
+    with pytest.raises(ValueError,match="round-trips"):
+        SharedMarketData({"sym1" : md})
+
+def test_shared_sweep():
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(10)}
+    grid = {"fee" : [0,1], "cap" : [3]}
+
+    serial = run_sweep(helpers.sweep.build_engine,grid,market_datas,max_workers=0)
+    shared = run_sweep(helpers.sweep.build_engine,grid,market_datas,max_workers=2,shared_memory=True)
+
+    assert [result.portfolio for result in serial] == [result.portfolio for result in shared]
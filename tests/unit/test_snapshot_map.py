@@ -0,0 +1,24 @@
+from sim.snapshot_map import SnapshotMap,PAGE_BITS
+
+def test_updated_shares_unchanged_pages():
+    far = 5 << PAGE_BITS
+    base = SnapshotMap().updated({0 : "a", 1 : "b", far : "c"})
+
+    updated = base.updated({1 : "B", 2 : "d"})
+
+    assert dict(base) == {0 : "a", 1 : "b", far : "c"}
+    assert dict(updated) == {0 : "a", 1 : "B", 2 : "d", far : "c"}
+    assert len(base) == 3 and len(updated) == 4
+    assert updated.pages[5] is base.pages[5]
+    assert 2 in updated and 2 not in base and 7 not in updated
+
+def test_updated_removes_keys():
+    far = 5 << PAGE_BITS
+    base = SnapshotMap().updated({0 : "a", 1 : "b", far : "c"})
+
+    updated = base.updated({2 : "d"},removed=[1,far,7])
+
+    assert dict(base) == {0 : "a", 1 : "b", far : "c"}
+    assert dict(updated) == {0 : "a", 2 : "d"}
+    assert len(updated) == 2
+    assert 5 not in updated.pages
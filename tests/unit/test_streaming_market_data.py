@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from sim import *
+import helpers
+
+def write_csv(tmp_path, n : int):
+    md = helpers.market_data.get_simple_market_data(n)
+    path = tmp_path / "bars.csv"
+    md.df.to_csv(path,index=False)
+
+    return md,path
+
+def test_streaming_lookups(tmp_path):
+    md,path = write_csv(tmp_path,20)
+    stream = StreamingMarketData.from_csv(path,chunksize=4,lookback=2)
+
+    assert len(stream) == 4
+
+    for i in range(20):
+        ts = md.bar_at(i).start_ts
+        assert stream.current_bar(ts) == md.bar_at(i)
+        assert stream.current_open(ts) == i
+        assert stream.most_recent_bar(ts) == md.most_recent_bar(ts)
+        assert len(stream) <= 2 + 2 * 4
+
+    assert stream.offset + len(stream) == 20
+
+    snapshot = stream.get_snapshot(md.bar_at(19).end_ts)
+    assert len(snapshot) == len(stream)
+    assert snapshot.last_bar() == md.bar_at(19)
+
+    with pytest.raises(ValueError,match="before its retained window"):
+        stream.current_bar(md.bar_at(0).start_ts)
+
+def test_chunk_boundary_validation(tmp_path):
+    md = helpers.market_data.get_simple_market_data(8)
+    df = md.df.copy()
+    df.loc[4,"start_ts"] = df.loc[3,"start_ts"] + pd.Timedelta(seconds=30)
+
+    path = tmp_path / "bars.csv"
+    df.to_csv(path,index=False)
+
+    stream = StreamingMarketData.from_csv(path,chunksize=4)
+
+    with pytest.raises(ValueError,match="chunk starting at bar 4 is invalid : timestamps are not disjoint"):
+        stream.current_bar(df.loc[5,"start_ts"])
+
+class TailStrategy(Strategy):
+    def __init__(self) -> None:
+        super().__init__()
+        self.tails = []
+        self.done = False
+
+    def run(self, market_snapshot, broker_snapshot):
+        self.tails.append(list(market_snapshot.market_datas["sym1"].tail(2)["close"]))
+
+        if self.done:
+            return [],[]
+        self.done = True
+        return [OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=10,symbol="sym1")],[]
+
+def run_engine(market_data):
+    strategy = TailStrategy()
+    broker = Broker(1000,PerShareFee(0),pd.Timedelta(0))
+    market = Market({"sym1" : market_data},CappedFill(3),pd.Timedelta(0))
+    engine = Engine(strategy,broker,market)
+    engine.add_bar_schedule()
+    engine.run()
+
+    return strategy,broker
+
+def test_engine_matches_in_memory(tmp_path):
+    md,path = write_csv(tmp_path,12)
+
+    strategy,broker = run_engine(md)
+    streamed_strategy,streamed_broker = run_engine(StreamingMarketData.from_csv(path,chunksize=5,lookback=2))
+
+    assert streamed_strategy.tails == strategy.tails
+    assert [fill.fill_price for fill in streamed_broker.orders[0].fills] == [fill.fill_price for fill in broker.orders[0].fills]
+    assert streamed_broker.portfolio.get_snapshot() == broker.portfolio.get_snapshot()
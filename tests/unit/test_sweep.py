@@ -0,0 +1,23 @@
+from sim import *
+import helpers
+
+def test_expand_grid():
+    assert expand_grid({"a" : [1,2], "b" : ["x","y"]}) == [{"a" : 1, "b" : "x"},{"a" : 1, "b" : "y"},{"a" : 2, "b" : "x"},{"a" : 2, "b" : "y"}]
+
+def test_run_sweep():
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(10)}
+    grid = {"fee" : [0,1], "cap" : [3,10]}
+
+    serial = run_sweep(helpers.sweep.build_engine,grid,market_datas,max_workers=0)
+    parallel = run_sweep(helpers.sweep.build_engine,grid,market_datas,max_workers=2,chunksize=2)
+
+    assert [result.index for result in parallel] == [0,1,2,3]
+    assert [result.params for result in parallel] == expand_grid(grid)
+
+    for s,p in zip(serial,parallel):
+        assert s.portfolio == p.portfolio
+        assert (s.order_count,s.fill_count,s.event_count) == (p.order_count,p.fill_count,p.event_count)
+
+    assert [result.fill_count for result in serial] == [4,1,4,1]
+    assert serial[0].portfolio.positions["sym1"] == 10
+    assert serial[2].portfolio.cash == serial[0].portfolio.cash - 10
@@ -0,0 +1,35 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from sim import *
+
+def test_trusted_constructors_match_validated_ones():
+    submission = OrderSubmission(order_id=1,side=OrderSide.BUY,qty=5,symbol="sym1",order_type=OrderType.LIMIT,limit=2.0)
+    fill = Fill(order_id=1,qty=5,symbol="sym1",side=OrderSide.BUY,fill_price=2.0,ts=pd.Timestamp(10))
+    result = CancellationResult(1,pd.Timestamp(10),CancellationOutcome.NO_OP)
+
+    assert OrderSubmission._make(1,OrderSide.BUY,5,"sym1",OrderType.LIMIT,2.0) == submission
+    assert Fill._make(1,5,"sym1",OrderSide.BUY,2.0,10) == fill
+    assert CancellationResult._make(1,10,CancellationOutcome.NO_OP) == result
+    assert CancellationSubmission._make(1) == CancellationSubmission(1)
+    assert submission.get_info(10) == submission.get_info(pd.Timestamp(10)) == OrderInfo(order_id=1,arrival_time=10,side=OrderSide.BUY,remaining_qty=5,order_type=OrderType.LIMIT,symbol="sym1",limit=2.0)
+    assert FillArrivesAtBrokerEvent._make(EventType.FILL_ARRIVES_AT_BROKER,10,fill) == FillArrivesAtBrokerEvent(EventType.FILL_ARRIVES_AT_BROKER,pd.Timestamp(10),fill)
+
+def test_value_objects_are_slotted_and_frozen():
+    fill = Fill._make(1,5,"sym1",OrderSide.BUY,2.0,10)
+    event = FillArrivesAtBrokerEvent._make(EventType.FILL_ARRIVES_AT_BROKER,10,fill)
+
+    for value in [fill,event,CancellationResult._make(1,10,CancellationOutcome.NO_OP)]:
+        assert not hasattr(value,"__dict__")
+        with pytest.raises(AttributeError):
+            value.ts_ns = 20
+
+    assert pickle.loads(pickle.dumps(event)) == event
+
+def test_validation_stays_at_the_boundary():
+    with pytest.raises(ValueError):
+        OrderRequest(side=OrderSide.BUY,order_type=OrderType.MARKET,qty=0,symbol="sym1")
+    with pytest.raises(ValueError):
+        Fill(order_id=1,qty=0,symbol="sym1",side=OrderSide.BUY,fill_price=2.0,ts=10)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sim import *
+import helpers
+
+def get_market_data(n : int, step : pd.Timedelta, offset : pd.Timedelta = pd.Timedelta(0), gap_every : int = 0, seed : int = 0):
+    rng = np.random.default_rng(seed)
+    step_ns,offset_ns = step.value,offset.value
+
+    start_ns = pd.Timestamp("2000-01-01").value + offset_ns + np.arange(n,dtype=np.int64) * step_ns
+    end_ns = start_ns + step_ns
+    if gap_every:
+        end_ns = np.where(np.arange(n) % gap_every == gap_every - 1,start_ns + step_ns // 2,end_ns)
+
+    close = 100 * np.exp(np.cumsum(rng.normal(0,0.01,n)))
+    open = np.concatenate([[100.0],close[:-1]])
+
+    return MarketData.from_columns({"start_ts" : start_ns, "end_ts" : end_ns, "open" : open, "high" : open + 1, "low" : open - 1, "close" : close,
+                                    "VWAP" : open, "volume" : np.ones(n,dtype=np.int64), "trades" : np.ones(n,dtype=np.int64)})
+
+def run_both(backtest : VectorizedBacktest, targets):
+    result = backtest.run(targets)
+    engine = backtest.engine(targets)
+    engine.run()
+    return result,engine
+
+def test_vectorized_matches_engine():
+    market_datas = {"sym1" : get_market_data(60,pd.Timedelta(minutes=1),gap_every=7,seed=1),
+                    "sym2" : get_market_data(25,pd.Timedelta(minutes=2,seconds=30),offset=pd.Timedelta(seconds=40),gap_every=3,seed=2)}
+    rng = np.random.default_rng(0)
+    targets = {symbol : rng.integers(0,40,len(market_data)) for symbol,market_data in market_datas.items()}
+
+    for broker_latency,market_latency in [(0,0),(1,45),(90,200)]:
+        backtest = VectorizedBacktest(market_datas,1e6,PerShareFee(0.01),CappedFill(7),pd.Timedelta(seconds=broker_latency),pd.Timedelta(seconds=market_latency))
+        result,engine = run_both(backtest,targets)
+
+        assert result.portfolio == engine.broker.portfolio.get_snapshot()
+        assert result.fill_count == engine.broker.fill_count
+        assert result.order_count == len(engine.broker.orders)
+        assert result.fills["cash"][-1] == engine.broker.portfolio.cash
+
+def test_vectorized_next_open():
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(10)}
+    backtest = VectorizedBacktest(market_datas,1000,PerShareFee(0),CappedFill(100),pd.Timedelta(0),pd.Timedelta(0))
+
+    result = backtest.run({"sym1" : [0,5,5,2,0,0,0,0,0,0]})
+
+    assert result.fills["price"].tolist() == [2,4,5]
+    assert result.fills["side"].tolist() == [1,-1,-1]
+    assert result.orders["filled_qty"].tolist() == [5,3,2]
+    assert result.portfolio.cash == 1000 - 5 * 2 + 3 * 4 + 2 * 5
+    assert result.portfolio.positions == {"sym1" : 0}
+
+def test_vectorized_capped_fills_stop_at_end_of_data():
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(4)}
+    backtest = VectorizedBacktest(market_datas,1000,PerShareFee(0),CappedFill(2),pd.Timedelta(0),pd.Timedelta(0))
+
+    result,engine = run_both(backtest,{"sym1" : [10,10,10,10]})
+
+    assert result.fills["qty"].tolist() == [2,2,2]
+    assert result.orders["filled_qty"].tolist() == [6]
+    assert result.portfolio == engine.broker.portfolio.get_snapshot()
+
+@pytest.mark.parametrize("targets,cash,fee,msg",[
+    ([0,100,100,100,100],10,0,"Portfolio attempted to buy more than current cash."),
+    ([0,1,-1,-1,-1],1000,0,"Portfolio attempted to sell more than current position."),
+    ([0,1,1,1,1],2,1.5,"Portfolio can not afford fee.")
+])
+def test_vectorized_portfolio_rules(targets,cash,fee,msg):
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(5)}
+    backtest = VectorizedBacktest(market_datas,cash,PerShareFee(fee),CappedFill(1000),pd.Timedelta(0),pd.Timedelta(0))
+
+    with pytest.raises(RuntimeError,match=msg):
+        backtest.run({"sym1" : targets})
+    with pytest.raises(RuntimeError,match=msg):
+        backtest.engine({"sym1" : targets}).run()
+
+def test_vectorized_strategy():
+    class Threshold(VectorizedStrategy):
+        def targets(self, market_datas):
+            return {symbol : np.where(market_data.columns["close"] > 100,10,0) for symbol,market_data in market_datas.items()}
+
+    market_datas = {"sym1" : get_market_data(50,pd.Timedelta(minutes=1),seed=3)}
+    backtest = VectorizedBacktest(market_datas,1e6,PerShareFee(0.01),CappedFill(4),pd.Timedelta(seconds=1),pd.Timedelta(seconds=1))
+
+    result,engine = run_both(backtest,Threshold())
+
+    assert result.fill_count > 0
+    assert result.portfolio == engine.broker.portfolio.get_snapshot()
+
+def test_vectorized_invalid_inputs():
+    market_datas = {"sym1" : helpers.market_data.get_simple_market_data(5)}
+
+    with pytest.raises(TypeError):
+        VectorizedBacktest(market_datas,1000,PerShareFee(0),None,pd.Timedelta(0),pd.Timedelta(0))
+
+    backtest = VectorizedBacktest(market_datas,1000,PerShareFee(0),CappedFill(1),pd.Timedelta(0),pd.Timedelta(0))
+    with pytest.raises(ValueError):
+        backtest.run({"sym1" : [0,1]})
+    with pytest.raises(ValueError):
+        backtest.run({"sym2" : [0,1,1,1,1]})
+    with pytest.raises(ValueError):
+        backtest.run({"sym1" : [0.5,1,1,1,1]})